@@ -0,0 +1,201 @@
+"""Admission control and priority scheduling for summarize requests.
+
+Every request needs one of ``slots`` execution slots. Before it can queue for
+one, its client (API key or address) must have a token in its bucket, so one
+caller can't flood the queue. Otherwise the request is rejected with
+``RateLimited`` and the time until the next token.
+
+While every slot is busy, requests wait in one queue per priority class. A
+freed slot goes to the waiting class that is furthest behind its share (its
+weight), so interactive requests overtake bulk ones without starving them.
+Requests are shed with ``Overloaded`` instead of queued when their class queue
+is full, or when the expected wait already exceeds their deadline. They are
+also shed once the deadline passes while still waiting.
+"""
+from collections import OrderedDict, deque
+import asyncio
+import math
+import time
+from typing import Deque, Dict, Optional
+
+
+class RateLimited(Exception):
+    """The client has used up its token bucket"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limit exceeded; retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class Overloaded(Exception):
+    """The request was shed: its queue is full or it can't start before its deadline"""
+
+    def __init__(self, message: str, retry_after: float, reason: str):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class TokenBucket:
+    """``rate`` tokens per second, holding at most ``burst``"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token; returns 0, or the seconds until one will be available"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class Ticket:
+    """An execution slot; release it exactly once (leaving a ``with`` block does)"""
+
+    def __init__(self, controller: "AdmissionController", waited: float):
+        self.controller = controller
+        self.waited = waited
+        self.started = time.monotonic()
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.controller._release(time.monotonic() - self.started)
+
+    def __enter__(self) -> "Ticket":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def __del__(self):
+        # Last resort for a ticket whose response was never sent at all
+        if not self.released:
+            self.release()
+
+
+class AdmissionController:
+    """Execution slots, per-client token buckets and weighted-fair priority queues.
+
+    ``slots <= 0`` means no concurrency limit and ``rate <= 0`` no rate limit.
+    """
+
+    def __init__(self, slots: int, weights: Dict[str, float], queue_limits: Dict[str, int],
+                 rate: float = 0.0, burst: float = 20.0, max_clients: int = 10000):
+        self.slots = slots
+        self.weights = weights
+        self.queue_limits = queue_limits
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.in_use = 0
+        self.admitted = {priority: 0 for priority in weights}
+        self.rejected: Dict[tuple, int] = {}
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._queues: Dict[str, Deque[asyncio.Future]] = {priority: deque() for priority in weights}
+        self._virtual = {priority: 0.0 for priority in weights}
+        self._clock = 0.0
+        # Moving average of how long a slot is held, for wait estimates
+        self._hold_time: Optional[float] = None
+
+    def _reject(self, priority: str, reason: str):
+        self.rejected[(priority, reason)] = self.rejected.get((priority, reason), 0) + 1
+
+    def _check_rate(self, client: str, priority: str):
+        if self.rate <= 0:
+            return
+        bucket = self._buckets.pop(client, None) or TokenBucket(self.rate, self.burst)
+        self._buckets[client] = bucket
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        wait = bucket.take()
+        if wait:
+            self._reject(priority, "rate_limited")
+            raise RateLimited(wait)
+
+    def expected_wait(self, priority: str) -> Optional[float]:
+        """Rough seconds until a new request of this class would get a slot"""
+        if self._hold_time is None or self.slots <= 0:
+            return None
+        weight = self.weights[priority]
+        ahead = sum(len(queue) for name, queue in self._queues.items() if self.weights[name] >= weight)
+        return (ahead + 1) * self._hold_time / self.slots
+
+    def queued(self) -> Dict[str, int]:
+        return {priority: len(queue) for priority, queue in self._queues.items()}
+
+    async def acquire(self, client: str, priority: str, deadline: Optional[float] = None) -> Ticket:
+        """Wait for a slot; raises RateLimited or Overloaded instead of queueing hopelessly"""
+        self._check_rate(client, priority)
+        if self.slots <= 0 or (self.in_use < self.slots and not any(self._queues.values())):
+            self.in_use += 1
+            self.admitted[priority] += 1
+            return Ticket(self, 0.0)
+
+        queue = self._queues[priority]
+        estimate = self.expected_wait(priority)
+        retry_after = max(1.0, math.ceil(estimate or 1.0))
+        if len(queue) >= self.queue_limits[priority]:
+            self._reject(priority, "queue_full")
+            raise Overloaded(f"Too many {priority} requests waiting", retry_after, "queue_full")
+        if deadline is not None and estimate is not None and estimate > deadline:
+            self._reject(priority, "deadline")
+            raise Overloaded(f"Expected wait of {estimate:.1f}s exceeds the request deadline", retry_after, "deadline")
+
+        if not queue:
+            # A class that was idle starts level with the others instead of with saved-up credit
+            self._virtual[priority] = max(self._virtual[priority], self._clock)
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, deadline)
+        except asyncio.TimeoutError:
+            if waiter in queue:
+                queue.remove(waiter)
+            self._reject(priority, "deadline")
+            raise Overloaded("Request deadline passed while waiting for capacity", retry_after, "deadline")
+        except asyncio.CancelledError:
+            if waiter in queue:
+                queue.remove(waiter)
+            elif waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the caller went away
+                self._release(None)
+            raise
+        self.admitted[priority] += 1
+        return Ticket(self, time.monotonic() - started)
+
+    def _release(self, held: Optional[float]):
+        if held is not None:
+            self._hold_time = held if self._hold_time is None else 0.8 * self._hold_time + 0.2 * held
+        while True:
+            waiting = [priority for priority, queue in self._queues.items() if queue]
+            if not waiting:
+                self.in_use -= 1
+                return
+            priority = min(waiting, key=lambda name: self._virtual[name])
+            self._clock = self._virtual[priority]
+            self._virtual[priority] += 1 / self.weights[priority]
+            waiter = self._queues[priority].popleft()
+            if not waiter.done():
+                # The slot passes straight to the waiter; in_use is unchanged
+                waiter.set_result(None)
+                return
+
+    def stats(self) -> dict:
+        return {
+            "slots": self.slots,
+            "in_use": self.in_use,
+            "queued": self.queued(),
+            "admitted": dict(self.admitted),
+            "rejected": {f"{priority}:{reason}": count for (priority, reason), count in self.rejected.items()},
+            "hold_time": round(self._hold_time, 3) if self._hold_time is not None else None,
+        }
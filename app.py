@@ -1,10 +1,13 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 import json
 from PIL import Image
 import base64
+import hashlib
 import io
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Page configuration
 st.set_page_config(
@@ -137,11 +140,108 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # FastAPI backend URL (adjust as needed)
-BACKEND_URL = "http://127.0.0.1:8000"
+BACKEND_URL = os.environ.get("BACKEND_URL", "http://127.0.0.1:8000")
+# Connect and read timeouts for backend calls, in seconds
+REQUEST_TIMEOUT = (
+    float(os.environ.get("BACKEND_CONNECT_TIMEOUT", "5")),
+    float(os.environ.get("BACKEND_READ_TIMEOUT", "300")),
+)
+# Files sent to the backend at once when several are uploaded together
+UPLOAD_CONCURRENCY = int(os.environ.get("UPLOAD_CONCURRENCY", "4"))
+# Summaries kept per browser session, so reruns don't resend the same content
+RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", "50"))
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """One pooled HTTP session shared by every rerun and browser session"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(UPLOAD_CONCURRENCY, 10))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def content_key(kind: str, content: bytes) -> str:
+    """Key for the session result cache: what was sent and a hash of its bytes"""
+    return f"{kind}:{hashlib.sha256(content).hexdigest()}"
+
+def cached_result(key: str):
+    """A result summarized earlier in this browser session, if any"""
+    return st.session_state.results.get(key)
+
+def remember_result(key: str, result: dict):
+    """Keep a result for this session, dropping the oldest past RESULT_CACHE_SIZE"""
+    results = st.session_state.results
+    results.pop(key, None)
+    results[key] = result
+    while len(results) > RESULT_CACHE_SIZE:
+        results.pop(next(iter(results)))
+
+def summarize_upload(session: requests.Session, name: str, content: bytes, content_type: str) -> dict:
+    """Summarize one file with a blocking call; runs on the upload thread pool"""
+    response = session.post(
+        f"{BACKEND_URL}/summarize/file",
+        files={"file": (name, content, content_type)},
+        timeout=REQUEST_TIMEOUT,
+    )
+    if response.status_code != 200:
+        try:
+            detail = response.json().get("detail", "Unknown error")
+        except ValueError:
+            detail = response.text or f"HTTP {response.status_code}"
+        raise RuntimeError(detail)
+    return response.json()
+
+def iter_sse_events(response):
+    """Yield (event, data) pairs from a streaming Server-Sent Events response"""
+    event = "message"
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:
+            event = "message"
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            yield event, json.loads(line[len("data:"):].strip())
+
+def render_summary(placeholder, summary: str, title: str = "📋 Summary"):
+    placeholder.markdown(f"""
+    <div class="summary-box">
+        <h4>{title}</h4>
+        <p>{summary}</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+def render_stats(result: dict):
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Original Length", f"{result['original_length']} chars")
+    with col2:
+        st.metric("Summary Length", f"{result['summary_length']} chars")
+    with col3:
+        reduction = ((result['original_length'] - result['summary_length']) / max(result['original_length'], 1)) * 100
+        st.metric("Reduction", f"{reduction:.1f}%")
+
+def render_streamed_summary(response, placeholder):
+    """Render summary tokens into placeholder as they arrive; returns (summary, stats)"""
+    summary = ""
+    for event, data in iter_sse_events(response):
+        if event == "error":
+            raise RuntimeError(data.get("detail", "Unknown error"))
+        if event == "done":
+            return summary.strip(), data
+        summary += data.get("token", "")
+        placeholder.markdown(f"""
+        <div class="summary-box">
+            <h4>📋 Summary</h4>
+            <p>{summary}▌</p>
+        </div>
+        """, unsafe_allow_html=True)
+    raise RuntimeError("Connection closed before the summary was complete")
 
 # Initialize session state
 if 'current_page' not in st.session_state:
     st.session_state.current_page = 'home'
+if 'results' not in st.session_state:
+    st.session_state.results = {}
 
 # Function to load and encode logo
 @st.cache_data
@@ -286,106 +386,68 @@ def show_text_summarizer():
     # Summarize button
     if st.button("🚀 Summarize Text", disabled=(char_count < 50)):
         if user_text.strip():
-            with st.spinner("Generating summary..."):
-                try:
-                    # Make API request
-                    response = requests.post(
-                        f"{BACKEND_URL}/summarize/text/form",
-                        data={"text": user_text}
+            key = content_key("text", user_text.encode("utf-8"))
+            result = cached_result(key)
+            if result is not None:
+                # Same text as an earlier click in this session; nothing to resend
+                st.markdown('<div class="success-box">✅ Summary generated successfully! (cached)</div>', unsafe_allow_html=True)
+                render_summary(st.empty(), result["summary"])
+                render_stats(result)
+                return
+            try:
+                # Stream the summary so the first words show up while the rest is generated
+                with st.spinner("Generating summary..."):
+                    response = get_http_session().post(
+                        f"{BACKEND_URL}/summarize/text/stream",
+                        json={"text": user_text},
+                        stream=True,
+                        timeout=REQUEST_TIMEOUT,
                     )
+                
+                if response.status_code == 200:
+                    summary_placeholder = st.empty()
+                    summary, result = render_streamed_summary(response, summary_placeholder)
+                    result = {
+                        "summary": summary,
+                        "original_length": result.get("original_length", len(user_text)),
+                        "summary_length": result.get("summary_length", len(summary)),
+                    }
+                    remember_result(key, result)
+                    
+                    st.markdown('<div class="success-box">✅ Summary generated successfully!</div>', unsafe_allow_html=True)
+                    
+                    # Display summary
+                    render_summary(summary_placeholder, summary)
+                    
+                    # Statistics
+                    render_stats(result)
                     
-                    if response.status_code == 200:
-                        result = response.json()
-                        
-                        st.markdown('<div class="success-box">✅ Summary generated successfully!</div>', unsafe_allow_html=True)
-                        
-                        # Display summary
-                        st.markdown(f"""
-                        <div class="summary-box">
-                            <h4>📋 Summary</h4>
-                            <p>{result['Summary']}</p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        # Statistics
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Original Length", f"{result.get('original_length', len(user_text))} chars")
-                        with col2:
-                            st.metric("Summary Length", f"{result.get('summary_length', len(result['Summary']))} chars")
-                        with col3:
-                            reduction = ((len(user_text) - len(result['Summary'])) / len(user_text)) * 100
-                            st.metric("Reduction", f"{reduction:.1f}%")
-                        
-                    else:
-                        st.markdown(f'<div class="error-box">❌ Error: {response.json().get("detail", "Unknown error")}</div>', unsafe_allow_html=True)
-                        
-                except requests.exceptions.ConnectionError:
-                    st.markdown('<div class="error-box">❌ Cannot connect to the backend. Please make sure the FastAPI server is running.</div>', unsafe_allow_html=True)
-                except Exception as e:
-                    st.markdown(f'<div class="error-box">❌ Unexpected error: {str(e)}</div>', unsafe_allow_html=True)
+                else:
+                    st.markdown(f'<div class="error-box">❌ Error: {response.json().get("detail", "Unknown error")}</div>', unsafe_allow_html=True)
+                    
+            except requests.exceptions.ConnectionError:
+                st.markdown('<div class="error-box">❌ Cannot connect to the backend. Please make sure the FastAPI server is running.</div>', unsafe_allow_html=True)
+            except requests.exceptions.Timeout:
+                st.markdown('<div class="error-box">❌ The backend took too long to respond. Please try again.</div>', unsafe_allow_html=True)
+            except Exception as e:
+                st.markdown(f'<div class="error-box">❌ Unexpected error: {str(e)}</div>', unsafe_allow_html=True)
 
 def show_image_summarizer():
     st.title("🖼️ Image Summarizer")
     st.markdown("Upload PDFs, Word documents, or images to extract and summarize text!")
     
     # File uploader
-    uploaded_file = st.file_uploader(
-        "Choose a file",
+    uploaded_files = st.file_uploader(
+        "Choose files",
         type=['pdf', 'docx', 'doc', 'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff'],
-        help="Supported formats: PDF, DOCX, DOC, PNG, JPG, JPEG, GIF, BMP, TIFF"
+        accept_multiple_files=True,
+        help="Supported formats: PDF, DOCX, DOC, PNG, JPG, JPEG, GIF, BMP, TIFF. Select several files to summarize them together."
     )
     
-    if uploaded_file is not None:
-        # File info
-        st.write(f"**File:** {uploaded_file.name}")
-        st.write(f"**Size:** {uploaded_file.size} bytes")
-        st.write(f"**Type:** {uploaded_file.type}")
-        
-        # Process file button
-        if st.button("🔍 Extract & Summarize"):
-            with st.spinner("Processing file and generating summary..."):
-                try:
-                    # Prepare file for API request
-                    files = {"file": (uploaded_file.name, uploaded_file.getvalue(), uploaded_file.type)}
-                    
-                    # Make API request
-                    response = requests.post(
-                        f"{BACKEND_URL}/summarize/file",
-                        files=files
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        
-                        st.markdown('<div class="success-box">✅ File processed and summary generated successfully!</div>', unsafe_allow_html=True)
-                        
-                        # Display summary
-                        st.markdown(f"""
-                        <div class="summary-box">
-                            <h4>📋 Summary</h4>
-                            <p>{result['summary']}</p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        # Statistics
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Original Length", f"{result['original_length']} chars")
-                        with col2:
-                            st.metric("Summary Length", f"{result['summary_length']} chars")
-                        with col3:
-                            reduction = ((result['original_length'] - result['summary_length']) / result['original_length']) * 100
-                            st.metric("Reduction", f"{reduction:.1f}%")
-                        
-                    else:
-                        error_msg = response.json().get("detail", "Unknown error")
-                        st.markdown(f'<div class="error-box">❌ Error: {error_msg}</div>', unsafe_allow_html=True)
-                        
-                except requests.exceptions.ConnectionError:
-                    st.markdown('<div class="error-box">❌ Cannot connect to the backend. Please make sure the FastAPI server is running.</div>', unsafe_allow_html=True)
-                except Exception as e:
-                    st.markdown(f'<div class="error-box">❌ Unexpected error: {str(e)}</div>', unsafe_allow_html=True)
+    if len(uploaded_files) == 1:
+        summarize_single_file(uploaded_files[0])
+    elif uploaded_files:
+        summarize_many_files(uploaded_files)
     
     # Instructions
     st.markdown("---")
@@ -398,6 +460,118 @@ def show_image_summarizer():
     5. **Text Quality**: Ensure images have clear, readable text for best OCR results
     """)
 
+def summarize_single_file(uploaded_file):
+    """One file: stream its summary as it is generated"""
+    # File info
+    st.write(f"**File:** {uploaded_file.name}")
+    st.write(f"**Size:** {uploaded_file.size} bytes")
+    st.write(f"**Type:** {uploaded_file.type}")
+    
+    # Process file button
+    if st.button("🔍 Extract & Summarize"):
+        content = uploaded_file.getvalue()
+        key = content_key(f"file:{uploaded_file.name}", content)
+        result = cached_result(key)
+        if result is not None:
+            st.markdown('<div class="success-box">✅ File processed and summary generated successfully! (cached)</div>', unsafe_allow_html=True)
+            render_summary(st.empty(), result["summary"])
+            render_stats(result)
+            return
+        try:
+            # Prepare file for API request
+            files = {"file": (uploaded_file.name, content, uploaded_file.type)}
+            
+            # Stream the summary; the spinner covers upload and extraction
+            with st.spinner("Processing file and generating summary..."):
+                response = get_http_session().post(
+                    f"{BACKEND_URL}/summarize/file/stream",
+                    files=files,
+                    stream=True,
+                    timeout=REQUEST_TIMEOUT,
+                )
+            
+            if response.status_code == 200:
+                summary_placeholder = st.empty()
+                summary, result = render_streamed_summary(response, summary_placeholder)
+                result = {
+                    "summary": summary,
+                    "original_length": result["original_length"],
+                    "summary_length": result["summary_length"],
+                }
+                remember_result(key, result)
+                
+                st.markdown('<div class="success-box">✅ File processed and summary generated successfully!</div>', unsafe_allow_html=True)
+                
+                # Display summary
+                render_summary(summary_placeholder, summary)
+                
+                # Statistics
+                render_stats(result)
+                
+            else:
+                error_msg = response.json().get("detail", "Unknown error")
+                st.markdown(f'<div class="error-box">❌ Error: {error_msg}</div>', unsafe_allow_html=True)
+                
+        except requests.exceptions.ConnectionError:
+            st.markdown('<div class="error-box">❌ Cannot connect to the backend. Please make sure the FastAPI server is running.</div>', unsafe_allow_html=True)
+        except requests.exceptions.Timeout:
+            st.markdown('<div class="error-box">❌ The backend took too long to respond. Please try again.</div>', unsafe_allow_html=True)
+        except Exception as e:
+            st.markdown(f'<div class="error-box">❌ Unexpected error: {str(e)}</div>', unsafe_allow_html=True)
+
+def summarize_many_files(uploaded_files):
+    """Several files: send up to UPLOAD_CONCURRENCY at once and show each as it finishes"""
+    total_size = sum(uploaded_file.size for uploaded_file in uploaded_files)
+    st.write(f"**Files:** {len(uploaded_files)} ({total_size} bytes)")
+    
+    if not st.button("🔍 Extract & Summarize All"):
+        return
+    
+    # One slot per file, in upload order, filled in whichever order they finish
+    progress = st.progress(0.0, text=f"0 of {len(uploaded_files)} files done")
+    slots = {}
+    pending = {}
+    for index, uploaded_file in enumerate(uploaded_files):
+        content = uploaded_file.getvalue()
+        key = content_key(f"file:{uploaded_file.name}", content)
+        with st.container():
+            st.markdown(f"**{uploaded_file.name}**")
+            slots[index] = st.empty()
+        result = cached_result(key)
+        if result is not None:
+            render_summary(slots[index], result["summary"], "📋 Summary (cached)")
+        else:
+            slots[index].info("⏳ Waiting...")
+            pending[index] = (key, uploaded_file.name, content, uploaded_file.type)
+    
+    done = len(uploaded_files) - len(pending)
+    progress.progress(done / len(uploaded_files), text=f"{done} of {len(uploaded_files)} files done")
+    if not pending:
+        return
+    
+    # Worker threads only make HTTP calls; all rendering stays on this script thread
+    session = get_http_session()
+    with ThreadPoolExecutor(max_workers=max(1, UPLOAD_CONCURRENCY)) as pool:
+        futures = {
+            pool.submit(summarize_upload, session, name, content, content_type): (index, key)
+            for index, (key, name, content, content_type) in pending.items()
+        }
+        for future in as_completed(futures):
+            index, key = futures[future]
+            try:
+                result = future.result()
+            except requests.exceptions.ConnectionError:
+                slots[index].markdown('<div class="error-box">❌ Cannot connect to the backend. Please make sure the FastAPI server is running.</div>', unsafe_allow_html=True)
+            except requests.exceptions.Timeout:
+                slots[index].markdown('<div class="error-box">❌ The backend took too long to respond. Please try again.</div>', unsafe_allow_html=True)
+            except Exception as e:
+                slots[index].markdown(f'<div class="error-box">❌ Error: {str(e)}</div>', unsafe_allow_html=True)
+            else:
+                remember_result(key, result)
+                render_summary(slots[index], result["summary"])
+            done += 1
+            progress.progress(done / len(uploaded_files), text=f"{done} of {len(uploaded_files)} files done")
+
 # Route to appropriate page
 if st.session_state.current_page == 'home':
     show_home()
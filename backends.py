@@ -0,0 +1,48 @@
+"""Summary backends: what turns a prepared text into a summary.
+
+``get_summary`` picks a backend per request and can fall back to another one
+when it fails. ``llm`` (defined in main.py, next to the client and routing it
+needs) map-reduces through the routed remote models. ``extractive`` runs
+locally on the extraction executor. It picks the most central sentences by
+TF-IDF scoring (compress.py), needs no network or GPU, and answers in
+milliseconds.
+
+A backend gets the text, its (words, max_tokens) length budget and the
+resolved request options.
+"""
+from typing import AsyncIterator, Tuple
+
+from compress import extractive_summary
+from executor import ExtractionExecutor
+
+
+class SummaryBackend:
+    """Interface every summary backend implements"""
+
+    name = ""
+    # Whether it splits texts into chunks, and so has chunk counts to report
+    chunks = False
+
+    async def summarize(self, text: str, budget: Tuple[int, int], options) -> str:
+        raise NotImplementedError
+
+    async def stream(self, text: str, budget: Tuple[int, int], options) -> AsyncIterator[str]:
+        """Yield the summary in pieces; backends that can't stream yield it whole"""
+        yield await self.summarize(text, budget, options)
+
+
+class ExtractiveBackend(SummaryBackend):
+    """Local extractive summaries; long texts go to the extraction executor"""
+
+    name = "extractive"
+
+    def __init__(self, executor: ExtractionExecutor, inline_chars: int = 20_000):
+        self.executor = executor
+        # Short texts take a few milliseconds, less than a trip through the pool,
+        # and must still work when an outage has every request falling back at once
+        self.inline_chars = inline_chars
+
+    async def summarize(self, text: str, budget: Tuple[int, int], options) -> str:
+        if len(text) <= self.inline_chars:
+            return extractive_summary(text, budget[0])
+        return await self.executor.run(extractive_summary, text, budget[0])
@@ -0,0 +1,72 @@
+"""In-memory job store for batch summarization.
+
+A batch job holds one result slot per input item, filled in as items finish.
+Pollers read the slots; streamers follow ``finished`` (indexes in completion
+order) and wait on ``changed`` for more.
+"""
+import asyncio
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+
+class BatchJob:
+    def __init__(self, total: int):
+        self.id = uuid.uuid4().hex
+        self.total = total
+        self.results: List[Optional[Dict[str, Any]]] = [None] * total
+        self.finished: List[int] = []
+        self.created = time.time()
+        self.completed_at: Optional[float] = None
+        self.changed = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return len(self.finished) == self.total
+
+    @property
+    def status(self) -> str:
+        return "completed" if self.done else "running"
+
+    async def set_result(self, index: int, result: Dict[str, Any]):
+        async with self.changed:
+            self.results[index] = result
+            self.finished.append(index)
+            if self.done:
+                self.completed_at = time.time()
+            self.changed.notify_all()
+
+    async def wait_past(self, cursor: int):
+        """Wait until more than ``cursor`` items have finished"""
+        async with self.changed:
+            await self.changed.wait_for(lambda: len(self.finished) > cursor)
+
+
+class BatchJobStore:
+    """Keeps jobs until ``ttl`` seconds after they complete"""
+
+    def __init__(self, ttl: float = 3600.0):
+        self.ttl = ttl
+        self._jobs: Dict[str, BatchJob] = {}
+
+    def _expire(self):
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job.completed_at is not None and now - job.completed_at > self.ttl:
+                del self._jobs[job_id]
+
+    def create(self, total: int) -> BatchJob:
+        self._expire()
+        job = BatchJob(total)
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        self._expire()
+        return self._jobs.get(job_id)
+
+    def cancel_all(self):
+        for job in self._jobs.values():
+            if job.task is not None:
+                job.task.cancel()
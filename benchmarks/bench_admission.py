@@ -0,0 +1,125 @@
+"""Interactive latency while bulk traffic saturates the upstream.
+
+The mock LLM stands in for an upstream that serves ``--capacity`` calls at a
+time (LLM_MAX_CONCURRENCY). ``--bulk`` closed-loop clients send
+``X-Priority: bulk`` texts to /summarize/text as fast as they are answered,
+honouring Retry-After. Meanwhile one interactive client sends a text every
+``--interval`` seconds. For each scenario the benchmark reports interactive
+p50/p95, bulk throughput and the status codes seen:
+
+  off          no admission control: everyone queues for the upstream in arrival order
+  priority     ADMISSION_SLOTS=--capacity: interactive requests overtake queued bulk ones
+  rate_limited priority plus a --rate requests/second token bucket per API key
+
+Usage: python -m benchmarks.bench_admission [--capacity 8] [--bulk 48] [--duration 10]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from benchmarks.common import percentile, use_mock_llm
+from benchmarks.corpus import make_text
+
+
+async def run_scenario(api: httpx.AsyncClient, name: str, args, seed: int) -> dict:
+    stop = time.perf_counter() + args.duration
+    statuses = {}
+    interactive = []
+    bulk_done = 0
+
+    def count(kind: str, response: httpx.Response):
+        key = f"{kind}_{response.status_code}"
+        statuses[key] = statuses.get(key, 0) + 1
+
+    async def bulk_client(worker: int):
+        nonlocal bulk_done
+        headers = {"X-Priority": "bulk", "X-API-Key": f"bulk-{worker % 4}"}
+        n = 0
+        while time.perf_counter() < stop:
+            n += 1
+            response = await api.post(
+                "/summarize/text", json={"text": make_text(20, seed=seed + worker * 10 ** 4 + n)}, headers=headers,
+            )
+            count("bulk", response)
+            if response.status_code == 200:
+                bulk_done += 1
+            elif "Retry-After" in response.headers:
+                await asyncio.sleep(float(response.headers["Retry-After"]))
+
+    async def interactive_request(n: int):
+        started = time.perf_counter()
+        response = await api.post(
+            "/summarize/text", json={"text": make_text(20, seed=seed + 10 ** 6 + n)},
+            headers={"X-Priority": "interactive", "X-API-Key": "interactive"},
+        )
+        count("interactive", response)
+        if response.status_code == 200:
+            interactive.append(time.perf_counter() - started)
+
+    async def interactive_client():
+        requests = []
+        n = 0
+        # Let the bulk clients fill the queue first
+        await asyncio.sleep(1)
+        while time.perf_counter() < stop:
+            n += 1
+            requests.append(asyncio.create_task(interactive_request(n)))
+            await asyncio.sleep(args.interval)
+        await asyncio.gather(*requests)
+
+    started = time.perf_counter()
+    await asyncio.gather(interactive_client(), *(bulk_client(worker) for worker in range(args.bulk)))
+    elapsed = time.perf_counter() - started
+    return {
+        "scenario": name,
+        "interactive_p50_ms": round(percentile(interactive, 50) * 1000, 1),
+        "interactive_p95_ms": round(percentile(interactive, 95) * 1000, 1),
+        "bulk_per_second": round(bulk_done / elapsed, 1),
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--capacity", type=int, default=8, help="concurrent upstream calls (and admission slots)")
+    parser.add_argument("--bulk", type=int, default=48, help="concurrent bulk clients")
+    parser.add_argument("--interval", type=float, default=0.25, help="seconds between interactive requests")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per scenario")
+    parser.add_argument("--rate", type=float, default=5, help="requests/second per API key in the rate_limited scenario")
+    parser.add_argument("--latency", type=float, default=0.2, help="mock upstream latency in seconds")
+    args = parser.parse_args()
+
+    os.environ.setdefault("EXTRACTION_EXECUTOR", "thread")
+    os.environ.setdefault("NEAR_DUP_ENABLED", "false")
+    os.environ.setdefault("JOB_WORKERS", "0")
+    os.environ["LLM_MAX_CONCURRENCY"] = str(args.capacity)
+    server = use_mock_llm(args.latency)
+    import main as api_main
+    from admission import AdmissionController
+
+    scenarios = {
+        "off": dict(slots=0),
+        "priority": dict(slots=args.capacity),
+        "rate_limited": dict(slots=args.capacity, rate=args.rate, burst=args.rate),
+    }
+
+    async def run_all():
+        transport = httpx.ASGITransport(app=api_main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as api:
+            for index, (name, settings) in enumerate(scenarios.items()):
+                api_main.admission = AdmissionController(
+                    weights=api_main.ADMISSION_WEIGHTS, queue_limits=api_main.ADMISSION_QUEUE_LIMITS, **settings,
+                )
+                print(await run_scenario(api, name, args, seed=(index + 1) * 10 ** 8))
+
+    try:
+        asyncio.run(run_all())
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
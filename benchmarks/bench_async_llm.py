@@ -0,0 +1,62 @@
+"""Load benchmark for concurrent /summarize/text calls against the mock LLM.
+
+Starts benchmarks/mock_llm.py on a local port, points main.py at it and fires
+increasing numbers of concurrent requests at one in-process worker. Every
+request sends its own seeded text, so the summary cache and request
+coalescing don't turn a level into one upstream call.
+
+Usage: python -m benchmarks.bench_async_llm [--latency 0.5] [--levels 1,10,100,300]
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.common import use_mock_llm
+from benchmarks.corpus import make_text
+
+
+async def run_level(app, concurrency: int, seed: int) -> dict:
+    texts = [make_text(20, seed=seed + i) for i in range(concurrency)]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as api:
+        started = time.perf_counter()
+        responses = await asyncio.gather(
+            *(api.post("/summarize/text", json={"text": text}) for text in texts)
+        )
+        elapsed = time.perf_counter() - started
+    failures = sum(1 for r in responses if r.status_code != 200)
+    return {
+        "concurrency": concurrency,
+        "wall_s": round(elapsed, 3),
+        "throughput_rps": round(concurrency / elapsed, 1),
+        "failures": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.5, help="mock upstream latency in seconds")
+    parser.add_argument("--levels", default="1,10,100,300", help="comma separated concurrency levels")
+    args = parser.parse_args()
+
+    server = use_mock_llm(args.latency)
+
+    import main as api_main
+
+    async def run_all():
+        # One event loop for every level: the shared pool is bound to it
+        seed = 0
+        for level in (int(x) for x in args.levels.split(",")):
+            print(await run_level(api_main.app, level, seed))
+            seed += level
+
+    print(f"mock latency: {args.latency}s")
+    asyncio.run(run_all())
+
+    server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Local extractive backend against the remote LLM path, and fallback in an outage.
+
+Latency: summarizes paged documents (running headers, page numbers, OCR
+debris) through /summarize/text with ``backend=extractive`` and
+``backend=llm`` and reports wall time per request (median of ``--runs``;
+caches are bypassed with a fresh seed per run). Summary overlap is the ROUGE-1
+F1 between the two summaries. Against the mock LLM it means little, so pass
+--live to compare with the configured TOGETHER_API_KEY.
+
+Outage: the mock answers every call with a 503 (POST /faults) and
+``--requests`` texts are sent with fallback off and on. The benchmark reports
+the share that succeeded and the latency. Skipped with --live.
+
+Usage: python -m benchmarks.bench_backends [--pages 10,50,200] [--latency 0.5] [--live]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+from benchmarks.bench_compression import rouge1_f1
+from benchmarks.common import percentile, use_mock_llm
+from benchmarks.corpus import make_paged_text, make_text
+
+
+async def timed_post(api: httpx.AsyncClient, body: dict) -> tuple:
+    started = time.perf_counter()
+    response = await api.post("/summarize/text", json=body)
+    return time.perf_counter() - started, response
+
+
+async def compare_latency(api: httpx.AsyncClient, pages: int, runs: int) -> dict:
+    result = {"pages": pages}
+    summaries = {}
+    for backend in ("extractive", "llm"):
+        times = []
+        for run in range(runs):
+            text = make_paged_text(pages, seed=pages * 1000 + run)
+            elapsed, response = await timed_post(api, {"text": text, "backend": backend, "fallback": False})
+            if response.status_code != 200:
+                raise RuntimeError(f"{backend}: {response.status_code} {response.text}")
+            times.append(elapsed)
+            summaries[backend] = response.json()["summary"]
+        result[f"{backend}_ms"] = round(statistics.median(times) * 1000, 1)
+    result["speedup"] = round(result["llm_ms"] / result["extractive_ms"], 1)
+    result["summary_rouge1_f1"] = round(rouge1_f1(summaries["llm"], summaries["extractive"]), 3)
+    return result
+
+
+async def outage(api: httpx.AsyncClient, requests: int, fallback: bool) -> dict:
+    async def one(seed: int):
+        return await timed_post(api, {"text": make_text(40, seed=seed), "fallback": fallback})
+
+    results = await asyncio.gather(*(one(10 ** 6 * (2 + fallback) + i) for i in range(requests)))
+    latencies = [elapsed for elapsed, _ in results]
+    statuses = {}
+    for _, response in results:
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    return {
+        "scenario": f"outage_fallback_{'on' if fallback else 'off'}",
+        "success": f"{statuses.get(200, 0)}/{requests}",
+        "statuses": statuses,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="10,50,200", help="document sizes in pages")
+    parser.add_argument("--runs", type=int, default=3, help="requests per backend and size; medians are reported")
+    parser.add_argument("--requests", type=int, default=50, help="requests in the outage scenario")
+    parser.add_argument("--latency", type=float, default=0.5, help="mock upstream latency in seconds")
+    parser.add_argument("--live", action="store_true", help="use the real API instead of the mock")
+    args = parser.parse_args()
+
+    os.environ.setdefault("EXTRACTION_EXECUTOR", "thread")
+    os.environ.setdefault("NEAR_DUP_ENABLED", "false")
+    os.environ.setdefault("JOB_WORKERS", "0")
+    server = None if args.live else use_mock_llm(args.latency)
+    import main as api_main
+
+    async def run_all():
+        transport = httpx.ASGITransport(app=api_main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as api:
+            for pages in (int(x) for x in args.pages.split(",")):
+                print(await compare_latency(api, pages, args.runs))
+            if server is None:
+                return
+            faults_url = os.environ["TOGETHER_BASE_URL"].rsplit("/v1", 1)[0] + "/faults"
+            httpx.post(faults_url, json={"error_rate": 1.0}).raise_for_status()
+            for fallback in (False, True):
+                print(await outage(api, args.requests, fallback))
+
+    try:
+        asyncio.run(run_all())
+    finally:
+        if server is not None:
+            server.terminate()
+
+
+if __name__ == "__main__":
+    main()
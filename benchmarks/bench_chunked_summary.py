@@ -0,0 +1,63 @@
+"""Latency of map-reduce summarization as documents grow.
+
+Summarizes synthetic documents of increasing length through /summarize/text and
+reports wall time next to the number of chunks and reduce levels. With bounded
+parallelism, latency should track tree depth rather than document length.
+
+Usage: python -m benchmarks.bench_chunked_summary [--sizes 2000,20000,200000] [--chunk-tokens 2000]
+"""
+import argparse
+import asyncio
+import math
+import time
+
+import httpx
+
+from benchmarks.common import use_mock_llm
+from benchmarks.corpus import make_text
+
+
+async def run_size(app, sentences: int, chunk_tokens: int, fan_out: int, max_depth: int) -> dict:
+    from chunking import estimate_tokens, split_into_chunks
+
+    text = make_text(sentences)
+    chunks = len(split_into_chunks(text, chunk_tokens))
+    levels = 1 + (math.ceil(math.log(chunks, fan_out)) if chunks > 1 else 0)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as api:
+        started = time.perf_counter()
+        response = await api.post("/summarize/text", json={
+            "text": text, "chunk_tokens": chunk_tokens, "fan_out": fan_out, "max_depth": max_depth,
+        })
+        elapsed = time.perf_counter() - started
+    return {
+        "input_tokens": estimate_tokens(text),
+        "chunks": chunks,
+        "tree_levels": min(levels, max_depth + 1),
+        "wall_s": round(elapsed, 3),
+        "status": response.status_code,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="200,2000,20000", help="document sizes in sentences")
+    parser.add_argument("--chunk-tokens", type=int, default=2000)
+    parser.add_argument("--fan-out", type=int, default=8)
+    parser.add_argument("--max-depth", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.2, help="mock upstream latency in seconds")
+    args = parser.parse_args()
+
+    server = use_mock_llm(args.latency)
+    import main as api_main
+
+    async def run_all():
+        for sentences in (int(x) for x in args.sizes.split(",")):
+            print(await run_size(api_main.app, sentences, args.chunk_tokens, args.fan_out, args.max_depth))
+
+    asyncio.run(run_all())
+    server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Tokens and latency saved by extractive pre-compression.
+
+Summarizes paged documents (running headers, page numbers, a repeated
+disclaimer, OCR debris) through /summarize/text with compress off and on, and
+reports the prompt tokens sent upstream, wall time and the local compression
+time. Summary overlap is the ROUGE-1 F1 between the two summaries; against the
+mock LLM it only reflects how much text the last call saw, so pass --live to
+run against the configured TOGETHER_API_KEY for a meaningful number.
+
+Usage: python -m benchmarks.bench_compression [--pages 10,100,500] [--budget 8000] [--live]
+"""
+import argparse
+import asyncio
+import os
+import re
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.common import use_mock_llm
+from benchmarks.corpus import make_paged_text
+
+
+def rouge1_f1(reference: str, candidate: str) -> float:
+    ref = Counter(re.findall(r"\w+", reference.lower()))
+    cand = Counter(re.findall(r"\w+", candidate.lower()))
+    overlap = sum((ref & cand).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(cand.values())
+    recall = overlap / sum(ref.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+async def summarize(api: httpx.AsyncClient, text: str, compress: bool) -> dict:
+    from metrics import LLM_TOKENS
+
+    prompt_tokens = LLM_TOKENS.value(kind="prompt")
+    started = time.perf_counter()
+    response = await api.post("/summarize/text", json={"text": text, "compress": compress})
+    elapsed = time.perf_counter() - started
+    return {
+        "wall_s": round(elapsed, 3),
+        "prompt_tokens": int(LLM_TOKENS.value(kind="prompt") - prompt_tokens),
+        "status": response.status_code,
+        "summary": response.json().get("summary", ""),
+    }
+
+
+async def run_pages(app, pages: int, budget: int, seed: int) -> dict:
+    from chunking import estimate_tokens
+    from compress import compress_text
+
+    text = make_paged_text(pages, seed=seed)
+    started = time.perf_counter()
+    compressed = compress_text(text, budget)
+    compress_s = time.perf_counter() - started
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as api:
+        full = await summarize(api, text, compress=False)
+        short = await summarize(api, text, compress=True)
+    return {
+        "pages": pages,
+        "input_tokens": estimate_tokens(text),
+        "compressed_tokens": estimate_tokens(compressed),
+        "compress_s": round(compress_s, 3),
+        "prompt_tokens": f"{full['prompt_tokens']} -> {short['prompt_tokens']}",
+        "wall_s": f"{full['wall_s']} -> {short['wall_s']}",
+        "summary_rouge1_f1": round(rouge1_f1(full["summary"], short["summary"]), 3),
+        "status": (full["status"], short["status"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="10,100,500", help="document sizes in pages")
+    parser.add_argument("--budget", type=int, default=8000, help="COMPRESS_MAX_TOKENS")
+    parser.add_argument("--latency", type=float, default=0.2, help="mock upstream latency in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--live", action="store_true", help="use the real API instead of the mock")
+    args = parser.parse_args()
+
+    os.environ["COMPRESS_MAX_TOKENS"] = str(args.budget)
+    os.environ.setdefault("EXTRACTION_EXECUTOR", "thread")
+    server = None if args.live else use_mock_llm(args.latency)
+    import main as api_main
+
+    async def run_all():
+        for pages in (int(x) for x in args.pages.split(",")):
+            print(await run_pages(api_main.app, pages, args.budget, args.seed))
+
+    try:
+        asyncio.run(run_all())
+    finally:
+        if server is not None:
+            server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Wall time and peak RSS of DOCX extraction, python-docx against the streaming reader.
+
+Each variant runs in a fresh child process so peak RSS is not shared:
+- ``python_docx``: the previous approach, ``docx.Document`` and its paragraphs
+  (body text only, tables and headers are dropped)
+- ``python_docx_full``: python-docx walking body paragraphs, table cells and
+  headers/footers, for a like-for-like comparison of the text covered
+- ``streaming``: extractors.extract_text_from_docx
+- ``streaming_budget``: the same with a 20k character budget (early stop)
+
+Usage: python -m benchmarks.bench_docx [--paragraphs 1000,10000,50000]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import make_docx
+
+VARIANTS = ("python_docx", "python_docx_full", "streaming", "streaming_budget")
+
+
+def python_docx_full(path: str) -> str:
+    import docx
+
+    document = docx.Document(path)
+    parts = [p.text for section in document.sections for p in section.header.paragraphs]
+    for paragraph in document.paragraphs:
+        parts.append(paragraph.text)
+    for table in document.tables:
+        for row in table.rows:
+            parts.append("\t".join(cell.text for cell in row.cells))
+    parts.extend(p.text for section in document.sections for p in section.footer.paragraphs)
+    return "\n".join(parts).strip()
+
+
+def run_variant(variant: str, path: str) -> dict:
+    import docx
+
+    from extractors import extract_text_from_docx
+
+    baseline_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    started = time.perf_counter()
+    if variant == "python_docx":
+        text = "\n".join(paragraph.text for paragraph in docx.Document(path).paragraphs).strip()
+    elif variant == "python_docx_full":
+        text = python_docx_full(path)
+    else:
+        max_chars = 20000 if variant == "streaming_budget" else None
+        text = extract_text_from_docx(path, max_chars=max_chars)
+    elapsed = time.perf_counter() - started
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {
+        "variant": variant,
+        "wall_s": round(elapsed, 3),
+        "chars": len(text),
+        "peak_rss_mb": round(peak_mb, 1),
+        "extra_rss_mb": round(peak_mb - baseline_mb, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paragraphs", default="1000,10000,50000", help="comma separated paragraph counts")
+    parser.add_argument("--run", choices=VARIANTS, help=argparse.SUPPRESS)
+    parser.add_argument("--file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_variant(args.run, args.file)))
+        return
+
+    for paragraphs in (int(x) for x in args.paragraphs.split(",")):
+        with tempfile.NamedTemporaryFile(suffix=".docx", delete=False) as docx_file:
+            docx_file.write(make_docx(paragraphs))
+        try:
+            size_mb = round(os.path.getsize(docx_file.name) / 1024 / 1024, 1)
+            for variant in VARIANTS:
+                output = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_docx", "--run", variant, "--file", docx_file.name],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                print({"paragraphs": paragraphs, "file_mb": size_mb, **json.loads(output)})
+        finally:
+            os.unlink(docx_file.name)
+
+
+if __name__ == "__main__":
+    main()
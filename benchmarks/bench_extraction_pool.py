@@ -0,0 +1,78 @@
+"""Text request latency while heavy PDFs are being extracted.
+
+Runs the same mixed workload with the extraction executor in ``inline`` mode
+(the old behaviour, extraction on the event loop) and in ``process`` mode, and
+reports /summarize/text latency percentiles for each. Every request, in every
+pass, sends its own seeded text or PDF, so neither pass is served from the
+other's cached extractions or summaries.
+
+Usage: python -m benchmarks.bench_extraction_pool [--pages 300] [--pdfs 4] [--texts 50]
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.common import percentile, use_mock_llm
+from benchmarks.corpus import make_pdf, make_text
+
+
+async def timed_post(api, *args, **kwargs):
+    started = time.perf_counter()
+    response = await api.post(*args, **kwargs)
+    return response.status_code, time.perf_counter() - started
+
+
+async def run_mixed(app, pages: int, pdfs: int, texts: int, seed: int) -> dict:
+    pdf_files = [make_pdf(pages, seed=seed + i) for i in range(pdfs)]
+    text_bodies = [make_text(10, seed=seed + pdfs + i) for i in range(texts)]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as api:
+        heavy = [
+            asyncio.create_task(timed_post(api, "/summarize/file", files={"file": ("big.pdf", pdf, "application/pdf")}))
+            for pdf in pdf_files
+        ]
+        light = []
+        for text in text_bodies:
+            light.append(asyncio.create_task(timed_post(api, "/summarize/text", json={"text": text})))
+            await asyncio.sleep(0.02)
+        light_results = await asyncio.gather(*light)
+        heavy_results = await asyncio.gather(*heavy)
+
+    latencies = [elapsed for _, elapsed in light_results]
+    return {
+        "text_p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "text_p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "text_max_ms": round(max(latencies) * 1000, 1),
+        "pdf_max_s": round(max(elapsed for _, elapsed in heavy_results), 2),
+        "statuses": sorted({status for status, _ in light_results + heavy_results}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300, help="pages per heavy PDF")
+    parser.add_argument("--pdfs", type=int, default=4, help="concurrent heavy PDF uploads")
+    parser.add_argument("--texts", type=int, default=50, help="text requests issued during extraction")
+    parser.add_argument("--latency", type=float, default=0.05, help="mock upstream latency in seconds")
+    args = parser.parse_args()
+
+    server = use_mock_llm(args.latency)
+    import main as api_main
+    from executor import ExtractionExecutor
+
+    async def run_all():
+        for index, kind in enumerate(("inline", "process")):
+            api_main.extraction_executor = ExtractionExecutor(kind=kind, max_queue=args.pdfs)
+            seed = index * (args.pdfs + args.texts)
+            result = await run_mixed(api_main.app, args.pages, args.pdfs, args.texts, seed)
+            api_main.extraction_executor.shutdown()
+            print({"executor": kind, **result})
+
+    asyncio.run(run_all())
+    server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Re-summarizing new versions of a long PDF in which only a few pages changed.
+
+A ``--pages`` page PDF is summarized once with ``incremental=true``. Then, for
+each count in ``--changed``, that many random pages are rewritten and the new
+version is uploaded to /summarize/file twice, once with incremental off and
+once with it on. Each upload has its own edits, so neither run is helped by
+the other. The benchmark reports latency, prompt tokens sent upstream (as
+reported by the mock), PDF pages actually extracted, and chunks summarized
+versus reused.
+
+Usage: python -m benchmarks.bench_incremental [--pages 200] [--changed 1,5,20] [--latency 0.3]
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+import httpx
+
+from benchmarks.common import use_mock_llm
+from benchmarks.corpus import make_page_lines, make_pdf_from_lines
+
+
+def edited(page_lines: list, changed: int, seed: int) -> list:
+    """A new version with ``changed`` pages rewritten"""
+    rng = random.Random(seed)
+    version = list(page_lines)
+    for page in rng.sample(range(len(page_lines)), changed):
+        lines = make_page_lines(1, len(page_lines[page]) - 1, seed=seed * 1000 + page)[0]
+        version[page] = [page_lines[page][0]] + lines[1:]
+    return version
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200, help="pages in the document")
+    parser.add_argument("--changed", default="1,5,20", help="pages changed in each new version")
+    parser.add_argument("--latency", type=float, default=0.3, help="mock upstream latency in seconds")
+    args = parser.parse_args()
+
+    os.environ.setdefault("EXTRACTION_EXECUTOR", "thread")
+    os.environ.setdefault("NEAR_DUP_ENABLED", "false")
+    os.environ.setdefault("JOB_WORKERS", "0")
+    server = use_mock_llm(args.latency)
+    import main as api_main
+    from metrics import LLM_TOKENS
+
+    async def upload(api: httpx.AsyncClient, name: str, page_lines: list, incremental: bool) -> dict:
+        tokens = LLM_TOKENS.value(kind="prompt")
+        page_misses = api_main.page_cache.stats()["misses"]
+        started = time.perf_counter()
+        response = await api.post(
+            "/summarize/file",
+            files={"file": ("report.pdf", make_pdf_from_lines(page_lines), "application/pdf")},
+            data={"incremental": str(incremental).lower()},
+        )
+        elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            raise RuntimeError(f"{name}: {response.status_code} {response.text}")
+        body = response.json()
+        return {
+            "version": name,
+            "incremental": incremental,
+            "latency_ms": round(elapsed * 1000, 1),
+            "prompt_tokens": int(LLM_TOKENS.value(kind="prompt") - tokens),
+            "pages_extracted": (api_main.page_cache.stats()["misses"] - page_misses) if incremental else args.pages,
+            "chunks": body["chunks"],
+            "reused_chunks": body["reused_chunks"],
+        }
+
+    async def run_all():
+        transport = httpx.ASGITransport(app=api_main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as api:
+            original = make_page_lines(args.pages, seed=1)
+            print(await upload(api, "v1", original, True))
+            for version, changed in enumerate(int(x) for x in args.changed.split(",")):
+                name = f"v{version + 2} ({changed} pages changed)"
+                print(await upload(api, name, edited(original, changed, seed=2 * version + 2), False))
+                print(await upload(api, name, edited(original, changed, seed=2 * version + 3), True))
+
+    try:
+        asyncio.run(run_all())
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
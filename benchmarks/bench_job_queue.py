@@ -0,0 +1,99 @@
+"""API latency of the durable job queue while its backlog grows.
+
+Starts the API (with JOB_WORKERS job workers) against the mock LLM and submits
+PDF jobs to POST /jobs in waves, faster than the workers can finish them. For
+each wave it reports p50/p95 latency of POST /jobs and GET /jobs/{id} next to
+the queue depth; they should stay flat however deep the backlog gets. Then it
+waits for the queue to drain and reports job throughput.
+
+Usage: python -m benchmarks.bench_job_queue [--workers 1,4] [--waves 10] [--per-wave 50]
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.common import percentile, start_api_server, use_mock_llm
+from benchmarks.corpus import make_pdf
+
+
+async def timed_request(api: httpx.AsyncClient, latencies: list, method: str, url: str, **kwargs) -> httpx.Response:
+    started = time.perf_counter()
+    response = await api.request(method, url, **kwargs)
+    latencies.append(time.perf_counter() - started)
+    response.raise_for_status()
+    return response
+
+
+async def run_workers(workers: int, args) -> list:
+    job_dir = tempfile.mkdtemp(prefix="bench_jobs_")
+    server, base_url = start_api_server({
+        "JOB_DIR": job_dir,
+        "JOB_WORKERS": str(workers),
+        "JOB_WORKER_CONCURRENCY": str(args.concurrency),
+    })
+    rows = []
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as api:
+            pdfs = [make_pdf(args.pages, seed=seed) for seed in range(args.waves * args.per_wave)]
+            job_ids = []
+            started = time.perf_counter()
+            for wave in range(args.waves):
+                post_latencies, get_latencies = [], []
+                batch = pdfs[wave * args.per_wave:(wave + 1) * args.per_wave]
+                responses = await asyncio.gather(*(
+                    timed_request(api, post_latencies, "POST", "/jobs",
+                                  files={"file": (f"doc{wave}_{index}.pdf", pdf, "application/pdf")})
+                    for index, pdf in enumerate(batch)
+                ))
+                job_ids.extend(response.json()["job_id"] for response in responses)
+                await asyncio.gather(*(timed_request(api, get_latencies, "GET", f"/jobs/{job_id}") for job_id in job_ids[-20:]))
+                counts = (await api.get("/health")).json()["jobs"]
+                row = {
+                    "workers": workers,
+                    "wave": wave + 1,
+                    "backlog": counts["queued"] + counts["running"],
+                    "post_p50_ms": round(percentile(post_latencies, 50) * 1000, 1),
+                    "post_p95_ms": round(percentile(post_latencies, 95) * 1000, 1),
+                    "get_p50_ms": round(percentile(get_latencies, 50) * 1000, 1),
+                }
+                print(row)
+                rows.append(row)
+
+            while True:
+                counts = (await api.get("/health")).json()["jobs"]
+                if counts["queued"] + counts["running"] == 0:
+                    break
+                await asyncio.sleep(0.5)
+            elapsed = time.perf_counter() - started
+            print({"workers": workers, "jobs": len(job_ids), "completed": counts["completed"],
+                   "failed": counts["failed"], "drain_s": round(elapsed, 1),
+                   "jobs_per_s": round(len(job_ids) / elapsed, 2)})
+    finally:
+        server.terminate()
+        server.wait()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,4", help="comma separated JOB_WORKERS values to compare")
+    parser.add_argument("--concurrency", type=int, default=4, help="JOB_WORKER_CONCURRENCY")
+    parser.add_argument("--waves", type=int, default=10)
+    parser.add_argument("--per-wave", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=5, help="pages per PDF")
+    parser.add_argument("--latency", type=float, default=1.0, help="mock upstream latency in seconds")
+    args = parser.parse_args()
+
+    mock = use_mock_llm(args.latency)
+    try:
+        for workers in (int(x) for x in args.workers.split(",")):
+            asyncio.run(run_workers(workers, args))
+    finally:
+        mock.terminate()
+
+
+if __name__ == "__main__":
+    main()
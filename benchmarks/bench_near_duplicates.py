@@ -0,0 +1,159 @@
+"""Near-duplicate index: detection quality, lookup latency and memory at scale.
+
+Quality: SimHash distance between a seeded article and variants of it
+(whitespace, a tracking footer, an export timestamp, 5/10/20% of sentences
+rewritten) and unrelated articles, with whether each would match at the
+configured threshold. Also the fingerprinting time for a few text sizes.
+
+Scale: fills a NearDuplicateIndex with ``--entries`` random fingerprints (the
+index only ever sees fingerprints, and hashing a million texts would only
+benchmark SimHash) and reports insert rate, resident memory, and lookup
+latency for queries a few bits away from stored entries (hits) and for random
+queries (misses). With ``--persist`` it also times reloading the index from
+SQLite.
+
+Usage: python -m benchmarks.bench_near_duplicates [--entries 1000000] [--threshold 0.9] [--persist]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from benchmarks.common import percentile
+from benchmarks.corpus import make_text
+from cache import content_hash
+from neardup import FINGERPRINT_BITS, NearDuplicateIndex, simhash
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB (Linux /proc)"""
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+def variants(seed: int) -> dict:
+    rng = random.Random(seed)
+    article = make_text(60, seed=seed)
+    sentences = article.split(". ")
+
+    def rewrite(fraction: float) -> str:
+        return ". ".join(
+            make_text(1, seed=rng.randrange(10 ** 9)).rstrip(".") if rng.random() < fraction else sentence
+            for sentence in sentences
+        )
+
+    return {
+        "identical": article,
+        "whitespace": "\n\n  ".join(article.split(" ")),
+        "tracking_footer": article + " Sent from my phone. To unsubscribe click here. utm_source=newsletter",
+        "export_timestamp": f"Exported 2024-0{seed % 9 + 1}-1{seed % 10} 10:4{seed % 10} UTC. " + article,
+        "rewrite_5pct": rewrite(0.05),
+        "rewrite_10pct": rewrite(0.10),
+        "rewrite_20pct": rewrite(0.20),
+        "unrelated": make_text(60, seed=seed + 10 ** 6),
+    }, article
+
+
+def quality(threshold: float, samples: int):
+    max_distance = int(round((1 - threshold) * FINGERPRINT_BITS))
+    distances = {}
+    for seed in range(samples):
+        texts, article = variants(seed)
+        base = simhash(article)
+        for name, text in texts.items():
+            distances.setdefault(name, []).append((simhash(text) ^ base).bit_count())
+    for name, values in distances.items():
+        print({
+            "variant": name,
+            "median_bits": sorted(values)[len(values) // 2],
+            "max_bits": max(values),
+            "matched": f"{sum(v <= max_distance for v in values)}/{len(values)}",
+        })
+
+    for sentences in (60, 600, 6000):
+        text = make_text(sentences, seed=sentences)
+        started = time.perf_counter()
+        simhash(text)
+        print({"fingerprint_chars": len(text), "ms": round((time.perf_counter() - started) * 1000, 2)})
+
+
+def flip_bits(fingerprint: int, bits: int, rng: random.Random) -> int:
+    for bit in rng.sample(range(FINGERPRINT_BITS), bits):
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+def scale(entries: int, threshold: float, queries: int, persist: bool):
+    rng = random.Random(0)
+    db_path = None
+    if persist:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="bench-neardup-"), "index.sqlite3")
+        NearDuplicateIndex(threshold, entries, db_path=db_path).close()
+    index = NearDuplicateIndex(threshold, entries)
+    key = content_hash("summary")
+    group = 1
+
+    before = rss_mb()
+    started = time.perf_counter()
+    for _ in range(entries):
+        index.add(rng.getrandbits(64), group, key)
+    insert_s = time.perf_counter() - started
+    print({
+        "entries": len(index),
+        "insert_per_s": round(entries / insert_s),
+        "index_mb": round(rss_mb() - before, 1),
+        "bytes_per_entry": round((rss_mb() - before) * 1024 * 1024 / entries),
+    })
+
+    stored = [index._fingerprints[rng.randrange(len(index))] for _ in range(queries)]
+    for name, make_query in (
+        ("hit_0_bits", lambda i: stored[i]),
+        (f"hit_{index.max_distance}_bits", lambda i: flip_bits(stored[i], index.max_distance, rng)),
+        ("miss_random", lambda i: rng.getrandbits(64)),
+    ):
+        query_list = [make_query(i) for i in range(queries)]
+        latencies = []
+        found = 0
+        for query in query_list:
+            started = time.perf_counter()
+            found += bool(index.lookup(query, group))
+            latencies.append((time.perf_counter() - started) * 1e6)
+        print({
+            "queries": name,
+            "found": f"{found}/{queries}",
+            "p50_us": round(percentile(latencies, 50), 1),
+            "p99_us": round(percentile(latencies, 99), 1),
+        })
+
+    if persist:
+        fingerprints = index._fingerprints
+        with sqlite3.connect(db_path) as db:
+            db.executemany(
+                "INSERT INTO near_duplicates (seq, fingerprint, grp, key) VALUES (?, ?, ?, ?)",
+                ((seq + 1, fp - (1 << 64) if fp >= 1 << 63 else fp, group, bytes.fromhex(key))
+                 for seq, fp in enumerate(fingerprints)),
+            )
+        del index
+        started = time.perf_counter()
+        reloaded = NearDuplicateIndex(threshold, entries, db_path=db_path)
+        print({"reload_entries": len(reloaded), "reload_s": round(time.perf_counter() - started, 2)})
+        reloaded.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--samples", type=int, default=20, help="articles per quality variant")
+    parser.add_argument("--persist", action="store_true", help="also time reloading the index from SQLite")
+    args = parser.parse_args()
+
+    quality(args.threshold, args.samples)
+    scale(args.entries, args.threshold, args.queries, args.persist)
+
+
+if __name__ == "__main__":
+    main()
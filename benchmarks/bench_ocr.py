@@ -0,0 +1,91 @@
+"""OCR throughput and latency before and after the preprocessing pipeline.
+
+Builds a local synthetic corpus (phone-photo sized JPEGs, a 600 dpi scan and a
+multi-page TIFF) and OCRs every file two ways:
+- ``raw``: the previous approach, ``image_to_string(Image.open(path))``, which
+  only sees the first frame at full resolution
+- ``pipeline``: pipelines.extract_image, which downsamples, grayscales and OCRs
+  every frame in parallel on a process pool
+
+Requires the tesseract binary on PATH.
+
+Usage: python -m benchmarks.bench_ocr [--workers 4]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.corpus import make_image, make_tiff
+
+
+def build_corpus(directory: str) -> list:
+    files = {
+        "phone_photo_1.jpg": make_image(4032, 3024, 72, seed=1),
+        "phone_photo_2.jpg": make_image(4032, 3024, 72, seed=2),
+        "scan_600dpi.png": make_image(4960, 7016, 600, fmt="PNG", seed=3),
+        "scan_4_pages.tiff": make_tiff(4, seed=4),
+    }
+    paths = []
+    for name, content in files.items():
+        path = os.path.join(directory, name)
+        with open(path, "wb") as image_file:
+            image_file.write(content)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    import pytesseract
+    from PIL import Image
+
+    try:
+        pytesseract.get_tesseract_version()
+    except pytesseract.TesseractNotFoundError:
+        raise SystemExit("tesseract is not installed or not on PATH")
+
+    from executor import ExtractionExecutor
+    from extractors import OCR_DEFAULTS, count_image_frames
+    from pipelines import extract_image
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = build_corpus(directory)
+        executor = ExtractionExecutor("process", max_workers=args.workers, max_queue=args.workers * 4)
+
+        async def run_pipeline():
+            # Warm the pool up so worker start-up is not counted
+            await asyncio.gather(*(executor.run(count_image_frames, paths[0]) for _ in range(args.workers)))
+            results = []
+            for path in paths:
+                started = time.perf_counter()
+                text = await extract_image(executor, path, OCR_DEFAULTS)
+                results.append((path, time.perf_counter() - started, len(text)))
+            return results
+
+        for variant in ("raw", "pipeline"):
+            if variant == "raw":
+                results = []
+                for path in paths:
+                    started = time.perf_counter()
+                    with Image.open(path) as image:
+                        text = pytesseract.image_to_string(image)
+                    results.append((path, time.perf_counter() - started, len(text)))
+            else:
+                results = asyncio.run(run_pipeline())
+
+            frames = sum(count_image_frames(path) for path, _, _ in results)
+            total = sum(elapsed for _, elapsed, _ in results)
+            for path, elapsed, chars in results:
+                print({"variant": variant, "file": os.path.basename(path), "latency_s": round(elapsed, 3), "chars": chars})
+            print({"variant": variant, "total_s": round(total, 3), "frames_per_s": round(frames / total, 2)})
+
+        executor.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Wall time and peak RSS of PDF extraction for 10, 100 and 1000 page files.
+
+Each variant runs in a fresh child process so peak RSS is not shared:
+- ``bytes_concat``: the previous approach, whole upload in a BytesIO and
+  ``text += page`` per page
+- ``sequential``: extractors.extract_text_from_pdf on the spooled file
+- ``parallel``: pipelines.extract_pdf on a process pool
+- ``parallel_budget``: the same with a 20k character budget (early stop)
+
+Peak RSS is reported for the parent and, separately, for the largest worker.
+
+Usage: python -m benchmarks.bench_pdf_extraction [--pages 10,100,1000] [--workers 4]
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import make_pdf
+
+VARIANTS = ("bytes_concat", "sequential", "parallel", "parallel_budget")
+
+
+def run_variant(variant: str, path: str, workers: int) -> dict:
+    import PyPDF2
+    from executor import ExtractionExecutor
+    from extractors import count_pdf_pages, extract_text_from_pdf
+    from pipelines import extract_pdf
+
+    if variant.startswith("parallel"):
+        # Start the workers before timing, as a running server would have them
+        executor = ExtractionExecutor("process", max_workers=workers, max_queue=workers)
+        async def warm_up():
+            await asyncio.gather(*(executor.run(count_pdf_pages, path) for _ in range(workers)))
+        asyncio.run(warm_up())
+
+    started = time.perf_counter()
+    if variant == "bytes_concat":
+        with open(path, "rb") as pdf_file:
+            file_content = pdf_file.read()
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+        text = ""
+        for page in pdf_reader.pages:
+            text += page.extract_text() + "\n"
+    elif variant == "sequential":
+        text = extract_text_from_pdf(path)
+    else:
+        max_chars = 20000 if variant == "parallel_budget" else None
+        text = asyncio.run(extract_pdf(executor, path, max_chars=max_chars))
+    elapsed = time.perf_counter() - started
+    if variant.startswith("parallel"):
+        # Workers only count towards RUSAGE_CHILDREN once they have been reaped
+        executor.shutdown(wait=True)
+    return {
+        "variant": variant,
+        "wall_s": round(elapsed, 3),
+        "chars": len(text),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "worker_peak_rss_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="10,100,1000", help="comma separated page counts")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--run", choices=VARIANTS, help=argparse.SUPPRESS)
+    parser.add_argument("--file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_variant(args.run, args.file, args.workers)))
+        return
+
+    for pages in (int(x) for x in args.pages.split(",")):
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as pdf_file:
+            pdf_file.write(make_pdf(pages))
+        try:
+            for variant in VARIANTS:
+                output = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_pdf_extraction",
+                     "--run", variant, "--file", pdf_file.name, "--workers", str(args.workers)],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                print({"pages": pages, **json.loads(output)})
+        finally:
+            os.unlink(pdf_file.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Upstream resilience against a fault-injecting mock LLM.
+
+Each scenario sets faults on the mock (POST /faults) and compares the API with
+a resilience feature off and on:
+  errors   - 20% of calls fail with 500/429: success rate without and with retries
+  tail     - 5% of calls are slow: p50/p95/p99 without and with hedging
+  outage   - every call fails: time to fail without and with the circuit breaker
+  deadline - every call is slow: a 1 s request deadline returns 504 on time
+
+Usage: python -m benchmarks.bench_resilience [--requests 100] [--concurrency 20] [--scenarios errors,tail]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from benchmarks.common import percentile, use_mock_llm
+from benchmarks.corpus import make_text
+
+
+async def run_requests(api: httpx.AsyncClient, count: int, concurrency: int, seed: int, **fields) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = {}
+
+    async def one(index: int):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await api.post("/summarize/text", json={"text": make_text(5, seed=seed + index), **fields})
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    await asyncio.gather(*(one(index) for index in range(count)))
+    return {
+        "ok": f"{100 * statuses.get(200, 0) / count:.0f}%",
+        "p50_ms": round(percentile(latencies, 50) * 1000),
+        "p95_ms": round(percentile(latencies, 95) * 1000),
+        "p99_ms": round(percentile(latencies, 99) * 1000),
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default="errors,tail,outage,deadline")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2, help="mock upstream latency in seconds")
+    args = parser.parse_args()
+
+    os.environ.setdefault("LLM_BACKOFF_BASE", "0.1")
+    # Measure the upstream path itself, not the extractive fallback answering for it
+    os.environ.setdefault("SUMMARY_FALLBACK", "false")
+    server = use_mock_llm(args.latency, jitter=args.latency / 4)
+    faults_url = os.environ["TOGETHER_BASE_URL"].rsplit("/v1", 1)[0] + "/faults"
+    import main as api_main
+    from resilience import CircuitBreaker
+
+    resilience = api_main.llm_resilience
+    defaults = dict(vars(resilience))
+
+    def configure(faults: dict, **settings):
+        httpx.post(faults_url, json={"error_rate": 0, "slow_rate": 0, "slow_latency": 2, **faults}).raise_for_status()
+        for key, value in defaults.items():
+            setattr(resilience, key, value)
+        for key, value in settings.items():
+            setattr(resilience, key, value)
+        resilience.breaker = settings.get("breaker", CircuitBreaker(0, 0))
+
+    async def run_all():
+        transport = httpx.ASGITransport(app=api_main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as api:
+            seed = 0
+
+            async def run(label: str, scenario: str, **fields):
+                nonlocal seed
+                seed += args.requests
+                result = await run_requests(api, args.requests, args.concurrency, seed, **fields)
+                stats = resilience.stats()
+                print({"scenario": scenario, "config": label, **result,
+                       **{key: stats[key] for key in ("retried", "hedged", "hedge_wins", "rejected")}})
+
+            scenarios = args.scenarios.split(",")
+            if "errors" in scenarios:
+                configure({"error_rate": 0.2}, retries=0)
+                await run("no retries", "errors")
+                configure({"error_rate": 0.2}, retries=3)
+                await run("3 retries", "errors")
+            if "tail" in scenarios:
+                configure({"slow_rate": 0.05}, hedge=False)
+                await run("no hedging", "tail")
+                configure({"slow_rate": 0.05}, hedge=True, hedge_min_delay=args.latency)
+                await run_requests(api, 40, args.concurrency, 10 ** 6)  # fill the latency window
+                await run("hedge at p95", "tail")
+            if "outage" in scenarios:
+                configure({"error_rate": 1.0}, retries=2)
+                await run("no breaker", "outage")
+                configure({"error_rate": 1.0}, retries=2, breaker=CircuitBreaker(5, 30))
+                await run("breaker(5 failures)", "outage")
+            if "deadline" in scenarios:
+                configure({"slow_rate": 1.0, "slow_latency": 5})
+                await run("deadline 1s", "deadline", deadline=1)
+
+    try:
+        asyncio.run(run_all())
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
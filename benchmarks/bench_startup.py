@@ -0,0 +1,141 @@
+"""Cold start of the API: import time, readiness and the first requests.
+
+For each variant main:app is started in a fresh uvicorn process against the
+mock LLM, and the script records, from process spawn:
+- ``live_s`` / ``ready_s``: first 200 from /health/live and /health/ready
+- ``first_success_s``: first successful /summarize/text, sent once ready
+- ``first_text_ms`` / ``first_pdf_ms``: latency of those first requests (the
+  PDF one includes starting an extraction worker unless warm-up did it)
+
+Import time is measured separately in a bare interpreter: ``import main``
+alone, and with the libraries it now defers (openai, PyPDF2, Pillow,
+pytesseract) imported as well, which is what every worker used to pay.
+
+Variants: ``cold`` (WARMUP=false) and ``warm`` (WARMUP=true).
+
+Usage: python -m benchmarks.bench_startup [--runs 3] [--latency 0.05]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.common import free_port, use_mock_llm
+from benchmarks.corpus import make_pdf, make_text
+
+IMPORT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+deferred = [name for name in ("openai", "PyPDF2", "PIL", "pytesseract") if name not in sys.modules]
+if {eager}:
+    import openai, PyPDF2, PIL.Image, pytesseract
+print(json.dumps({{"import_s": time.perf_counter() - started, "main_only_s": imported - started, "deferred": deferred}}))
+"""
+
+
+def measure_import(eager: bool, env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT.format(eager=eager)],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def wait_for(api: httpx.Client, path: str, started: float, timeout: float = 60) -> float:
+    while time.perf_counter() - started < timeout:
+        try:
+            if api.get(path).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.TransportError:
+            pass
+        time.sleep(0.01)
+    raise RuntimeError(f"{path} never answered 200")
+
+
+def run_server(warm: bool, env: dict, seed: int) -> dict:
+    port = free_port()
+    env = dict(env, WARMUP="true" if warm else "false")
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        env=env, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=120) as api:
+            live = wait_for(api, "/health/live", started)
+            ready = wait_for(api, "/health/ready", started)
+
+            request_started = time.perf_counter()
+            response = api.post("/summarize/text", json={"text": make_text(40, seed=seed)})
+            first_text = time.perf_counter() - request_started
+            first_success = time.perf_counter() - started
+            if response.status_code != 200:
+                raise RuntimeError(f"/summarize/text answered {response.status_code}: {response.text}")
+
+            request_started = time.perf_counter()
+            response = api.post("/summarize/file", files={
+                "file": ("doc.pdf", make_pdf(5, seed=seed), "application/pdf"),
+            })
+            first_pdf = time.perf_counter() - request_started
+            if response.status_code != 200:
+                raise RuntimeError(f"/summarize/file answered {response.status_code}: {response.text}")
+            warm_up = api.get("/health/ready").json().get("warm_up")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return {
+        "live_s": live,
+        "ready_s": ready,
+        "first_success_s": first_success,
+        "first_text_ms": first_text * 1000,
+        "first_pdf_ms": first_pdf * 1000,
+        "warm_up": warm_up,
+    }
+
+
+def median_of(runs: list) -> dict:
+    keys = [key for key, value in runs[0].items() if isinstance(value, float)]
+    result = {key: round(statistics.median(run[key] for run in runs), 3) for key in keys}
+    return dict(runs[-1], **result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="runs per variant; medians are reported")
+    parser.add_argument("--latency", type=float, default=0.05, help="mock LLM latency in seconds")
+    args = parser.parse_args()
+
+    mock = use_mock_llm(args.latency)
+    job_dir = tempfile.mkdtemp(prefix="bench-startup-")
+    env = dict(
+        os.environ,
+        JOB_WORKERS="0",
+        JOB_DIR=job_dir,
+        EXTRACTION_WORKERS=os.environ.get("EXTRACTION_WORKERS", "2"),
+    )
+    try:
+        for eager in (False, True):
+            runs = [measure_import(eager, env) for _ in range(args.runs)]
+            print({"variant": "import_eager" if eager else "import_lazy", **median_of(runs)})
+        seed = 0
+        for warm in (False, True):
+            runs = []
+            for _ in range(args.runs):
+                seed += 1
+                runs.append(run_server(warm, env, seed))
+            print({"variant": "warm" if warm else "cold", **median_of(runs)})
+    finally:
+        mock.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Time-to-first-token of /summarize/text/stream against /summarize/text.
+
+The mock backend waits ``--latency`` seconds before the first token and
+``--token-delay`` seconds between tokens, so the buffered endpoint pays for the
+whole completion while the streaming one only pays for the first token.
+
+Usage: python -m benchmarks.bench_streaming [--latency 0.3] [--token-delay 0.03] [--requests 20]
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.common import percentile, start_api_server, use_mock_llm
+from benchmarks.corpus import make_text
+
+
+async def buffered(api, text: str) -> float:
+    started = time.perf_counter()
+    response = await api.post("/summarize/text", json={"text": text})
+    response.raise_for_status()
+    return time.perf_counter() - started
+
+
+async def streamed(api, text: str) -> tuple:
+    started = time.perf_counter()
+    first_token = None
+    async with api.stream("POST", "/summarize/text/stream", json={"text": text}) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if first_token is None and line.startswith("data:") and '"token"' in line:
+                first_token = time.perf_counter() - started
+    return first_token, time.perf_counter() - started
+
+
+def report(name: str, values) -> dict:
+    return {
+        "metric": name,
+        "p50_ms": round(percentile(values, 50) * 1000, 1),
+        "p95_ms": round(percentile(values, 95) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.3, help="mock time to first token in seconds")
+    parser.add_argument("--token-delay", type=float, default=0.03, help="mock delay between tokens in seconds")
+    parser.add_argument("--requests", type=int, default=20, help="requests per endpoint")
+    args = parser.parse_args()
+
+    mock = use_mock_llm(args.latency, args.token_delay)
+    server, base_url = start_api_server()
+
+    async def run_all():
+        async with httpx.AsyncClient(base_url=base_url, timeout=None) as api:
+            # Distinct texts so neither endpoint is served from the summary cache
+            full = await asyncio.gather(*(buffered(api, make_text(10, seed=i)) for i in range(args.requests)))
+            streams = await asyncio.gather(
+                *(streamed(api, make_text(10, seed=args.requests + i)) for i in range(args.requests))
+            )
+        print(report("buffered_total", full))
+        print(report("stream_ttft", [ttft for ttft, _ in streams]))
+        print(report("stream_total", [total for _, total in streams]))
+
+    try:
+        asyncio.run(run_all())
+    finally:
+        server.terminate()
+        mock.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Helpers shared by the benchmark scripts."""
+import os
+import socket
+import subprocess
+import sys
+import time
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_uvicorn(app_path: str, port: int, env: dict) -> subprocess.Popen:
+    """Run an ASGI app under uvicorn in a child process and wait until it listens"""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app_path,
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=dict(os.environ, **env),
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"{app_path} did not start")
+
+
+def start_mock_server(port: int, latency: float, token_delay: float = 0.0,
+                      jitter: float = 0.0, error_rate: float = 0.0) -> subprocess.Popen:
+    """Run the mock LLM in its own process so it does not share our event loop"""
+    return start_uvicorn("benchmarks.mock_llm:app", port, {
+        "MOCK_LLM_LATENCY": str(latency),
+        "MOCK_LLM_TOKEN_DELAY": str(token_delay),
+        "MOCK_LLM_JITTER": str(jitter),
+        "MOCK_LLM_ERROR_RATE": str(error_rate),
+    })
+
+
+def start_api_server(env: dict = None) -> tuple:
+    """Run main:app in a child process; returns (process, base_url).
+
+    Needed wherever responses must really stream: httpx's in-process ASGI
+    transport buffers the whole body.
+    """
+    port = free_port()
+    process = start_uvicorn("main:app", port, env or {})
+    return process, f"http://127.0.0.1:{port}"
+
+
+def use_mock_llm(latency: float, token_delay: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0) -> subprocess.Popen:
+    """Start the mock LLM and point main.py at it (call before importing main)"""
+    port = free_port()
+    process = start_mock_server(port, latency, token_delay, jitter, error_rate)
+    os.environ["TOGETHER_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+    return process
+
+
+def peak_rss_mb(pid: int) -> float:
+    """Peak resident set size of a process in MB (Linux /proc)"""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def child_pids(pid: int) -> list:
+    """All descendants of a process (Linux /proc)"""
+    pids = []
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as children:
+            for child in children.read().split():
+                pids.append(int(child))
+                pids.extend(child_pids(int(child)))
+    except OSError:
+        pass
+    return pids
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
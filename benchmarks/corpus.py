@@ -0,0 +1,189 @@
+"""Synthetic input documents for the benchmarks.
+
+Everything is generated locally and deterministically from a seed, so runs are
+comparable across machines without shipping fixture files.
+"""
+import random
+
+WORDS = (
+    "system data model summary report market growth revenue quarter customer "
+    "product team analysis result process policy research network energy "
+    "design strategy value service security cloud platform performance risk "
+    "budget forecast review project study method sample evidence outcome"
+).split()
+
+
+def make_text(sentences: int, seed: int = 0) -> str:
+    """Plain prose made of random sentences"""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(sentences):
+        words = rng.choices(WORDS, k=rng.randint(8, 20))
+        out.append(" ".join(words).capitalize() + ".")
+    return " ".join(out)
+
+
+def make_docx(paragraphs: int, seed: int = 0) -> bytes:
+    """A DOCX with ``paragraphs`` paragraphs, a table and a header"""
+    import io
+
+    import docx
+
+    rng = random.Random(seed)
+    document = docx.Document()
+    document.sections[0].header.paragraphs[0].text = "Quarterly report"
+    for index in range(paragraphs):
+        if index % 10 == 0:
+            document.add_heading(" ".join(rng.choices(WORDS, k=4)).capitalize(), level=2)
+        document.add_paragraph(make_text(rng.randint(3, 6), seed=seed * 100003 + index))
+    table = document.add_table(rows=4, cols=3)
+    for row in table.rows:
+        for cell in row.cells:
+            cell.text = " ".join(rng.choices(WORDS, k=3))
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_page_lines(pages: int, lines_per_page: int = 40, seed: int = 0) -> list:
+    """The lines of each page of make_pdf's document"""
+    rng = random.Random(seed)
+    page_lines = []
+    for page in range(pages):
+        lines = [f"Page {page + 1}"]
+        for _ in range(lines_per_page):
+            lines.append(" ".join(rng.choices(WORDS, k=12)).capitalize() + ".")
+        page_lines.append(lines)
+    return page_lines
+
+
+def make_pdf(pages: int, lines_per_page: int = 40, seed: int = 0) -> bytes:
+    """A text PDF with ``pages`` pages, written without any PDF library"""
+    return make_pdf_from_lines(make_page_lines(pages, lines_per_page, seed))
+
+
+def make_pdf_from_lines(page_lines: list) -> bytes:
+    """A text PDF with one page per list of lines"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the kids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for lines in page_lines:
+        stream = "BT /F1 10 Tf 12 TL 40 800 Td " + " ".join(
+            f"({_pdf_escape(line)}) Tj T*" for line in lines
+        ) + " ET"
+        stream_bytes = stream.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream_bytes), stream_bytes))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Count %d /Kids [%s] >>" % (
+        len(page_lines), b" ".join(b"%d 0 R" % kid for kid in kids)
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def _render_page(width: int, height: int, seed: int):
+    from PIL import Image, ImageDraw, ImageFont
+
+    rng = random.Random(seed)
+    font_size = max(12, width // 60)
+    font = ImageFont.load_default(size=font_size)
+    page = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(page)
+    y = font_size * 2
+    while y < height - font_size * 2:
+        line = " ".join(rng.choices(WORDS, k=8)).capitalize() + "."
+        draw.text((font_size * 2, y), line, fill=(30, 30, 30), font=font)
+        y += int(font_size * 1.6)
+    return page
+
+
+def make_image(width: int = 4000, height: int = 3000, dpi: int = 72, fmt: str = "JPEG", seed: int = 0) -> bytes:
+    """A rendered page of text, e.g. 4000x3000 at 72 dpi looks like a phone photo"""
+    import io
+
+    out = io.BytesIO()
+    _render_page(width, height, seed).save(out, format=fmt, dpi=(dpi, dpi))
+    return out.getvalue()
+
+
+def make_tiff(frames: int, width: int = 2480, height: int = 3508, dpi: int = 300, seed: int = 0) -> bytes:
+    """A multi-page TIFF scan (A4 at 300 dpi by default)"""
+    import io
+
+    pages = [_render_page(width, height, seed + i).convert("L") for i in range(frames)]
+    out = io.BytesIO()
+    pages[0].save(out, format="TIFF", save_all=True, append_images=pages[1:], dpi=(dpi, dpi), compression="tiff_lzw")
+    return out.getvalue()
+
+
+def make_paged_text(pages: int, sentences_per_page: int = 30, seed: int = 0) -> str:
+    """Text as extracted from a long PDF: running header and footer, page
+    numbers, a repeated disclaimer and a little OCR debris on every page"""
+    rng = random.Random(seed)
+    disclaimer = "This document is confidential and intended solely for internal review purposes."
+    out = []
+    for page in range(1, pages + 1):
+        out.append("Acme Holdings Quarterly Business Review")
+        out.append(make_text(sentences_per_page // 2, seed=seed * 100003 + page))
+        if rng.random() < 0.3:
+            out.append(rng.choice(("~~ ,. ;", "|||| _", "@ # %%")))
+        out.append("")
+        out.append(make_text(sentences_per_page - sentences_per_page // 2, seed=seed * 100003 + pages + page))
+        out.append(disclaimer)
+        out.append(f"Page {page} of {pages}")
+    return "\n".join(out)
+
+
+def write_corpus(directory: str, count: int = 10, seed: int = 0) -> list:
+    """Write ``count`` documents of each kind to a directory; returns the paths"""
+    import os
+
+    os.makedirs(directory, exist_ok=True)
+    makers = {
+        "txt": lambda i: make_text(200, seed=seed + i).encode(),
+        "pdf": lambda i: make_pdf(20, seed=seed + i),
+        "docx": lambda i: make_docx(60, seed=seed + i),
+        "png": lambda i: make_image(1700, 2200, 200, fmt="PNG", seed=seed + i),
+        "tiff": lambda i: make_tiff(2, seed=seed + i),
+    }
+    paths = []
+    for extension, make in makers.items():
+        for index in range(count):
+            path = os.path.join(directory, f"doc_{index:04d}.{extension}")
+            with open(path, "wb") as out:
+                out.write(make(index))
+            paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write a synthetic benchmark corpus")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--count", type=int, default=10, help="documents per kind")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(f"wrote {len(write_corpus(args.out, args.count, args.seed))} files to {args.out}")
@@ -0,0 +1,169 @@
+"""Reproducible load test of the API against the mock LLM server.
+
+Starts the mock LLM and main:app under uvicorn, then runs each scenario at
+increasing concurrency (closed loop: ``concurrency`` clients issuing
+``--requests`` requests in total). Every request uses a distinct, seeded input
+so the summary and extraction caches do not hide the work. Writes a JSON report
+with p50/p95/p99 latency, throughput, error counts and peak RSS per level.
+
+Scenarios: text (/summarize/text), text_form (/summarize/text/form),
+file_pdf, file_docx and file_image (/summarize/file; file_image needs tesseract).
+
+Usage:
+    python -m benchmarks.load_test --levels 1,8,32,128 --output report.json
+    python -m benchmarks.load_test --compare old.json --output new.json
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import subprocess
+import time
+
+import httpx
+
+from benchmarks.common import child_pids, peak_rss_mb, percentile, start_api_server, use_mock_llm
+from benchmarks.corpus import make_docx, make_image, make_pdf, make_text
+
+SCENARIOS = ("text", "text_form", "file_pdf", "file_docx", "file_image")
+
+
+def build_request(scenario: str, seed: int) -> dict:
+    """httpx.post keyword arguments for one request of a scenario"""
+    if scenario == "text":
+        return {"url": "/summarize/text", "json": {"text": make_text(40, seed=seed)}}
+    if scenario == "text_form":
+        return {"url": "/summarize/text/form", "data": {"text": make_text(40, seed=seed)}}
+    if scenario == "file_pdf":
+        return {"url": "/summarize/file", "files": {"file": ("doc.pdf", make_pdf(5, seed=seed), "application/pdf")}}
+    if scenario == "file_docx":
+        return {"url": "/summarize/file", "files": {"file": (
+            "doc.docx", make_docx(20, seed=seed),
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        )}}
+    if scenario == "file_image":
+        return {"url": "/summarize/file", "files": {"file": ("doc.png", make_image(1240, 1754, 150, "PNG", seed), "image/png")}}
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+async def run_level(api: httpx.AsyncClient, requests: list, concurrency: int) -> dict:
+    latencies = []
+    statuses = {}
+    queue = list(requests)
+
+    async def client():
+        while queue:
+            kwargs = queue.pop()
+            started = time.perf_counter()
+            try:
+                response = await api.post(**kwargs)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "requests": len(requests),
+        "wall_s": round(elapsed, 3),
+        "throughput_rps": round(len(requests) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "statuses": statuses,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(old: dict, new: dict):
+    """Print p95 and throughput changes between two reports"""
+    old_levels = {
+        (scenario["name"], level["concurrency"]): level
+        for scenario in old["scenarios"] for level in scenario["levels"]
+    }
+    for scenario in new["scenarios"]:
+        for level in scenario["levels"]:
+            before = old_levels.get((scenario["name"], level["concurrency"]))
+            if before is None:
+                continue
+            print({
+                "scenario": scenario["name"],
+                "concurrency": level["concurrency"],
+                "p95_ms": f"{before['p95_ms']} -> {level['p95_ms']}",
+                "throughput_rps": f"{before['throughput_rps']} -> {level['throughput_rps']}",
+            })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default="text,text_form,file_pdf,file_docx", help=f"comma separated, from {','.join(SCENARIOS)}")
+    parser.add_argument("--levels", default="1,8,32,128", help="comma separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="requests per level")
+    parser.add_argument("--latency", type=float, default=0.5, help="mock LLM latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1, help="mock LLM random extra latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of mock LLM calls that fail")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="load_report.json", help="where to write the JSON report")
+    parser.add_argument("--compare", help="earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    scenarios = args.scenarios.split(",")
+    levels = [int(x) for x in args.levels.split(",")]
+    mock = use_mock_llm(args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    # Upstream errors should show up as errors, not as extractive fallback summaries
+    server, base_url = start_api_server({"SUMMARY_FALLBACK": os.environ.get("SUMMARY_FALLBACK", "false")})
+
+    report = {
+        "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "config": vars(args),
+        "scenarios": [],
+    }
+
+    async def run_all():
+        limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+        async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as api:
+            seed = args.seed
+            for scenario in scenarios:
+                results = []
+                for level in levels:
+                    requests = [build_request(scenario, seed + i) for i in range(args.requests)]
+                    seed += args.requests
+                    result = await run_level(api, requests, level)
+                    result["api_peak_rss_mb"] = round(peak_rss_mb(server.pid), 1)
+                    result["worker_peak_rss_mb"] = round(max([peak_rss_mb(pid) for pid in child_pids(server.pid)] or [0]), 1)
+                    print({"scenario": scenario, **result})
+                    results.append(result)
+                report["scenarios"].append({"name": scenario, "levels": results})
+
+    try:
+        asyncio.run(run_all())
+    finally:
+        server.terminate()
+        mock.terminate()
+
+    with open(args.output, "w") as out:
+        json.dump(report, out, indent=2)
+    print(f"report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as previous:
+            compare(json.load(previous), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Local mock of the OpenAI-compatible chat completions endpoint.
+
+Run with: uvicorn benchmarks.mock_llm:app --port 9000
+Then point the API at it: TOGETHER_BASE_URL=http://127.0.0.1:9000/v1
+
+Requests with ``"stream": true`` get an SSE stream of chunks: the first one
+after MOCK_LLM_LATENCY seconds, then one every MOCK_LLM_TOKEN_DELAY seconds.
+MOCK_LLM_JITTER adds up to that many seconds of random latency, and a
+MOCK_LLM_ERROR_RATE fraction of requests fail with a 500 or 429 (seeded by
+MOCK_LLM_SEED, so runs are repeatable). A MOCK_LLM_SLOW_RATE fraction take an
+extra MOCK_LLM_SLOW_LATENCY seconds, to simulate tail latency.
+
+The fault settings can be changed while running (e.g. to simulate an outage):
+POST /faults {"error_rate": 1.0}; GET /faults shows the current ones.
+"""
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import asyncio
+import json
+import os
+import random
+import time
+
+# Simulated upstream latency in seconds (time to first token when streaming)
+MOCK_LLM_LATENCY = float(os.environ.get("MOCK_LLM_LATENCY", "0.5"))
+# Delay between streamed tokens in seconds
+MOCK_LLM_TOKEN_DELAY = float(os.environ.get("MOCK_LLM_TOKEN_DELAY", "0.02"))
+# Extra uniform random latency in seconds
+MOCK_LLM_JITTER = float(os.environ.get("MOCK_LLM_JITTER", "0"))
+# Fraction of requests that fail
+MOCK_LLM_ERROR_RATE = float(os.environ.get("MOCK_LLM_ERROR_RATE", "0"))
+# Fraction of requests that are slow, and how much slower
+MOCK_LLM_SLOW_RATE = float(os.environ.get("MOCK_LLM_SLOW_RATE", "0"))
+MOCK_LLM_SLOW_LATENCY = float(os.environ.get("MOCK_LLM_SLOW_LATENCY", "5"))
+
+faults = {
+    "error_rate": MOCK_LLM_ERROR_RATE,
+    "slow_rate": MOCK_LLM_SLOW_RATE,
+    "slow_latency": MOCK_LLM_SLOW_LATENCY,
+}
+
+rng = random.Random(int(os.environ.get("MOCK_LLM_SEED", "0")))
+
+app = FastAPI(title="Mock LLM")
+
+
+def mock_completion_text(body: dict) -> str:
+    prompt = body["messages"][-1]["content"]
+    return " ".join(prompt.split()[-40:])
+
+
+async def stream_chunks(body: dict, content: str, latency: float):
+    await asyncio.sleep(latency)
+    words = content.split(" ")
+    for index, word in enumerate(words):
+        if index:
+            await asyncio.sleep(MOCK_LLM_TOKEN_DELAY)
+        chunk = {
+            "id": "mock-completion",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [
+                {
+                    "index": 0,
+                    "delta": {"content": word if index == 0 else " " + word},
+                    "finish_reason": None,
+                }
+            ],
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    latency = MOCK_LLM_LATENCY + rng.uniform(0, MOCK_LLM_JITTER)
+    if rng.random() < faults["slow_rate"]:
+        latency += faults["slow_latency"]
+    if rng.random() < faults["error_rate"]:
+        await asyncio.sleep(latency)
+        status = rng.choice((429, 500))
+        return JSONResponse({"error": {"message": "mock failure", "code": status}}, status_code=status)
+
+    content = mock_completion_text(body)
+    if body.get("stream"):
+        return StreamingResponse(stream_chunks(body, content, latency), media_type="text/event-stream")
+
+    await asyncio.sleep(latency + MOCK_LLM_TOKEN_DELAY * max(0, len(content.split()) - 1))
+    prompt = body["messages"][-1]["content"]
+    return {
+        "id": "mock-completion",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": len(prompt.split()),
+            "completion_tokens": len(content.split()),
+            "total_tokens": len(prompt.split()) + len(content.split()),
+        },
+    }
+
+
+@app.get("/faults")
+async def get_faults():
+    return faults
+
+
+@app.post("/faults")
+async def set_faults(request: Request):
+    updates = await request.json()
+    unknown = set(updates) - set(faults)
+    if unknown:
+        return JSONResponse({"error": f"unknown fault settings: {sorted(unknown)}"}, status_code=400)
+    faults.update({key: float(value) for key, value in updates.items()})
+    return faults
@@ -0,0 +1,123 @@
+"""Content-addressed caches for extracted text and summaries.
+
+Each cache is an in-process LRU bounded by entry count, total size and TTL,
+optionally backed by a SQLite table so entries survive restarts. Lookups try
+memory first and promote disk hits back into memory.
+"""
+from collections import OrderedDict
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different pastes share a key"""
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def content_hash(*parts) -> str:
+    """Stable sha256 over bytes/str parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        elif not isinstance(part, (bytes, bytearray, memoryview)):
+            part = repr(part).encode("utf-8")
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """LRU of string values with entry, byte and TTL limits"""
+
+    def __init__(self, name: str, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024,
+                 ttl: float = 3600.0, db_path: Optional[str] = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {name} (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            self._db.execute(f"DELETE FROM {name} WHERE expires < ?", (time.time(),))
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (value, _) = self._entries.popitem(last=False)
+            self._bytes -= len(value)
+
+    def _store(self, key: str, value: str, expires: float):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old[0])
+        self._entries[key] = (value, expires)
+        self._bytes += len(value)
+        self._evict()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires >= now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self._bytes -= len(value)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    f"SELECT value, expires FROM {self.name} WHERE key = ? AND expires >= ?", (key, now)
+                ).fetchone()
+                if row is not None:
+                    self._store(key, row[0], row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: str):
+        expires = time.time() + self.ttl
+        with self._lock:
+            if len(value) <= self.max_bytes:
+                self._store(key, value, expires)
+            if self._db is not None:
+                self._db.execute(
+                    f"INSERT OR REPLACE INTO {self.name} (key, value, expires) VALUES (?, ?, ?)",
+                    (key, value, expires),
+                )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,187 @@
+"""Token-budgeted chunking and map-reduce summarization for long documents.
+
+Text is split on paragraph boundaries, then sentences, then words, so that every
+chunk fits the token budget. Chunks are summarized concurrently ("map") and the
+partial summaries are combined in groups of ``fan_out`` ("reduce") until one
+summary is left, so latency grows with tree depth rather than document length.
+
+With ``stable=True`` chunk and group boundaries are content-defined: whether a
+chunk ends after a paragraph depends on a hash of that paragraph, not on how
+much text came before it. An edit then only changes the chunks around it, so
+the partial summaries of the rest of a new version of a document can be
+reused.
+"""
+import asyncio
+import hashlib
+import re
+from typing import Awaitable, Callable, Iterator, List, Tuple
+
+# Rough English average; close enough for budgeting without a tokenizer
+CHARS_PER_TOKEN = 4
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of text"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _split_oversized(piece: str, max_tokens: int) -> List[str]:
+    """Split a piece that is larger than the budget on sentences, then words"""
+    sentences = _SENTENCE_RE.split(piece)
+    if len(sentences) == 1:
+        words = piece.split()
+        if len(words) == 1:
+            step = max_tokens * CHARS_PER_TOKEN
+            return [piece[i:i + step] for i in range(0, len(piece), step)]
+        sentences = words
+    return _pack(sentences, max_tokens, " ")
+
+
+def _pack(pieces: List[str], max_tokens: int, separator: str) -> List[str]:
+    """Greedily pack pieces into chunks of at most max_tokens"""
+    chunks = []
+    current = []
+    current_tokens = 0
+    for piece in pieces:
+        piece = piece.strip()
+        if not piece:
+            continue
+        tokens = estimate_tokens(piece)
+        if tokens > max_tokens:
+            if current:
+                chunks.append(separator.join(current))
+                current, current_tokens = [], 0
+            chunks.extend(_split_oversized(piece, max_tokens))
+            continue
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(separator.join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
+
+
+def split_into_chunks(text: str, max_tokens: int) -> List[str]:
+    """Split text into chunks of at most max_tokens on natural boundaries"""
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    return _pack(_PARAGRAPH_RE.split(text), max_tokens, "\n\n")
+
+
+def _boundary_hash(text: str) -> float:
+    """Uniform value in [0, 1) determined by the text"""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big") / 2 ** 64
+
+
+def _stable_units(text: str, max_tokens: int) -> Iterator[Tuple[str, str]]:
+    """(separator, unit) pairs: paragraphs, or the sentences of paragraphs over budget"""
+    for paragraph in _PARAGRAPH_RE.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= max_tokens:
+            yield "\n\n", paragraph
+            continue
+        separator = "\n\n"
+        for sentence in _SENTENCE_RE.split(paragraph):
+            for piece in _split_oversized(sentence, max_tokens) if estimate_tokens(sentence) > max_tokens else [sentence]:
+                if piece.strip():
+                    yield separator, piece.strip()
+                    separator = " "
+
+
+def _join_units(units: List[Tuple[str, str]]) -> str:
+    return units[0][1] + "".join(separator + unit for separator, unit in units[1:])
+
+
+def split_into_stable_chunks(text: str, max_tokens: int) -> List[str]:
+    """Split text into chunks of at most max_tokens whose boundaries depend on content.
+
+    A chunk ends after a unit with probability proportional to the unit's size
+    once it holds a quarter of the budget, so chunks average about three
+    quarters of it. Boundaries resynchronize right after an edit.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    min_tokens = max_tokens // 4
+    mean_tokens = max_tokens // 2
+    chunks = []
+    current = []
+    current_tokens = 0
+    for separator, unit in _stable_units(text, max_tokens):
+        tokens = estimate_tokens(unit)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(_join_units(current))
+            current, current_tokens = [], 0
+        current.append((separator, unit))
+        current_tokens += tokens
+        if current_tokens >= min_tokens and _boundary_hash(unit) < tokens / mean_tokens:
+            chunks.append(_join_units(current))
+            current, current_tokens = [], 0
+    if current:
+        chunks.append(_join_units(current))
+    return chunks
+
+
+def stable_groups(summaries: List[str], fan_out: int) -> List[List[str]]:
+    """Groups of at most fan_out summaries, ending where the content says to"""
+    groups = []
+    current = []
+    for summary in summaries:
+        current.append(summary)
+        if len(current) == fan_out or (len(current) >= 2 and _boundary_hash(summary) < 2 / fan_out):
+            groups.append(current)
+            current = []
+    if current:
+        groups.append(current)
+    return groups
+
+
+async def reduce_to_final(
+    text: str,
+    summarize_chunk: Callable[[str], Awaitable[str]],
+    combine_summaries: Callable[[str], Awaitable[str]],
+    chunk_tokens: int,
+    fan_out: int,
+    max_depth: int,
+    concurrency: int,
+    stable: bool = False,
+) -> Tuple[bool, str]:
+    """Run every map-reduce step except the last one.
+
+    Returns ``(is_combine, final_input)``: the input for the final call and
+    whether it goes to ``combine_summaries`` (True) or ``summarize_chunk``
+    (False, the text fits in one chunk). Splitting the last call out lets
+    callers stream it. ``stable`` uses content-defined chunks and groups.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(fn, arg):
+        async with semaphore:
+            return await fn(arg)
+
+    async def reduce_group(group):
+        if len(group) == 1:
+            return group[0]
+        return await bounded(combine_summaries, "\n\n".join(group))
+
+    chunks = (split_into_stable_chunks if stable else split_into_chunks)(text, chunk_tokens)
+    if len(chunks) == 1:
+        return False, chunks[0]
+
+    summaries = await asyncio.gather(*(bounded(summarize_chunk, chunk) for chunk in chunks))
+
+    depth = 1
+    while depth < max_depth and len(summaries) > fan_out:
+        if stable:
+            groups = stable_groups(summaries, fan_out)
+        else:
+            groups = [summaries[i:i + fan_out] for i in range(0, len(summaries), fan_out)]
+        summaries = await asyncio.gather(*(reduce_group(group) for group in groups))
+        depth += 1
+    return True, "\n\n".join(summaries)
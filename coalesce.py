@@ -0,0 +1,63 @@
+"""Single-flight coalescing of identical concurrent work.
+
+Callers that ask for the same key while a call for it is already running
+await that call instead of starting their own. The shared call runs as its
+own task: it keeps going while anyone still waits for it, and is cancelled
+once every waiter has gone. Its result or exception is delivered to all of
+them.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[str, _Flight] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]],
+                  cleanup: Optional[Callable[[], None]] = None) -> Any:
+        """Return ``await fn()``, sharing one call among concurrent callers with the same key.
+
+        If this caller starts the call, ``cleanup`` runs once it ends, however it
+        ends (even when it is cancelled before it got to run).
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.create_task(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            if cleanup is not None:
+                flight.task.add_done_callback(lambda _: cleanup())
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # The last waiter went away (e.g. client disconnected)
+                flight.task.cancel()
+                self._forget(key, flight)
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {"started": self.started, "coalesced": self.coalesced, "in_flight": self.in_flight}
@@ -0,0 +1,190 @@
+"""Local extractive pre-compression of long texts before summarization.
+
+Cheap passes first: drop page furniture (page numbers, OCR noise), running
+headers/footers (short lines repeated across pages) and duplicate lines. If
+the text is still over the token budget, sentences are scored by TF-IDF
+similarity to the document centroid and the best are kept, in their original
+order, until the budget is spent.
+
+The same scoring doubles as a local extractive summarizer (the ``extractive``
+summary backend), which also skips sentences that repeat one already chosen.
+"""
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from chunking import estimate_tokens
+
+# Lines this short that repeat this often are running headers/footers
+FURNITURE_MAX_CHARS = 100
+FURNITURE_MIN_REPEATS = 3
+# Extractive summaries skip sentences sharing this much vocabulary with a chosen one
+REDUNDANCY_OVERLAP = 0.6
+
+_PAGE_NUMBER_RE = re.compile(r"^(page\s*)?[-–(\[]?\s*\d+\s*[-–)\]]?(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+_DIGITS_RE = re.compile(r"\d+")
+_SPACE_RE = re.compile(r"\s+")
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_TERM_RE = re.compile(r"[a-z][a-z'-]{2,}")
+
+_STOPWORDS = frozenset(
+    "the and for are but not you all any can had her was one our out has him his how its may new now "
+    "old see two way who did get let say she too use that with have this will your from they been were "
+    "said each which their there what about would these other into more some than them then could when "
+    "also only over such very just most made after where those being should because through".split()
+)
+
+
+def _line_key(line: str) -> str:
+    """Normalize a line so 'Page 3' and 'Page 4' style variants match (for counting furniture only)"""
+    return _DIGITS_RE.sub("#", _SPACE_RE.sub(" ", line.strip().lower()))
+
+
+def _duplicate_key(line: str) -> str:
+    """Normalize whitespace only: lines differing in numbers say different things"""
+    return _SPACE_RE.sub(" ", line.strip().lower())
+
+
+def _is_noise(line: str) -> bool:
+    """Page numbers and lines that are mostly symbols (typical OCR debris).
+
+    Short lines are kept as long as they are mostly letters and digits: headings,
+    one-word list items and clause numbers are text too.
+    """
+    if _PAGE_NUMBER_RE.match(line):
+        return True
+    alnum = sum(char.isalnum() for char in line)
+    return alnum < 0.5 * len(line.replace(" ", ""))
+
+
+def strip_boilerplate(text: str) -> str:
+    """Drop page furniture, repeated short lines and duplicate lines"""
+    lines = [line.strip() for line in text.splitlines()]
+    counts = Counter(_line_key(line) for line in lines if line and len(line) <= FURNITURE_MAX_CHARS)
+
+    kept = []
+    seen = set()
+    for line in lines:
+        if not line:
+            # Keep paragraph breaks, collapsing runs of them
+            if kept and kept[-1]:
+                kept.append("")
+            continue
+        key = _duplicate_key(line)
+        if _is_noise(line) or key in seen:
+            continue
+        if len(line) <= FURNITURE_MAX_CHARS and counts[_line_key(line)] >= FURNITURE_MIN_REPEATS:
+            continue
+        seen.add(key)
+        kept.append(line)
+    return "\n".join(kept).strip()
+
+
+def _terms(sentence: str) -> List[str]:
+    return [term for term in _TERM_RE.findall(sentence.lower()) if term not in _STOPWORDS]
+
+
+def rank_sentences(sentences: List[str]) -> List[float]:
+    """Score sentences by cosine similarity of their TF-IDF vector to the document centroid"""
+    term_counts = [Counter(_terms(sentence)) for sentence in sentences]
+    document_frequency = Counter(term for counts in term_counts for term in counts)
+    total = len(sentences)
+    idf = {term: math.log((1 + total) / (1 + frequency)) + 1 for term, frequency in document_frequency.items()}
+
+    vectors: List[Dict[str, float]] = []
+    centroid: Dict[str, float] = {}
+    for counts in term_counts:
+        vector = {term: (1 + math.log(count)) * idf[term] for term, count in counts.items()}
+        vectors.append(vector)
+        for term, weight in vector.items():
+            centroid[term] = centroid.get(term, 0.0) + weight
+    centroid_norm = math.sqrt(sum(weight * weight for weight in centroid.values())) or 1.0
+
+    scores = []
+    for vector in vectors:
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        if not norm:
+            scores.append(0.0)
+            continue
+        dot = sum(weight * centroid[term] for term, weight in vector.items())
+        scores.append(dot / (norm * centroid_norm))
+    return scores
+
+
+def _sentence_units(text: str) -> List[Tuple[int, str]]:
+    """(paragraph index, sentence) for every sentence of a text"""
+    units: List[Tuple[int, str]] = []
+    for paragraph_index, paragraph in enumerate(_PARAGRAPH_RE.split(text)):
+        for sentence in _SENTENCE_RE.split(paragraph.replace("\n", " ")):
+            sentence = sentence.strip()
+            if sentence:
+                units.append((paragraph_index, sentence))
+    return units
+
+
+def select_sentences(text: str, max_tokens: int) -> str:
+    """Keep the highest-ranked sentences that fit max_tokens, in document order"""
+    units = _sentence_units(text)
+    if not units:
+        return text
+
+    scores = rank_sentences([sentence for _, sentence in units])
+    chosen = set()
+    budget = max_tokens
+    for index in sorted(range(len(units)), key=lambda i: scores[i], reverse=True):
+        tokens = estimate_tokens(units[index][1]) + 1
+        if tokens <= budget:
+            chosen.add(index)
+            budget -= tokens
+
+    paragraphs: List[List[str]] = []
+    last_paragraph = None
+    for index in sorted(chosen):
+        paragraph_index, sentence = units[index]
+        if paragraph_index != last_paragraph:
+            paragraphs.append([])
+            last_paragraph = paragraph_index
+        paragraphs[-1].append(sentence)
+    return "\n\n".join(" ".join(sentences) for sentences in paragraphs)
+
+
+def compress_text(text: str, max_tokens: int) -> str:
+    """Strip boilerplate, then extract the top sentences if still over max_tokens"""
+    text = strip_boilerplate(text)
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    return select_sentences(text, max_tokens)
+
+
+def extractive_summary(text: str, max_words: int) -> str:
+    """A summary of about max_words made of the text's most central sentences.
+
+    Sentences are taken best first, skipping any that mostly repeat a chosen
+    one, and returned in document order. Runs locally in milliseconds.
+    """
+    sentences = [sentence for _, sentence in _sentence_units(strip_boilerplate(text))]
+    if not sentences:
+        return text.strip()
+
+    scores = rank_sentences(sentences)
+    chosen: List[int] = []
+    chosen_terms: List[set] = []
+    budget = max_words
+    for index in sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True):
+        words = len(sentences[index].split())
+        if words > budget:
+            continue
+        terms = set(_terms(sentences[index]))
+        if any(len(terms & other) > REDUNDANCY_OVERLAP * min(len(terms), len(other)) for other in chosen_terms):
+            continue
+        chosen.append(index)
+        chosen_terms.append(terms)
+        budget -= words
+        if budget < 5:
+            break
+    if not chosen:
+        # Every sentence is longer than the budget: cut the best one down
+        return " ".join(sentences[max(range(len(sentences)), key=lambda i: scores[i])].split()[:max_words])
+    return " ".join(sentences[index] for index in sorted(chosen))
@@ -0,0 +1,102 @@
+"""Pluggable executor for CPU-bound extraction work.
+
+Keeps PyPDF2/python-docx/Tesseract off the event loop. The executor admits at
+most ``max_workers + max_queue`` jobs at once; anything beyond that is rejected
+immediately so the API can answer 429 instead of piling up work.
+"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import multiprocessing
+import os
+import threading
+from typing import Optional
+
+
+class ExecutorSaturated(Exception):
+    """Raised when the pool and its queue are full"""
+
+
+class ExecutorTimeout(Exception):
+    """Raised when a job exceeds the per-job timeout"""
+
+
+class ExtractionExecutor:
+    """Runs blocking functions in a process pool, a thread pool or inline.
+
+    ``kind`` is one of ``"process"``, ``"thread"`` or ``"inline"``. Inline mode
+    runs the function on the event loop and exists for debugging and for
+    benchmarking the old behaviour.
+    """
+
+    def __init__(self, kind: str = "process", max_workers: Optional[int] = None,
+                 max_queue: int = 16, timeout: float = 120.0):
+        if kind not in ("process", "thread", "inline"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._pool = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_pool(self):
+        if self._pool is None:
+            if self.kind == "process":
+                # spawn keeps children free of the parent's threads and event loop
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run(self, fn, *args):
+        """Run ``fn(*args)`` on the pool and await its result"""
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                raise ExecutorSaturated(f"Extraction queue is full ({self.capacity} jobs)")
+            self._in_flight += 1
+
+        if self.kind == "inline":
+            try:
+                return fn(*args)
+            finally:
+                self._release()
+
+        try:
+            future = self._get_pool().submit(fn, *args)
+        except BrokenProcessPool:
+            self._release()
+            self._pool = None
+            raise
+        # The slot is only freed once the pool is really done with the job, so a
+        # timed-out job that is still running keeps counting against capacity.
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            raise ExecutorTimeout(f"Extraction took longer than {self.timeout:g}s")
+        except BrokenProcessPool:
+            self._pool = None
+            raise
+
+    def shutdown(self, wait: bool = False):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
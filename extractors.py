@@ -0,0 +1,355 @@
+"""Text extractors for uploaded files.
+
+These run inside the extraction executor's worker processes, so they must stay
+importable without the FastAPI app and only raise plain (picklable) exceptions.
+They take a path to the spooled upload rather than its bytes, so nothing large
+has to be pickled across the process boundary.
+
+PyPDF2, Pillow and pytesseract are imported by the functions that need them,
+so importing this module (and starting a worker that only reads DOCX or serves
+text) stays cheap.
+"""
+import hashlib
+import os
+import posixpath
+import shutil
+import subprocess
+import tempfile
+import zipfile
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+from xml.etree.ElementTree import XMLPullParser
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# WordprocessingML namespaces used by the DOCX reader
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+R_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+DOCX_READ_SIZE = 64 * 1024
+
+# Page entries that don't change a PDF page's extracted text, left out of its fingerprint
+PDF_FINGERPRINT_SKIPPED_KEYS = {"/Parent", "/FontFile", "/FontFile2", "/FontFile3", "/Thumb", "/Metadata"}
+
+# Local tools for legacy .doc, tried in order; the first one installed is used
+DOC_CONVERTERS = ("antiword", "catdoc", "soffice")
+DOC_CONVERTER_TIMEOUT = 120
+
+# Defaults for the OCR stage; callers can override any of them per request
+OCR_DEFAULTS = {
+    "lang": "eng",
+    "psm": 3,
+    "oem": 3,
+    "target_dpi": 300,
+    "max_side": 4000,
+    "binarize": False,
+}
+
+
+def count_pdf_pages(path: str) -> int:
+    """Number of pages in a PDF file"""
+    import PyPDF2
+
+    with open(path, "rb") as pdf_file:
+        return len(PyPDF2.PdfReader(pdf_file).pages)
+
+def extract_pdf_pages(path: str, start: int, stop: int, max_chars: Optional[int] = None) -> List[str]:
+    """Extract text of pages [start, stop) from a PDF file, one string per page.
+
+    Stops early once ``max_chars`` characters have been collected.
+    """
+    import PyPDF2
+
+    pages = []
+    chars = 0
+    with open(path, "rb") as pdf_file:
+        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        for index in range(start, min(stop, len(pdf_reader.pages))):
+            text = pdf_reader.pages[index].extract_text()
+            pages.append(text)
+            chars += len(text) + 1
+            if max_chars is not None and chars >= max_chars:
+                break
+    return pages
+
+def _pdf_digest(obj, memo: dict) -> bytes:
+    """Digest of a PDF object's content, following references.
+
+    Referenced objects (fonts, form XObjects) are digested once per call and
+    by content, so the same page in two files gets the same digest.
+    """
+    from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+
+    if isinstance(obj, IndirectObject):
+        ref = (obj.idnum, obj.generation)
+        if ref not in memo:
+            memo[ref] = b"cycle"
+            memo[ref] = _pdf_digest(obj.get_object(), memo)
+        return memo[ref]
+    digest = hashlib.sha256(type(obj).__name__.encode())
+    if isinstance(obj, DictionaryObject):
+        for key in sorted(obj):
+            if key not in PDF_FINGERPRINT_SKIPPED_KEYS:
+                digest.update(key.encode("utf-8", "replace"))
+                digest.update(_pdf_digest(obj.raw_get(key), memo))
+        # Image data never changes the text
+        if isinstance(obj, StreamObject) and obj.get("/Subtype") != "/Image":
+            digest.update(obj.get_data())
+    elif isinstance(obj, ArrayObject):
+        for item in obj:
+            digest.update(_pdf_digest(item, memo))
+    else:
+        digest.update(repr(obj).encode("utf-8", "replace"))
+    return digest.digest()
+
+def pdf_page_fingerprints(path: str, start: int, stop: int) -> List[str]:
+    """Fingerprints of pages [start, stop) of a PDF file; pages with equal ones extract to equal text.
+
+    Hashes each page's content streams, resources (fonts, encodings, forms)
+    and rotation, which is far cheaper than extracting the text.
+    """
+    import PyPDF2
+
+    memo = {}
+    fingerprints = []
+    with open(path, "rb") as pdf_file:
+        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        for index in range(start, min(stop, len(pdf_reader.pages))):
+            page = pdf_reader.pages[index]
+            digest = hashlib.sha256()
+            for key in ("/Contents", "/Resources", "/Rotate"):
+                if key in page:
+                    digest.update(key.encode())
+                    digest.update(_pdf_digest(page.raw_get(key), memo))
+            fingerprints.append(digest.hexdigest())
+    return fingerprints
+
+def extract_text_from_pdf(path: str) -> str:
+    """Extract text from PDF file"""
+    return "\n".join(extract_pdf_pages(path, 0, count_pdf_pages(path))).strip()
+
+def iter_docx_blocks(stream) -> Iterator[str]:
+    """Yield the text of each paragraph and table row in a WordprocessingML part.
+
+    The XML is fed to a pull parser in small reads and every finished block is
+    cleared, so memory stays flat however long the document is. Table rows come
+    out as tab separated cells, in reading order with the paragraphs around them.
+    """
+    parser = XMLPullParser(events=("start", "end"))
+    runs: List[str] = []
+    # One entry per open table cell (nested tables included): its paragraphs
+    cells: List[List[str]] = []
+    rows: List[List[str]] = []
+    containers = []
+    while True:
+        data = stream.read(DOCX_READ_SIZE)
+        if data:
+            parser.feed(data)
+        else:
+            parser.close()
+        for event, element in parser.read_events():
+            tag = element.tag
+            if event == "start":
+                if tag in (W_NS + "body", W_NS + "hdr", W_NS + "ftr"):
+                    containers.append(element)
+                elif tag == W_NS + "tr":
+                    rows.append([])
+                elif tag == W_NS + "tc":
+                    cells.append([])
+                continue
+
+            if tag == W_NS + "t":
+                runs.append(element.text or "")
+            elif tag == W_NS + "tab":
+                runs.append("\t")
+            elif tag in (W_NS + "br", W_NS + "cr"):
+                runs.append("\n")
+            elif tag == W_NS + "p":
+                text = "".join(runs)
+                runs.clear()
+                if cells:
+                    cells[-1].append(text)
+                else:
+                    yield text
+            elif tag == W_NS + "tc":
+                cell = cells.pop()
+                rows[-1].append(" ".join(part for part in cell if part))
+            elif tag == W_NS + "tr":
+                row = "\t".join(rows.pop())
+                if cells:
+                    cells[-1].append(row)
+                else:
+                    yield row
+            else:
+                continue
+            # Drop finished blocks so the tree never holds more than one of them
+            if tag in (W_NS + "p", W_NS + "tbl") and containers:
+                if element in containers[-1]:
+                    containers[-1].remove(element)
+                else:
+                    element.clear()
+        if not data:
+            return
+
+def _docx_related_parts(archive: zipfile.ZipFile, kind: str) -> List[str]:
+    """Zip names of the header or footer parts related to word/document.xml"""
+    try:
+        rels = archive.read("word/_rels/document.xml.rels")
+    except KeyError:
+        return []
+    parser = XMLPullParser(events=("end",))
+    parser.feed(rels)
+    parser.close()
+    parts = []
+    for _, element in parser.read_events():
+        if element.tag == REL_NS + "Relationship" and element.get("Type", "").endswith("/" + kind):
+            target = element.get("Target", "")
+            name = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("word", target))
+            if name in archive.namelist() and name not in parts:
+                parts.append(name)
+    return parts
+
+def _docx_part_text(archive: zipfile.ZipFile, names: List[str]) -> List[str]:
+    """Text of header or footer parts, skipping repeats of the same text"""
+    texts: List[str] = []
+    for name in names:
+        with archive.open(name) as stream:
+            text = "\n".join(block for block in iter_docx_blocks(stream) if block).strip()
+        if text and text not in texts:
+            texts.append(text)
+    return texts
+
+def extract_text_from_docx(path: str, max_chars: Optional[int] = None) -> str:
+    """Extract text from DOCX file: headers, body paragraphs and tables, footers.
+
+    Reads word/document.xml straight from the zip instead of building the
+    python-docx object model. Stops early once ``max_chars`` characters of body
+    text have been collected.
+    """
+    with zipfile.ZipFile(path) as archive:
+        blocks = _docx_part_text(archive, _docx_related_parts(archive, "header"))
+        chars = sum(len(block) + 1 for block in blocks)
+        with archive.open("word/document.xml") as stream:
+            for block in iter_docx_blocks(stream):
+                blocks.append(block)
+                chars += len(block) + 1
+                if max_chars is not None and chars >= max_chars:
+                    break
+        blocks.extend(_docx_part_text(archive, _docx_related_parts(archive, "footer")))
+    return "\n".join(blocks).strip()
+
+def find_doc_converter() -> Optional[str]:
+    """Name of the first installed .doc converter, honouring DOC_CONVERTER"""
+    preferred = os.environ.get("DOC_CONVERTER")
+    for name in ((preferred,) if preferred else DOC_CONVERTERS):
+        if shutil.which(name):
+            return name
+    return None
+
+def extract_text_from_doc(path: str, max_chars: Optional[int] = None) -> str:
+    """Extract text from a legacy Word .doc file with a local converter.
+
+    Files that are really DOCX under a .doc name are read directly. Otherwise
+    antiword or catdoc print the text, or LibreOffice converts to DOCX first.
+    """
+    if zipfile.is_zipfile(path):
+        return extract_text_from_docx(path, max_chars=max_chars)
+    converter = find_doc_converter()
+    if converter is None:
+        raise RuntimeError(
+            "No converter for legacy .doc files is installed "
+            f"(tried {', '.join(DOC_CONVERTERS)}); install one or upload the file as .docx"
+        )
+
+    if converter == "soffice":
+        with tempfile.TemporaryDirectory() as outdir:
+            subprocess.run(
+                [converter, "--headless", "--convert-to", "docx", "--outdir", outdir, path],
+                check=True, capture_output=True, timeout=DOC_CONVERTER_TIMEOUT,
+            )
+            converted = os.path.join(outdir, os.path.splitext(os.path.basename(path))[0] + ".docx")
+            if not os.path.exists(converted):
+                raise RuntimeError("LibreOffice did not produce a .docx file")
+            return extract_text_from_docx(converted, max_chars=max_chars)
+
+    args = [converter, "-w", "0", path] if converter == "antiword" else [converter, "-w", path]
+    result = subprocess.run(args, capture_output=True, timeout=DOC_CONVERTER_TIMEOUT)
+    if result.returncode != 0:
+        error = result.stderr.decode("utf-8", "replace").strip() or f"{converter} exited with {result.returncode}"
+        raise RuntimeError(error)
+    text = result.stdout.decode("utf-8", "replace").strip()
+    return text[:max_chars] if max_chars else text
+
+def preprocess_image(image: "Image.Image", target_dpi: int, max_side: int, binarize: bool) -> "Image.Image":
+    """Downscale an image to at most target_dpi and max_side pixels, then grayscale it"""
+    from PIL import Image, ImageOps
+
+    scale = 1.0
+    dpi = image.info.get("dpi")
+    if dpi and dpi[0] and dpi[0] > target_dpi:
+        scale = target_dpi / float(dpi[0])
+    longest = max(image.size) * scale
+    if longest > max_side:
+        scale *= max_side / longest
+    size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+
+    if scale < 1.0:
+        # JPEG can decode straight at a reduced scale, which is much cheaper
+        image.draft("L", size)
+        if image.size != size:
+            image = image.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+    image = ImageOps.autocontrast(ImageOps.grayscale(image))
+    if binarize:
+        image = image.point(lambda value: 255 if value > 127 else 0)
+    return image
+
+def count_image_frames(path: str) -> int:
+    """Number of frames in an image (pages of a TIFF, frames of a GIF)"""
+    from PIL import Image
+
+    with Image.open(path) as image:
+        return getattr(image, "n_frames", 1)
+
+def ocr_image_frames(path: str, start: int, stop: int, max_chars: Optional[int] = None,
+                     settings: Optional[dict] = None) -> List[str]:
+    """OCR frames [start, stop) of an image, one string per frame"""
+    from PIL import Image
+    import pytesseract
+
+    settings = {**OCR_DEFAULTS, **(settings or {})}
+    # Frames are already OCR'd in parallel processes; keep Tesseract single-threaded
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    config = f"--psm {int(settings['psm'])} --oem {int(settings['oem'])}"
+    texts = []
+    chars = 0
+    with Image.open(path) as image:
+        for index in range(start, min(stop, getattr(image, "n_frames", 1))):
+            image.seek(index)
+            frame = preprocess_image(image, settings["target_dpi"], settings["max_side"], settings["binarize"])
+            text = pytesseract.image_to_string(frame, lang=settings["lang"], config=config).strip()
+            texts.append(text)
+            chars += len(text) + 1
+            if max_chars is not None and chars >= max_chars:
+                break
+    return texts
+
+def extract_text_from_image(path: str, settings: Optional[dict] = None) -> str:
+    """Extract text from image using OCR"""
+    return "\n".join(ocr_image_frames(path, 0, count_image_frames(path), settings=settings)).strip()
+
+def warm_up() -> Dict[str, Optional[str]]:
+    """Import the extraction libraries and probe Tesseract; run once per worker at startup.
+
+    Returns the Tesseract version, or the reason it is unavailable, so the
+    caller can report it instead of finding out on the first image upload.
+    """
+    # Loading these is most of a cold worker's first extraction
+    import PyPDF2
+    from PIL import Image
+    import pytesseract
+
+    try:
+        return {"tesseract": str(pytesseract.get_tesseract_version()), "error": None}
+    except Exception as e:
+        return {"tesseract": None, "error": str(e) or type(e).__name__}
@@ -0,0 +1,136 @@
+"""Job worker: claims file summarization jobs from the SQLite queue and runs them.
+
+The API starts JOB_WORKERS of these itself; more can be run by hand on the same
+host (they share JOB_DIR) to work through a backlog faster:
+
+    python job_worker.py [--processes 4]
+
+Each process runs up to JOB_WORKER_CONCURRENCY jobs at once, reusing the API's
+extraction and summarization pipeline (and so its caches and LLM settings). Jobs
+go through the process's admission control as bulk requests of their client.
+On SIGTERM/SIGINT, unfinished jobs are handed back to the queue.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+
+from fastapi import HTTPException
+
+# One extraction thread per job is enough here; parallelism comes from running more workers
+os.environ.setdefault("EXTRACTION_EXECUTOR", "thread")
+
+import main as api
+
+PURGE_INTERVAL = 60.0
+
+
+async def run_job(job: dict, worker: str):
+    """Extract and summarize one job's file, recording progress and the outcome in the queue"""
+    queue = api.job_queue
+    job_id = job["id"]
+    payload = job["payload"]
+    try:
+        options = api.SummaryOptions(**payload["summary"])
+        caller = api.Caller(client=payload.get("client", "jobs"), priority="bulk")
+        with await api.admit(caller, options, wait=True):
+            queue.progress(job_id, worker, "extracting", {"filename": payload["filename"]})
+            while True:
+                try:
+                    text = await api.extract_file_text(
+                        payload["filename"], payload["path"], payload["digest"],
+                        api.ExtractionOptions(**payload["extraction"]),
+                    )
+                    break
+                except HTTPException as e:
+                    # Wait for extraction capacity rather than failing the job
+                    if e.status_code != 429:
+                        raise
+                    await asyncio.sleep(0.5)
+            queue.progress(job_id, worker, "summarizing", {"original_length": len(text)})
+            summary = await api.get_summary(text, options)
+        queue.finish(job_id, worker, result=summary.response_fields(len(text)))
+    except HTTPException as e:
+        queue.finish(job_id, worker, error=str(e.detail), status_code=e.status_code)
+    except Exception as e:
+        queue.finish(job_id, worker, error=str(e), status_code=500)
+    # A cancelled job never gets here, so its upload stays for the next attempt
+    remove_file(payload["path"])
+
+
+async def keep_lease(job_id: str, worker: str, task: asyncio.Task):
+    """Renew the job's lease while it runs; stop the job if another worker took it over"""
+    while not task.done():
+        await asyncio.sleep(api.job_queue.lease / 3)
+        if not api.job_queue.renew(job_id, worker):
+            task.cancel()
+
+
+def remove_file(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+async def work(worker: str):
+    queue = api.job_queue
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+
+    running = {}
+    last_purge = 0.0
+    while not stop.is_set():
+        if loop.time() - last_purge > PURGE_INTERVAL:
+            for payload in queue.purge(api.JOB_TTL):
+                remove_file(payload["path"])
+            last_purge = loop.time()
+
+        job = queue.claim(worker) if len(running) < api.JOB_WORKER_CONCURRENCY else None
+        if job is not None:
+            task = asyncio.create_task(run_job(job, worker))
+            running[job["id"]] = task
+            asyncio.create_task(keep_lease(job["id"], worker, task))
+            task.add_done_callback(lambda _, job_id=job["id"]: running.pop(job_id, None))
+            continue
+        try:
+            await asyncio.wait_for(stop.wait(), api.JOB_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+    for task in running.values():
+        task.cancel()
+    unfinished = list(running)
+    await asyncio.gather(*running.values(), return_exceptions=True)
+    for job_id in unfinished:
+        queue.release(job_id, worker)
+    queue.close()
+
+
+def run_processes(count: int):
+    """Run ``count`` worker processes and stop them all on SIGTERM/SIGINT"""
+    processes = [subprocess.Popen([sys.executable, os.path.abspath(__file__)]) for _ in range(count)]
+
+    def stop(signum, frame):
+        for process in processes:
+            process.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for process in processes:
+        process.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run job workers against the SQLite job queue")
+    parser.add_argument("--processes", type=int, default=1, help="worker processes to run")
+    args = parser.parse_args()
+    if args.processes > 1:
+        run_processes(args.processes)
+    else:
+        asyncio.run(work(f"{socket.gethostname()}:{os.getpid()}"))
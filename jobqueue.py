@@ -0,0 +1,256 @@
+"""Durable SQLite job queue shared by the API and the job workers.
+
+Jobs and their progress events live in one SQLite file (WAL mode), so any
+number of API and worker processes on the host can use the queue at once and
+nothing is lost on restart. A worker claims a job with a lease and renews it
+while working; if the worker dies, the lease runs out and another worker picks
+the job up again, until ``max_attempts`` is reached.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    status_code INTEGER
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created);
+CREATE TABLE IF NOT EXISTS job_events (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    created REAL NOT NULL,
+    event TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+
+class JobQueue:
+    def __init__(self, db_path: str, lease: float = 60.0, max_attempts: int = 3):
+        self.db_path = db_path
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        """The connection, opened (creating its directory) on first use; callers hold the lock"""
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None, timeout=30)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(_SCHEMA)
+            self._connection = db
+        return self._connection
+
+    def _add_event(self, job_id: str, event: str, data: Dict[str, Any], now: float):
+        self._db.execute(
+            "INSERT INTO job_events (job_id, seq, created, event, data) "
+            "SELECT ?, COALESCE(MAX(seq), 0) + 1, ?, ?, ? FROM job_events WHERE job_id = ?",
+            (job_id, now, event, json.dumps(data), job_id),
+        )
+
+    def enqueue(self, payload: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "INSERT INTO jobs (id, status, created, updated, payload) VALUES (?, 'queued', ?, ?, ?)",
+                    (job_id, now, now, json.dumps(payload)),
+                )
+                self._add_event(job_id, "queued", {}, now)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return job_id
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """Take the oldest queued job (or one whose lease ran out); None when there is none"""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                # Give up on jobs that keep losing their worker
+                expired = self._db.execute(
+                    "SELECT id FROM jobs WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                    (now, self.max_attempts),
+                ).fetchall()
+                for row in expired:
+                    self._finish(row["id"], "failed", None, "Job abandoned by its worker too many times", 500, now)
+                row = self._db.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' OR (status = 'running' AND lease_until < ?) "
+                    "ORDER BY created LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1, "
+                        "updated = ? WHERE id = ?",
+                        (worker, now + self.lease, now, row["id"]),
+                    )
+                    self._add_event(row["id"], "started", {"worker": worker, "attempt": row["attempts"] + 1}, now)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return {"id": row["id"], "payload": json.loads(row["payload"]), "attempt": row["attempts"] + 1}
+
+    def renew(self, job_id: str, worker: str) -> bool:
+        """Extend the worker's lease on a job; False if the job is no longer this worker's"""
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (now + self.lease, job_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def progress(self, job_id: str, worker: str, event: str, data: Optional[Dict[str, Any]] = None) -> bool:
+        """Record a progress event and renew the lease; False if the job is no longer this worker's"""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._db.execute(
+                    "UPDATE jobs SET lease_until = ?, updated = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                    (now + self.lease, now, job_id, worker),
+                )
+                owned = cursor.rowcount == 1
+                if owned:
+                    self._add_event(job_id, event, data or {}, now)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return owned
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]], error: Optional[str],
+                status_code: int, now: float):
+        self._db.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, status_code = ?, lease_until = NULL, updated = ? "
+            "WHERE id = ?",
+            (status, json.dumps(result) if result is not None else None, error, status_code, now, job_id),
+        )
+        data = {"status_code": status_code}
+        if error is not None:
+            data["detail"] = error
+        self._add_event(job_id, status, data, now)
+
+    def finish(self, job_id: str, worker: str, result: Optional[Dict[str, Any]] = None,
+               error: Optional[str] = None, status_code: int = 200) -> bool:
+        """Mark the worker's job completed (with result) or failed (with error)"""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                owned = self._db.execute(
+                    "SELECT 1 FROM jobs WHERE id = ? AND worker = ? AND status = 'running'", (job_id, worker)
+                ).fetchone() is not None
+                if owned:
+                    self._finish(job_id, "failed" if error is not None else "completed", result, error, status_code, now)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return owned
+
+    def release(self, job_id: str, worker: str):
+        """Hand a job back to the queue (e.g. on worker shutdown) without counting the attempt"""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL, lease_until = NULL, attempts = attempts - 1, "
+                "updated = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (now, job_id, worker),
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            position = None
+            if row["status"] == "queued":
+                position = self._db.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created < ?", (row["created"],)
+                ).fetchone()[0]
+            last = self._db.execute(
+                "SELECT event, data FROM job_events WHERE job_id = ? ORDER BY seq DESC LIMIT 1", (job_id,)
+            ).fetchone()
+        return {
+            "job_id": row["id"],
+            "status": row["status"],
+            "created": row["created"],
+            "updated": row["updated"],
+            "attempts": row["attempts"],
+            "queue_position": position,
+            "progress": {"event": last["event"], **json.loads(last["data"])} if last else None,
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "status_code": row["status_code"],
+        }
+
+    def events(self, job_id: str, after: int = 0) -> List[Dict[str, Any]]:
+        """Progress events with sequence numbers above ``after``"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, created, event, data FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+                (job_id, after),
+            ).fetchall()
+        return [{"seq": row["seq"], "created": row["created"], "event": row["event"], **json.loads(row["data"])} for row in rows]
+
+    def purge(self, ttl: float) -> List[Dict[str, Any]]:
+        """Delete jobs that finished more than ``ttl`` seconds ago; returns their payloads"""
+        cutoff = time.time() - ttl
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    "SELECT id, payload FROM jobs WHERE status IN ('completed', 'failed') AND updated < ?", (cutoff,)
+                ).fetchall()
+                for row in rows:
+                    self._db.execute("DELETE FROM job_events WHERE job_id = ?", (row["id"],))
+                    self._db.execute("DELETE FROM jobs WHERE id = ?", (row["id"],))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return [json.loads(row["payload"]) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in ("queued", "running") + TERMINAL_STATUSES}
+        counts.update({row["status"]: row["n"] for row in rows})
+        return counts
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -1,19 +1,378 @@
-from fastapi import FastAPI, Form, File, UploadFile, HTTPException
+from fastapi import FastAPI, Depends, Form, File, Header, Request, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+import asyncio
+import json
+import math
 import os
-import openai
-import PyPDF2
-import docx
-from PIL import Image
-import pytesseract
-import io
+import shutil
+import subprocess
+import sys
+import time
+import httpx
 import base64
-from typing import Optional
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from admission import AdmissionController, Overloaded, RateLimited, Ticket
+from extractors import extract_text_from_doc, extract_text_from_docx, warm_up as warm_up_extractors
+from pipelines import extract_image, extract_pdf, extract_pdf_incremental
+from executor import ExtractionExecutor, ExecutorSaturated, ExecutorTimeout
+from backends import ExtractiveBackend, SummaryBackend
+from chunking import estimate_tokens, reduce_to_final
+from compress import compress_text
+from cache import LRUCache, content_hash, normalize_text
+from coalesce import SingleFlight
+from neardup import NearDuplicateIndex, simhash
+from resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded, Resilience, UpstreamTimeout, deadline_scope
+from routing import Route, Router
+from batch import BatchJob, BatchJobStore
+from jobqueue import TERMINAL_STATUSES, JobQueue
+from uploads import RequestSizeLimitMiddleware, spool_upload
+from metrics import ADMISSION_QUEUE_WAIT, LLM_IN_FLIGHT, LLM_ROUTES, LLM_TIME_TO_FIRST_TOKEN, LLM_TOKENS, SUMMARIES, MetricsMiddleware, registry, timed
 
+if TYPE_CHECKING:
+    import openai
 
+# Set up Together AI API
+os.environ["TOGETHER_API_KEY"] = "YOUR_API_KEY"
+
+# Prompt settings (models and output lengths come from the routing table)
+LLM_SYSTEM_PROMPT = "You are a professional summarizer assistant. Provide a concise and informative summary of the given text. Focus on key points and main ideas. Only provide the summary with no additional content."
+LLM_TEMPERATURE = 0.3
+CHUNK_PROMPT = "Please summarize the following text in about {words} words:\n\n{text}"
+COMBINE_PROMPT = "The following are summaries of consecutive parts of one document. Combine them into a single summary of about {words} words:\n\n{text}"
+
+# Model routing table (JSON file, re-read when it changes; built-in tiers when unset)
+LLM_ROUTES_PATH = os.environ.get("LLM_ROUTES_PATH") or None
+
+router = Router(LLM_ROUTES_PATH)
+
+# LLM client settings (one shared connection pool per worker)
+LLM_BASE_URL = os.environ.get("TOGETHER_BASE_URL", "https://api.together.xyz/v1")
+LLM_MAX_CONNECTIONS = int(os.environ.get("LLM_MAX_CONNECTIONS", "200"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("LLM_MAX_KEEPALIVE_CONNECTIONS", "50"))
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "256"))
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", "60"))
+LLM_CONNECT_TIMEOUT = float(os.environ.get("LLM_CONNECT_TIMEOUT", "10"))
+
+http_client = httpx.AsyncClient(
+    limits=httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+    ),
+    timeout=httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+)
+
+# The openai package is slow to import, so the client is built on first use (or by warm-up)
+client: Optional["openai.AsyncOpenAI"] = None
+
+# Clients for routes on other endpoints, sharing the connection pool
+route_clients: Dict[Tuple[str, str], "openai.AsyncOpenAI"] = {}
+
+def get_client() -> "openai.AsyncOpenAI":
+    """The default LLM client, created on first use"""
+    global client
+    if client is None:
+        import openai
+
+        client = openai.AsyncOpenAI(
+            api_key=os.environ.get("TOGETHER_API_KEY"),
+            base_url=LLM_BASE_URL,
+            http_client=http_client,
+            max_retries=0,  # retried by llm_resilience instead
+        )
+    return client
+
+def client_for(route: Route) -> "openai.AsyncOpenAI":
+    """The client for a route's endpoint (the default client unless it names its own)"""
+    if route.base_url is None and route.api_key_env is None:
+        return get_client()
+    key = (route.base_url or LLM_BASE_URL, route.api_key_env or "TOGETHER_API_KEY")
+    if key not in route_clients:
+        import openai
+
+        route_clients[key] = openai.AsyncOpenAI(
+            api_key=os.environ.get(key[1]),
+            base_url=key[0],
+            http_client=http_client,
+            max_retries=0,
+        )
+    return route_clients[key]
+
+# Upstream resilience: jittered retries, optional hedging, circuit breaker, per-request deadline
+LLM_RETRIES = int(os.environ.get("LLM_RETRIES", "2"))
+LLM_BACKOFF_BASE = float(os.environ.get("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.environ.get("LLM_BACKOFF_MAX", "8"))
+LLM_HEDGE = os.environ.get("LLM_HEDGE", "false").lower() == "true"
+LLM_HEDGE_PERCENTILE = float(os.environ.get("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_MIN_DELAY = float(os.environ.get("LLM_HEDGE_MIN_DELAY", "1"))
+LLM_BREAKER_FAILURES = int(os.environ.get("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET = float(os.environ.get("LLM_BREAKER_RESET", "30"))
+LLM_REQUEST_DEADLINE = float(os.environ.get("LLM_REQUEST_DEADLINE", "120"))
+
+def llm_error_is_retryable(e: BaseException) -> bool:
+    """Connection errors, timeouts, 429s and 5xx responses are worth another attempt"""
+    import openai
+
+    return isinstance(e, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError))
+
+def llm_retry_after(e: BaseException) -> Optional[float]:
+    """Seconds from the upstream Retry-After header, if it sent one"""
+    response = getattr(e, "response", None)
+    try:
+        return float(response.headers["retry-after"]) if response is not None else None
+    except (KeyError, ValueError):
+        return None
+
+llm_resilience = Resilience(
+    is_retryable=llm_error_is_retryable,
+    retry_after=llm_retry_after,
+    retries=LLM_RETRIES,
+    backoff_base=LLM_BACKOFF_BASE,
+    backoff_max=LLM_BACKOFF_MAX,
+    hedge=LLM_HEDGE,
+    hedge_percentile=LLM_HEDGE_PERCENTILE,
+    hedge_min_delay=LLM_HEDGE_MIN_DELAY,
+    breaker=CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_RESET),
+    default_timeout=LLM_TIMEOUT,
+)
+
+# Caps in-flight upstream calls so a burst queues here instead of in the pool
+llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
+# Extraction executor settings (PDF/DOCX/OCR run off the event loop)
+EXTRACTION_EXECUTOR = os.environ.get("EXTRACTION_EXECUTOR", "process")
+EXTRACTION_WORKERS = int(os.environ.get("EXTRACTION_WORKERS", str(os.cpu_count() or 1)))
+EXTRACTION_QUEUE_SIZE = int(os.environ.get("EXTRACTION_QUEUE_SIZE", "16"))
+EXTRACTION_TIMEOUT = float(os.environ.get("EXTRACTION_TIMEOUT", "120"))
+
+extraction_executor = ExtractionExecutor(
+    kind=EXTRACTION_EXECUTOR,
+    max_workers=EXTRACTION_WORKERS,
+    max_queue=EXTRACTION_QUEUE_SIZE,
+    timeout=EXTRACTION_TIMEOUT,
+)
+
+# Uploads are spooled to temp files in chunks; workers open them by path
+UPLOAD_TMP_DIR = os.environ.get("UPLOAD_TMP_DIR") or None
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Upload size limits in MB, per file type and per request body
+FILE_TYPES = {
+    'pdf': 'pdf',
+    'docx': 'docx', 'doc': 'doc',
+    'png': 'image', 'jpg': 'image', 'jpeg': 'image', 'gif': 'image', 'bmp': 'image', 'tiff': 'image',
+}
+UPLOAD_MAX_BYTES = {
+    'pdf': int(os.environ.get("UPLOAD_MAX_MB_PDF", "50")) * 1024 * 1024,
+    'docx': int(os.environ.get("UPLOAD_MAX_MB_DOCX", "20")) * 1024 * 1024,
+    'doc': int(os.environ.get("UPLOAD_MAX_MB_DOCX", "20")) * 1024 * 1024,
+    'image': int(os.environ.get("UPLOAD_MAX_MB_IMAGE", "20")) * 1024 * 1024,
+}
+UPLOAD_MAX_REQUEST_BYTES = int(os.environ.get("UPLOAD_MAX_REQUEST_MB", "200")) * 1024 * 1024
+PDF_PAGES_PER_JOB = int(os.environ.get("PDF_PAGES_PER_JOB", "100"))
+# Default character budget for extraction (0 = extract everything)
+EXTRACTION_MAX_CHARS = int(os.environ.get("EXTRACTION_MAX_CHARS", "0")) or None
+
+# OCR settings; ocr_lang and ocr_psm can be overridden per request
+OCR_SETTINGS = {
+    "lang": os.environ.get("OCR_LANG", "eng"),
+    "psm": int(os.environ.get("OCR_PSM", "3")),
+    "oem": int(os.environ.get("OCR_OEM", "3")),
+    "target_dpi": int(os.environ.get("OCR_TARGET_DPI", "300")),
+    "max_side": int(os.environ.get("OCR_MAX_SIDE", "4000")),
+    "binarize": os.environ.get("OCR_BINARIZE", "false").lower() == "true",
+}
+
+# Long-document summarization defaults (overridable per request)
+SUMMARY_CHUNK_TOKENS = int(os.environ.get("SUMMARY_CHUNK_TOKENS", "4000"))
+SUMMARY_FAN_OUT = int(os.environ.get("SUMMARY_FAN_OUT", "8"))
+SUMMARY_MAX_DEPTH = int(os.environ.get("SUMMARY_MAX_DEPTH", "3"))
+SUMMARY_CHUNK_CONCURRENCY = int(os.environ.get("SUMMARY_CHUNK_CONCURRENCY", "8"))
+
+# Summary backends (overridable per request with backend and fallback): llm or the
+# local extractive summarizer, which can stand in when the chosen backend fails. Fallback
+# is opt-in: by default clients see the upstream's 503/504 rather than a quieter summary
+SUMMARY_BACKEND = os.environ.get("SUMMARY_BACKEND", "llm")
+SUMMARY_FALLBACK_BACKEND = os.environ.get("SUMMARY_FALLBACK_BACKEND", "extractive")
+SUMMARY_FALLBACK = os.environ.get("SUMMARY_FALLBACK", "false").lower() == "true"
+
+# Extractive pre-compression before the LLM (overridable per request with compress)
+COMPRESS_DEFAULT = os.environ.get("COMPRESS_DEFAULT", "false").lower() == "true"
+COMPRESS_MAX_TOKENS = int(os.environ.get("COMPRESS_MAX_TOKENS", "8000"))
+
+# Cache settings: extracted text by file hash, summaries by normalized text hash
+CACHE_TTL = float(os.environ.get("CACHE_TTL", "86400"))
+CACHE_DB_PATH = os.environ.get("CACHE_DB_PATH") or None
+SUMMARY_CACHE_MAX_ENTRIES = int(os.environ.get("SUMMARY_CACHE_MAX_ENTRIES", "10000"))
+EXTRACTION_CACHE_MAX_ENTRIES = int(os.environ.get("EXTRACTION_CACHE_MAX_ENTRIES", "1000"))
+EXTRACTION_CACHE_MAX_BYTES = int(os.environ.get("EXTRACTION_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+summary_cache = LRUCache("summaries", max_entries=SUMMARY_CACHE_MAX_ENTRIES, ttl=CACHE_TTL, db_path=CACHE_DB_PATH)
+extraction_cache = LRUCache(
+    "extractions",
+    max_entries=EXTRACTION_CACHE_MAX_ENTRIES,
+    max_bytes=EXTRACTION_CACHE_MAX_BYTES,
+    ttl=CACHE_TTL,
+    db_path=CACHE_DB_PATH,
+)
+
+# Incremental mode for new versions of long documents: content-defined chunks whose partial
+# summaries are cached, and PDF pages whose text is cached by a fingerprint of the page
+INCREMENTAL_DEFAULT = os.environ.get("INCREMENTAL_DEFAULT", "false").lower() == "true"
+PARTIAL_CACHE_MAX_ENTRIES = int(os.environ.get("PARTIAL_CACHE_MAX_ENTRIES", "50000"))
+PAGE_CACHE_MAX_ENTRIES = int(os.environ.get("PAGE_CACHE_MAX_ENTRIES", "50000"))
+PAGE_CACHE_MAX_BYTES = int(os.environ.get("PAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+partial_cache = LRUCache(
+    "partial_summaries", max_entries=PARTIAL_CACHE_MAX_ENTRIES, ttl=CACHE_TTL, db_path=CACHE_DB_PATH,
+)
+page_cache = LRUCache(
+    "pdf_pages", max_entries=PAGE_CACHE_MAX_ENTRIES, max_bytes=PAGE_CACHE_MAX_BYTES, ttl=CACHE_TTL, db_path=CACHE_DB_PATH,
+)
+
+# Near-duplicate reuse: a text this similar to an earlier one (same options) gets its summary
+NEAR_DUP_ENABLED = os.environ.get("NEAR_DUP_ENABLED", "true").lower() == "true"
+NEAR_DUP_THRESHOLD = float(os.environ.get("NEAR_DUP_THRESHOLD", "0.9"))
+NEAR_DUP_MAX_ENTRIES = int(os.environ.get("NEAR_DUP_MAX_ENTRIES", "100000"))
+# Longer texts are fingerprinted on the extraction executor instead of the event loop
+NEAR_DUP_INLINE_CHARS = 50_000
+
+near_duplicates = NearDuplicateIndex(NEAR_DUP_THRESHOLD, NEAR_DUP_MAX_ENTRIES, db_path=CACHE_DB_PATH)
+
+# Identical concurrent extractions and summaries share one call (keyed like the caches)
+extraction_flights = SingleFlight("extractions")
+summary_flights = SingleFlight("summaries")
+
+# Admission control for the summarize endpoints: execution slots shared by every caller,
+# weighted-fair queues per priority class (X-Priority header) and optional per-client
+# rate limits (X-API-Key, else client address). Batch items and jobs always queue as bulk.
+# Slots default to the upstream call limit: past it, requests would only queue on the LLM
+# semaphore in arrival order. ADMISSION_SLOTS=0 disables the limit and priority scheduling
+ADMISSION_SLOTS = int(os.environ.get("ADMISSION_SLOTS", str(LLM_MAX_CONCURRENCY)))
+ADMISSION_WEIGHTS = {
+    "interactive": float(os.environ.get("ADMISSION_INTERACTIVE_WEIGHT", "8")),
+    "bulk": 1.0,
+}
+ADMISSION_QUEUE_LIMITS = {
+    "interactive": int(os.environ.get("ADMISSION_INTERACTIVE_QUEUE", "256")),
+    "bulk": int(os.environ.get("ADMISSION_BULK_QUEUE", "1024")),
+}
+# Requests per second per client, 0 for no limit
+ADMISSION_RATE = float(os.environ.get("ADMISSION_RATE", "0"))
+ADMISSION_BURST = float(os.environ.get("ADMISSION_BURST", "20"))
+# API keys whose requests are always bulk, whatever X-Priority says
+ADMISSION_BULK_KEYS = {key for key in os.environ.get("ADMISSION_BULK_KEYS", "").split(",") if key}
+
+admission = AdmissionController(
+    ADMISSION_SLOTS, ADMISSION_WEIGHTS, ADMISSION_QUEUE_LIMITS, rate=ADMISSION_RATE, burst=ADMISSION_BURST,
+)
+
+# Batch settings: one cap on concurrent items across every running batch
+BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", "1000"))
+BATCH_MAX_CONCURRENCY = int(os.environ.get("BATCH_MAX_CONCURRENCY", "16"))
+BATCH_JOB_TTL = float(os.environ.get("BATCH_JOB_TTL", "3600"))
+
+batch_semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+batch_jobs = BatchJobStore(ttl=BATCH_JOB_TTL)
+
+# Durable file jobs: SQLite queue and spooled uploads in JOB_DIR, run by job_worker.py processes.
+# A relative JOB_DIR is taken from this file's directory, so workers started anywhere agree on it
+JOB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.environ.get("JOB_DIR", "jobs"))
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "1"))
+JOB_WORKER_CONCURRENCY = int(os.environ.get("JOB_WORKER_CONCURRENCY", "4"))
+JOB_LEASE = float(os.environ.get("JOB_LEASE", "60"))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+JOB_TTL = float(os.environ.get("JOB_TTL", "86400"))
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", "0.2"))
+JOB_FILES_DIR = os.path.join(JOB_DIR, "files")
+
+# Opened on first use: importing main (workers, benchmarks) creates nothing on disk
+job_queue = JobQueue(os.path.join(JOB_DIR, "queue.sqlite3"), lease=JOB_LEASE, max_attempts=JOB_MAX_ATTEMPTS)
+
+# Optional warm-up after startup: open LLM connections, build the client and
+# start the extraction workers with their libraries loaded and Tesseract probed
+WARMUP = os.environ.get("WARMUP", "false").lower() == "true"
+WARMUP_LLM_CONNECTIONS = int(os.environ.get("WARMUP_LLM_CONNECTIONS", "4"))
+
+# What /health/ready reports; warm-up counts as done when it is disabled
+readiness = {"started": False, "warmed_up": not WARMUP, "warm_up": None}
+
+async def warm_up() -> dict:
+    """Pay the first-request costs up front; returns what it found"""
+    started = time.perf_counter()
+    # Importing openai takes a while; keep the event loop free to answer liveness probes
+    await asyncio.to_thread(get_client)
+
+    async def connect() -> bool:
+        try:
+            # Any response leaves a kept-alive connection in the pool
+            await http_client.head(LLM_BASE_URL, timeout=LLM_CONNECT_TIMEOUT)
+            return True
+        except httpx.HTTPError:
+            return False
+
+    connections = await asyncio.gather(*(connect() for _ in range(WARMUP_LLM_CONNECTIONS)))
+    # One job per worker, submitted together, so every pool process gets started
+    probes = await asyncio.gather(
+        *(extraction_executor.run(warm_up_extractors) for _ in range(extraction_executor.max_workers)),
+        return_exceptions=True,
+    )
+    probe = next((p for p in probes if isinstance(p, dict)), None)
+    errors = [str(p) or type(p).__name__ for p in probes if isinstance(p, BaseException)]
+    return {
+        "seconds": round(time.perf_counter() - started, 3),
+        "llm_connections": sum(connections),
+        "tesseract": probe["tesseract"] if probe else None,
+        "tesseract_error": probe["error"] if probe else (errors[0] if errors else None),
+    }
+
+async def run_warm_up():
+    try:
+        readiness["warm_up"] = await warm_up()
+    except Exception as e:
+        readiness["warm_up"] = {"error": str(e) or type(e).__name__}
+    readiness["warmed_up"] = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    worker_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "job_worker.py")
+    job_workers = [subprocess.Popen([sys.executable, worker_script]) for _ in range(JOB_WORKERS)]
+    # Warm-up runs in the background: liveness answers at once, readiness once it is done
+    warm_up_task = asyncio.create_task(run_warm_up()) if WARMUP else None
+    readiness["started"] = True
+    yield
+    readiness["started"] = False
+    if warm_up_task is not None:
+        warm_up_task.cancel()
+    for worker in job_workers:
+        worker.terminate()
+    for worker in job_workers:
+        try:
+            worker.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            worker.kill()
+    job_queue.close()
+    batch_jobs.cancel_all()
+    extraction_executor.shutdown()
+    summary_cache.close()
+    extraction_cache.close()
+    partial_cache.close()
+    page_cache.close()
+    near_duplicates.close()
+    for route_client in route_clients.values():
+        await route_client.close()
+    if client is not None:
+        await client.close()
+    else:
+        await http_client.aclose()
 
-app = FastAPI(title="Cruxify AI API", description="AI-powered text and image summarization API")
+app = FastAPI(title="Cruxify AI API", description="AI-powered text and image summarization API", lifespan=lifespan)
+
+# Reject oversized bodies before they are parsed
+app.add_middleware(RequestSizeLimitMiddleware, max_bytes=UPLOAD_MAX_REQUEST_BYTES)
 
 # CORS middleware
 app.add_middleware(
@@ -22,79 +381,734 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
-# Set up Together AI API
-os.environ["TOGETHER_API_KEY"] = "YOUR_API_KEY"
+# Request metrics and Server-Timing header (outermost, so rejected requests count too)
+app.add_middleware(MetricsMiddleware)
 
-client = openai.OpenAI(
-    api_key=os.environ.get("TOGETHER_API_KEY"),
-    base_url="https://api.together.xyz/v1",
+# Metrics read from live objects at scrape time
+registry.counter(
+    "cruxify_cache_requests_total", "Cache lookups by cache and result", ("cache", "result"),
+    fn=lambda: {
+        (cache.name, result): cache.stats()[result]
+        for cache in (summary_cache, extraction_cache, partial_cache, page_cache)
+        for result in ("hits", "misses", "disk_hits")
+    },
+)
+registry.counter(
+    "cruxify_near_duplicate_lookups_total", "Near-duplicate index lookups by result", ("result",),
+    fn=lambda: {(result,): near_duplicates.stats()[result] for result in ("hits", "misses")},
+)
+registry.gauge(
+    "cruxify_near_duplicate_entries", "Texts in the near-duplicate index",
+    fn=lambda: {(): near_duplicates.stats()["entries"]},
+)
+registry.counter(
+    "cruxify_coalesced_requests_total", "Requests that awaited an identical in-flight call instead of making their own", ("kind",),
+    fn=lambda: {(flights.name,): flights.coalesced for flights in (summary_flights, extraction_flights)},
+)
+registry.gauge(
+    "cruxify_admission_slots_in_use", "Summarize execution slots taken",
+    fn=lambda: {(): admission.in_use},
 )
+registry.gauge(
+    "cruxify_admission_queued", "Summarize requests waiting for a slot by priority", ("priority",),
+    fn=lambda: {(priority,): count for priority, count in admission.queued().items()},
+)
+registry.counter(
+    "cruxify_admission_admitted_total", "Summarize requests given a slot by priority", ("priority",),
+    fn=lambda: {(priority,): count for priority, count in admission.admitted.items()},
+)
+registry.counter(
+    "cruxify_admission_rejected_total", "Summarize requests rate limited or shed by priority and reason", ("priority", "reason"),
+    fn=lambda: dict(admission.rejected),
+)
+registry.counter(
+    "cruxify_llm_resilience_events_total", "Upstream retries, hedged calls, hedge wins, circuit rejections and deadline expiries", ("event",),
+    fn=lambda: {
+        (event,): llm_resilience.stats()[event]
+        for event in ("retried", "hedged", "hedge_wins", "rejected", "deadline_exceeded")
+    },
+)
+registry.gauge(
+    "cruxify_llm_circuit_state", "1 for the circuit breaker's current state", ("state",),
+    fn=lambda: {(state,): int(llm_resilience.breaker.state == state) for state in ("closed", "open", "half_open")},
+)
+registry.gauge(
+    "cruxify_jobs", "Durable jobs by status", ("status",),
+    fn=lambda: {(status,): count for status, count in job_queue.counts().items()},
+)
+registry.counter(
+    "cruxify_routing_table_reloads_total", "Routing table reloads from LLM_ROUTES_PATH",
+    fn=lambda: {(): router.reloads},
+)
+registry.gauge(
+    "cruxify_extraction_jobs_in_flight", "Extraction jobs running or queued",
+    fn=lambda: {(): extraction_executor.in_flight},
+)
+
+class SummaryOptions(BaseModel):
+    chunk_tokens: Optional[int] = Field(None, ge=256, le=32000)
+    fan_out: Optional[int] = Field(None, ge=2, le=64)
+    max_depth: Optional[int] = Field(None, ge=1, le=8)
+    compress: Optional[bool] = None
+    deadline: Optional[float] = Field(None, gt=0, le=600)
+    mode: Optional[str] = Field(None, pattern=r"^[a-z_]+$")
+    target_length: Optional[int] = Field(None, ge=10, le=2000)
+    backend: Optional[str] = Field(None, pattern=r"^[a-z_]+$")
+    fallback: Optional[bool] = None
+    incremental: Optional[bool] = None
 
-class TextSummaryRequest(BaseModel):
+class TextSummaryRequest(SummaryOptions):
     text: str
 
+def summary_options(
+    chunk_tokens: Optional[int] = Form(None, ge=256, le=32000),
+    fan_out: Optional[int] = Form(None, ge=2, le=64),
+    max_depth: Optional[int] = Form(None, ge=1, le=8),
+    compress: Optional[bool] = Form(None),
+    deadline: Optional[float] = Form(None, gt=0, le=600),
+    mode: Optional[str] = Form(None, pattern=r"^[a-z_]+$"),
+    target_length: Optional[int] = Form(None, ge=10, le=2000),
+    backend: Optional[str] = Form(None, pattern=r"^[a-z_]+$"),
+    fallback: Optional[bool] = Form(None),
+    incremental: Optional[bool] = Form(None),
+) -> SummaryOptions:
+    """Form fields controlling how a summary is produced"""
+    return SummaryOptions(
+        chunk_tokens=chunk_tokens, fan_out=fan_out, max_depth=max_depth, compress=compress, deadline=deadline,
+        mode=mode, target_length=target_length, backend=backend, fallback=fallback, incremental=incremental,
+    )
+
+class ExtractionOptions(BaseModel):
+    first_page: Optional[int] = Field(None, ge=1)
+    last_page: Optional[int] = Field(None, ge=1)
+    max_chars: Optional[int] = Field(None, ge=50)
+    ocr_lang: Optional[str] = Field(None, pattern=r"^[A-Za-z_]+(\+[A-Za-z_]+)*$")
+    ocr_psm: Optional[int] = Field(None, ge=0, le=13)
+    incremental: Optional[bool] = None
+
+def extraction_options(
+    first_page: Optional[int] = Form(None, ge=1),
+    last_page: Optional[int] = Form(None, ge=1),
+    max_chars: Optional[int] = Form(None, ge=50),
+    ocr_lang: Optional[str] = Form(None, pattern=r"^[A-Za-z_]+(\+[A-Za-z_]+)*$"),
+    ocr_psm: Optional[int] = Form(None, ge=0, le=13),
+    incremental: Optional[bool] = Form(None),
+) -> ExtractionOptions:
+    """Form fields limiting how much of a file is extracted and how images are OCR'd"""
+    return ExtractionOptions(
+        first_page=first_page, last_page=last_page, max_chars=max_chars, ocr_lang=ocr_lang, ocr_psm=ocr_psm,
+        incremental=incremental,
+    )
+
 class SummaryResponse(BaseModel):
     summary: str
     original_length: int
     summary_length: int
+    near_duplicate: bool = False
+    backend: Optional[str] = None
+    fallback: bool = False
+    chunks: Optional[int] = None
+    reused_chunks: Optional[int] = None
 
-def get_summary(text: str) -> str:
-    """Get summary using Together AI API"""
+class SummaryResult(BaseModel):
+    """A summary and how it was obtained"""
+    summary: str
+    near_duplicate: bool = False
+    backend: str
+    fallback: bool = False
+    # Incremental requests: chunks summarized, and how many of those came from the cache
+    chunks: Optional[int] = None
+    reused_chunks: Optional[int] = None
+
+    def response_fields(self, original_length: int) -> dict:
+        """Every field plus the lengths, as the summarize responses report them"""
+        fields = self.model_dump()
+        return {"summary": fields.pop("summary"), "original_length": original_length, "summary_length": len(self.summary), **fields}
+
+class BatchItemResult(BaseModel):
+    index: int
+    filename: Optional[str] = None
+    summary: Optional[str] = None
+    original_length: Optional[int] = None
+    summary_length: Optional[int] = None
+    near_duplicate: Optional[bool] = None
+    backend: Optional[str] = None
+    fallback: Optional[bool] = None
+    chunks: Optional[int] = None
+    reused_chunks: Optional[int] = None
+    error: Optional[str] = None
+    status_code: int
+
+class BatchResponse(BaseModel):
+    job_id: Optional[str] = None
+    status: str
+    total: int
+    completed: int
+    results: List[Optional[BatchItemResult]]
+
+class JobCreated(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+    events_url: str
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: str
+    created: float
+    updated: float
+    attempts: int
+    queue_position: Optional[int] = None
+    progress: Optional[dict] = None
+    result: Optional[SummaryResponse] = None
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+
+def llm_request(prompt: str, max_tokens: int, mode: str) -> Tuple["openai.AsyncOpenAI", dict]:
+    """Route a prompt to a model tier by its size; returns the client and completion arguments"""
+    route = router.route(estimate_tokens(prompt), mode)
+    LLM_ROUTES.inc(route=route.name, model=route.model, latency_class=route.latency_class, mode=mode)
+    return client_for(route), {
+        "model": route.model,
+        "messages": [
+            {"role": "system", "content": LLM_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        "max_tokens": max_tokens,
+        "temperature": LLM_TEMPERATURE,
+    }
+
+async def call_llm_once(llm: "openai.AsyncOpenAI", request: dict, timeout: Optional[float]) -> str:
+    """Send one completion request (a single attempt)"""
+    async with llm_semaphore:
+        with LLM_IN_FLIGHT.track(), timed("llm", server_timing=False):
+            response = await llm.chat.completions.create(**request, timeout=timeout)
+    if response.usage is not None:
+        LLM_TOKENS.inc(response.usage.prompt_tokens, kind="prompt")
+        LLM_TOKENS.inc(response.usage.completion_tokens, kind="completion")
+    return response.choices[0].message.content.strip()
+
+async def call_llm(prompt: str, max_tokens: int, mode: str) -> str:
+    """Send one prompt to its routed model, with retries, hedging and the circuit breaker"""
+    llm, request = llm_request(prompt, max_tokens, mode)
+    return await llm_resilience.call(lambda timeout: call_llm_once(llm, request, timeout))
+
+async def stream_llm(prompt: str, max_tokens: int, mode: str, deadline: Optional[float] = None) -> AsyncIterator[str]:
+    """Stream completion tokens for one prompt from its routed model, within deadline seconds"""
+    llm, request = llm_request(prompt, max_tokens, mode)
+    async with llm_semaphore:
+        with LLM_IN_FLIGHT.track():
+            started = time.perf_counter()
+            first_token = True
+            # Opening the stream is retried; once tokens flow they are passed straight on
+            with deadline_scope(deadline):
+                stream = await llm_resilience.call(
+                    lambda timeout: llm.chat.completions.create(**request, stream=True, timeout=timeout),
+                    hedge=False,
+                )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if first_token:
+                        LLM_TIME_TO_FIRST_TOKEN.observe(time.perf_counter() - started)
+                        first_token = False
+                    yield chunk.choices[0].delta.content
+
+def final_prompt(is_combine: bool, final_input: str, budget: Tuple[int, int]) -> str:
+    return (COMBINE_PROMPT if is_combine else CHUNK_PROMPT).format(text=final_input, words=budget[0])
+
+async def summarize_chunk(text: str, options: SummaryOptions) -> str:
+    """Partial summary of one chunk, sized by the mode's compression ratio"""
+    words, max_tokens = router.length_budget(estimate_tokens(text), options.mode)
+    return await call_llm(CHUNK_PROMPT.format(text=text, words=words), max_tokens, options.mode)
+
+async def combine_summaries(summaries: str, options: SummaryOptions, budget: Tuple[int, int]) -> str:
+    """Merge partial summaries into one of the document's final length"""
+    return await call_llm(final_prompt(True, summaries, budget), budget[1], options.mode)
+
+def document_budget(text: str, options: SummaryOptions) -> Tuple[int, int]:
+    """(words, max_tokens) for a whole document's summary"""
+    return router.length_budget(estimate_tokens(text), options.mode, options.target_length)
+
+def resolve_summary_options(options: Optional[SummaryOptions]) -> SummaryOptions:
+    """Request options with server defaults filled in"""
+    options = options or SummaryOptions()
     try:
-        response = client.chat.completions.create(
-            model="meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo",
-            messages=[
-                {"role": "system", "content": "You are a professional summarizer assistant. Provide a concise and informative summary of the given text. Focus on key points and main ideas. Only provide the summary with no additional content."},
-                {"role": "user", "content": f"Please summarize the following text:\n\n{text}"}
-            ],
-            max_tokens=500,
-            temperature=0.3
+        mode = router.resolve_mode(options.mode)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    backend = options.backend or SUMMARY_BACKEND
+    if backend not in summary_backends:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown backend {backend!r}; expected one of {sorted(summary_backends)}",
         )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating summary: {str(e)}")
+    # model_copy skips validation: server defaults aren't held to the client-facing bounds
+    return options.model_copy(update=dict(
+        chunk_tokens=options.chunk_tokens or SUMMARY_CHUNK_TOKENS,
+        fan_out=options.fan_out or SUMMARY_FAN_OUT,
+        max_depth=options.max_depth or SUMMARY_MAX_DEPTH,
+        compress=COMPRESS_DEFAULT if options.compress is None else options.compress,
+        deadline=options.deadline or LLM_REQUEST_DEADLINE,
+        mode=mode,
+        target_length=options.target_length,
+        backend=backend,
+        fallback=SUMMARY_FALLBACK if options.fallback is None else options.fallback,
+        incremental=INCREMENTAL_DEFAULT if options.incremental is None else options.incremental,
+    ))
+
+def fallback_options(options: SummaryOptions) -> Optional[SummaryOptions]:
+    """Options for retrying with the fallback backend, or None if there is none to use"""
+    if not options.fallback or SUMMARY_FALLBACK_BACKEND in ("", options.backend):
+        return None
+    return options.model_copy(update={"backend": SUMMARY_FALLBACK_BACKEND})
+
+def summary_settings(options: SummaryOptions) -> tuple:
+    """Everything besides the text that changes what a summary looks like"""
+    return (
+        router.version, LLM_SYSTEM_PROMPT, LLM_TEMPERATURE,
+        options.chunk_tokens, options.fan_out, options.max_depth, options.mode, options.target_length,
+        options.backend, options.incremental,
+    )
+
+def summary_cache_key(text: str, options: SummaryOptions) -> str:
+    return content_hash(normalize_text(text), *summary_settings(options))
 
-def extract_text_from_pdf(file_content: bytes) -> str:
-    """Extract text from PDF file"""
+def near_duplicate_group(options: SummaryOptions) -> int:
+    """Near-duplicates only match summaries made with the same settings"""
+    return int(content_hash(*summary_settings(options))[:16], 16)
+
+async def text_fingerprint(text: str, options: SummaryOptions) -> Optional[int]:
+    """SimHash of a text for the near-duplicate index; None when the index is off or the executor is busy.
+
+    Incremental requests want the changes in a new version summarized, so
+    they never reuse a near-duplicate's summary.
+    """
+    if not NEAR_DUP_ENABLED or options.incremental:
+        return None
+    if len(text) <= NEAR_DUP_INLINE_CHARS:
+        return simhash(text)
     try:
-        pdf_file = io.BytesIO(file_content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error extracting text from PDF: {str(e)}")
+        return await extraction_executor.run(simhash, text)
+    except (ExecutorSaturated, ExecutorTimeout):
+        return None
+
+def near_duplicate_summary(fingerprint: Optional[int], options: SummaryOptions) -> Optional[str]:
+    """Cached summary of a stored text close enough to this fingerprint"""
+    if fingerprint is None:
+        return None
+    for key in near_duplicates.lookup(fingerprint, near_duplicate_group(options)):
+        summary = summary_cache.get(key)
+        if summary is not None:
+            near_duplicates.record(hit=True)
+            return summary
+    near_duplicates.record(hit=False)
+    return None
 
-def extract_text_from_docx(file_content: bytes) -> str:
-    """Extract text from DOCX file"""
+def remember_summary(cache_key: str, fingerprint: Optional[int], options: SummaryOptions, summary: str):
+    summary_cache.set(cache_key, summary)
+    if fingerprint is not None:
+        near_duplicates.add(fingerprint, near_duplicate_group(options), cache_key)
+
+async def compress_for_summary(text: str, options: SummaryOptions) -> str:
+    """Extractively pre-compress text on the extraction executor, if the request asks for it"""
+    if not options.compress:
+        return text
     try:
-        doc_file = io.BytesIO(file_content)
-        doc = docx.Document(doc_file)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text.strip()
+        with timed("compress"):
+            return await extraction_executor.run(compress_text, text, COMPRESS_MAX_TOKENS)
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=429, detail=f"Server busy: {str(e)}", headers={"Retry-After": "1"})
+    except ExecutorTimeout as e:
+        raise HTTPException(status_code=504, detail=f"Error compressing text: {str(e)}")
+
+# Chunks summarized and reused by the incremental summary being computed
+chunk_counts: ContextVar[Optional[Dict[str, int]]] = ContextVar("chunk_counts", default=None)
+
+async def reuse_partial(kind: str, text: str, options: SummaryOptions, budget: Optional[Tuple[int, int]],
+                        summarize: Callable[[], Awaitable[str]]) -> str:
+    """A chunk summary or intermediate combine, from the partial cache if this input was seen before"""
+    key = content_hash(kind, normalize_text(text), budget, *summary_settings(options))
+    summary = partial_cache.get(key)
+    counts = chunk_counts.get()
+    if counts is not None and kind == "chunk":
+        counts["chunks"] += 1
+        counts["reused_chunks"] += summary is not None
+    if summary is None:
+        summary = await summarize()
+        partial_cache.set(key, summary)
+    return summary
+
+class LLMBackend(SummaryBackend):
+    """The routed remote models, map-reducing texts longer than one chunk"""
+
+    name = "llm"
+    chunks = True
+
+    async def reduce(self, text: str, budget: Tuple[int, int], options: SummaryOptions) -> Tuple[bool, str]:
+        async def summarize(chunk: str) -> str:
+            if not options.incremental:
+                return await summarize_chunk(chunk, options)
+            return await reuse_partial("chunk", chunk, options, None, lambda: summarize_chunk(chunk, options))
+
+        async def combine(summaries: str) -> str:
+            if not options.incremental:
+                return await combine_summaries(summaries, options, budget)
+            return await reuse_partial(
+                "combine", summaries, options, budget, lambda: combine_summaries(summaries, options, budget),
+            )
+
+        return await reduce_to_final(
+            text,
+            summarize,
+            combine,
+            chunk_tokens=options.chunk_tokens,
+            fan_out=options.fan_out,
+            max_depth=options.max_depth,
+            concurrency=SUMMARY_CHUNK_CONCURRENCY,
+            stable=options.incremental,
+        )
+
+    async def summarize(self, text: str, budget: Tuple[int, int], options: SummaryOptions) -> str:
+        is_combine, final_input = await self.reduce(text, budget, options)
+        return await call_llm(final_prompt(is_combine, final_input, budget), budget[1], options.mode)
+
+    async def stream(self, text: str, budget: Tuple[int, int], options: SummaryOptions) -> AsyncIterator[str]:
+        # Map and intermediate reduce steps run as usual; only the last call streams
+        started = time.monotonic()
+        with deadline_scope(options.deadline):
+            is_combine, final_input = await self.reduce(text, budget, options)
+        deadline = options.deadline - (time.monotonic() - started)
+        async for token in stream_llm(final_prompt(is_combine, final_input, budget), budget[1], options.mode, deadline):
+            yield token
+
+summary_backends: Dict[str, SummaryBackend] = {
+    backend.name: backend for backend in (LLMBackend(), ExtractiveBackend(extraction_executor))
+}
+
+def summary_error(e: Exception) -> HTTPException:
+    """The HTTP error for a failed summary"""
+    if isinstance(e, HTTPException):
+        return e
+    if isinstance(e, CircuitOpenError):
+        return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(round(e.retry_after))})
+    if isinstance(e, ExecutorSaturated):
+        return HTTPException(status_code=429, detail=f"Server busy: {str(e)}", headers={"Retry-After": "1"})
+    if isinstance(e, (DeadlineExceeded, UpstreamTimeout, ExecutorTimeout)):
+        return HTTPException(status_code=504, detail=f"Error generating summary: {str(e)}")
+    return HTTPException(status_code=500, detail=f"Error generating summary: {str(e)}")
+
+async def fallback_summary(text: str, fingerprint: Optional[int], options: SummaryOptions, error: Exception) -> SummaryResult:
+    """Summarize with the fallback backend after the chosen one failed; re-raises error if that fails too"""
+    fallback = fallback_options(options)
+    if fallback is None or isinstance(error, HTTPException):
+        raise summary_error(error)
+    try:
+        with timed("summarize"):
+            summary = await summary_backends[fallback.backend].summarize(text, document_budget(text, fallback), fallback)
+    except Exception:
+        raise summary_error(error)
+    # Cached under the fallback backend's key, never as the chosen backend's answer
+    remember_summary(summary_cache_key(text, fallback), fingerprint, fallback, summary)
+    SUMMARIES.inc(backend=fallback.backend, fallback="true")
+    return SummaryResult(summary=summary, backend=fallback.backend, fallback=True)
+
+async def get_summary(text: str, options: Optional[SummaryOptions] = None) -> SummaryResult:
+    """Summarize text with the request's backend, falling back to another one if it fails"""
+    options = resolve_summary_options(options)
+    text = await compress_for_summary(text, options)
+
+    cache_key = summary_cache_key(text, options)
+    cached = summary_cache.get(cache_key)
+    if cached is not None:
+        return SummaryResult(summary=cached, backend=options.backend)
+
+    fingerprint = await text_fingerprint(text, options)
+    reused = near_duplicate_summary(fingerprint, options)
+    if reused is not None:
+        return SummaryResult(summary=reused, near_duplicate=True, backend=options.backend)
+
+    async def summarize() -> SummaryResult:
+        counts = {"chunks": 0, "reused_chunks": 0}
+        chunk_counts.set(counts)
+        backend = summary_backends[options.backend]
+        summary = await backend.summarize(text, document_budget(text, options), options)
+        remember_summary(cache_key, fingerprint, options, summary)
+        SUMMARIES.inc(backend=options.backend, fallback="false")
+        if not (options.incremental and backend.chunks):
+            return SummaryResult(summary=summary, backend=options.backend)
+        return SummaryResult(summary=summary, backend=options.backend, **counts)
+
+    try:
+        with timed("summarize"), deadline_scope(options.deadline):
+            return await summary_flights.run(cache_key, summarize)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error extracting text from DOCX: {str(e)}")
+        return await fallback_summary(text, fingerprint, options, e)
+
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    """Format one Server-Sent Event"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+async def stream_summary(text: str, options: Optional[SummaryOptions] = None) -> AsyncIterator[str]:
+    """Yield SSE events for a summary: token events, then done (or error)"""
+    options = resolve_summary_options(options)
+    original_length = len(text)
+    try:
+        text = await compress_for_summary(text, options)
+    except HTTPException as e:
+        yield sse_event({"detail": e.detail}, event="error")
+        return
+
+    cache_key = summary_cache_key(text, options)
+    summary = summary_cache.get(cache_key)
+    near_duplicate = False
+    fingerprint = None
+    if summary is None:
+        fingerprint = await text_fingerprint(text, options)
+        summary = near_duplicate_summary(fingerprint, options)
+        near_duplicate = summary is not None
+    backend = options.backend
+    fallback = False
+    counts = {"chunks": None, "reused_chunks": None}
+    if summary is not None:
+        yield sse_event({"token": summary})
+    else:
+        parts = []
+        if options.incremental and summary_backends[backend].chunks:
+            counts = {"chunks": 0, "reused_chunks": 0}
+            chunk_counts.set(counts)
+        try:
+            budget = document_budget(text, options)
+            async for token in summary_backends[backend].stream(text, budget, options):
+                parts.append(token)
+                yield sse_event({"token": token})
+        except Exception as e:
+            if parts:
+                # Tokens already went out; a different summary can't be spliced in
+                yield sse_event({"detail": summary_error(e).detail}, event="error")
+                return
+            try:
+                result = await fallback_summary(text, fingerprint, options, e)
+            except HTTPException as error:
+                yield sse_event({"detail": error.detail}, event="error")
+                return
+            parts = [result.summary]
+            backend, fallback = result.backend, True
+            counts = {"chunks": None, "reused_chunks": None}
+            yield sse_event({"token": result.summary})
+        else:
+            remember_summary(cache_key, fingerprint, options, "".join(parts).strip())
+            SUMMARIES.inc(backend=backend, fallback="false")
+        summary = "".join(parts).strip()
+
+    yield sse_event(
+        {
+            "original_length": original_length,
+            "summary_length": len(summary),
+            "near_duplicate": near_duplicate,
+            "backend": backend,
+            "fallback": fallback,
+            **counts,
+        },
+        event="done",
+    )
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """Holds its admission slot until the response ends, however it ends
+    (also when the client is gone before the first chunk)"""
+
+    def __init__(self, ticket: Ticket, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ticket = ticket
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.ticket.release()
+
+def sse_response(events: AsyncIterator[str], ticket: Optional[Ticket] = None) -> StreamingResponse:
+    settings = dict(media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    if ticket is None:
+        return StreamingResponse(events, **settings)
+    return AdmittedStreamingResponse(ticket, events, **settings)
+
+class Caller(BaseModel):
+    client: str
+    priority: str
+
+def request_caller(
+    request: Request,
+    x_api_key: Optional[str] = Header(None),
+    x_priority: Optional[str] = Header(None),
+) -> Caller:
+    """Who is asking (API key, else address) and in which priority class"""
+    priority = x_priority or "interactive"
+    if priority not in ADMISSION_WEIGHTS:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown priority {priority!r}; expected one of {sorted(ADMISSION_WEIGHTS)}",
+        )
+    if x_api_key:
+        client = "key:" + content_hash(x_api_key)[:32]
+        if x_api_key in ADMISSION_BULK_KEYS:
+            priority = "bulk"
+    else:
+        client = "ip:" + (request.client.host if request.client else "unknown")
+    return Caller(client=client, priority=priority)
+
+async def admit(caller: Caller, options: SummaryOptions, wait: bool = False) -> Ticket:
+    """Wait for an execution slot, or answer 429/503 with Retry-After.
+
+    With ``wait`` (batch items and jobs, which have no client to retry), a rate
+    limit or a full queue is waited out instead; only the deadline still sheds.
+    Time spent waiting comes out of the request's deadline.
+    """
+    deadline = options.deadline or LLM_REQUEST_DEADLINE
+    started = time.monotonic()
+    waited = 0.0
+    while True:
+        try:
+            ticket = await admission.acquire(caller.client, caller.priority, deadline - waited)
+            break
+        except RateLimited as e:
+            if not wait or waited + e.retry_after >= deadline:
+                raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+            await asyncio.sleep(e.retry_after)
+        except Overloaded as e:
+            if not wait or e.reason == "deadline" or waited + e.retry_after >= deadline:
+                raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+            await asyncio.sleep(e.retry_after)
+        waited = time.monotonic() - started
+    waited += ticket.waited
+    ADMISSION_QUEUE_WAIT.observe(waited, priority=caller.priority)
+    if waited:
+        options.deadline = deadline - waited
+    return ticket
+
+async def extract_text(file_extension: str, path: str, options: ExtractionOptions) -> str:
+    """Extract text from a spooled upload on the extraction executor"""
+    file_type = check_file_type(file_extension)
+    label = {"pdf": "PDF", "docx": "DOCX", "doc": "DOC", "image": "image"}[file_type]
 
-def extract_text_from_image(file_content: bytes) -> str:
-    """Extract text from image using OCR"""
     try:
-        image = Image.open(io.BytesIO(file_content))
-        text = pytesseract.image_to_string(image)
-        return text.strip()
+        if file_type == 'pdf' and (INCREMENTAL_DEFAULT if options.incremental is None else options.incremental):
+            return await extract_pdf_incremental(
+                extraction_executor,
+                path,
+                page_cache,
+                first_page=options.first_page,
+                last_page=options.last_page,
+                max_chars=options.max_chars,
+                pages_per_job=PDF_PAGES_PER_JOB,
+            )
+        if file_type == 'pdf':
+            return await extract_pdf(
+                extraction_executor,
+                path,
+                first_page=options.first_page,
+                last_page=options.last_page,
+                max_chars=options.max_chars,
+                pages_per_job=PDF_PAGES_PER_JOB,
+            )
+        if file_type == 'image':
+            return await extract_image(extraction_executor, path, ocr_settings(options), max_chars=options.max_chars)
+        extractor = extract_text_from_doc if file_type == 'doc' else extract_text_from_docx
+        text = await extraction_executor.run(extractor, path, options.max_chars)
+        return text[:options.max_chars] if options.max_chars else text
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=429, detail=f"Server busy: {str(e)}", headers={"Retry-After": "1"})
+    except ExecutorTimeout as e:
+        raise HTTPException(status_code=504, detail=f"Error extracting text from {label}: {str(e)}")
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error extracting text from image: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Error extracting text from {label}: {str(e)}")
+
+def ocr_settings(options: ExtractionOptions) -> dict:
+    """Server OCR settings with the request's overrides applied"""
+    settings = dict(OCR_SETTINGS)
+    if options.ocr_lang:
+        settings["lang"] = options.ocr_lang
+    if options.ocr_psm is not None:
+        settings["psm"] = options.ocr_psm
+    return settings
+
+def check_file_type(file_extension: str) -> str:
+    """Map a file extension to pdf/docx/doc/image, rejecting anything else"""
+    if file_extension not in FILE_TYPES:
+        raise HTTPException(status_code=400, detail="Unsupported file type. Please upload PDF, DOCX, or image files.")
+    return FILE_TYPES[file_extension]
+
+async def spool_checked_upload(file: UploadFile) -> Tuple[str, str]:
+    """Spool an upload after checking its type, enforcing that type's size limit"""
+    file_type = check_file_type((file.filename or "").lower().split('.')[-1])
+    return await spool_upload(file, UPLOAD_MAX_BYTES[file_type], UPLOAD_TMP_DIR, UPLOAD_CHUNK_SIZE)
+
+async def extract_upload(file: UploadFile, options: ExtractionOptions) -> str:
+    """Spool an uploaded file and return its extracted text, ready to summarize"""
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="No file uploaded")
+    
+    with timed("upload"):
+        path, digest = await spool_checked_upload(file)
+    try:
+        return await extract_file_text(file.filename, path, digest, options)
+    finally:
+        os.unlink(path)
+
+async def extract_file_text(filename: str, path: str, digest: str, options: ExtractionOptions) -> str:
+    """Extract text from a spooled file and check there is enough to summarize"""
+    file_extension = filename.lower().split('.')[-1]
+    if options.max_chars is None and EXTRACTION_MAX_CHARS:
+        options = options.model_copy(update={"max_chars": EXTRACTION_MAX_CHARS})
+    
+    # Extract text based on file type, reusing earlier extractions of the same bytes
+    cache_key = content_hash(
+        file_extension, digest, options.first_page, options.last_page, options.max_chars,
+        sorted(ocr_settings(options).items()) if FILE_TYPES.get(file_extension) == 'image' else None,
+    )
+    extracted_text = extraction_cache.get(cache_key)
+    if extracted_text is None:
+        # The shared call reads its own hard link, so the first uploader's
+        # spooled file can be removed while other requests still wait on it
+        shared_path = f"{path}.shared"
+
+        def start_extraction():
+            try:
+                os.link(path, shared_path)
+            except OSError:
+                # No hard links here (some bind mounts and FUSE filesystems): take a copy
+                shutil.copyfile(path, shared_path)
+            return extract_shared()
+
+        async def extract_shared() -> str:
+            text = await extract_text(file_extension, shared_path, options)
+            extraction_cache.set(cache_key, text)
+            return text
+
+        def remove_shared():
+            try:
+                os.unlink(shared_path)
+            except FileNotFoundError:
+                pass
+
+        with timed("extract", file_type=FILE_TYPES.get(file_extension, "")):
+            extracted_text = await extraction_flights.run(cache_key, start_extraction, cleanup=remove_shared)
+    
+    if not extracted_text.strip():
+        raise HTTPException(status_code=400, detail="No text could be extracted from the file")
+    
+    if len(extracted_text) < 50:
+        raise HTTPException(status_code=400, detail="Extracted text too short to summarize")
+    
+    return extracted_text
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to Cruxify AI API"}
 
 @app.post("/summarize/text", response_model=SummaryResponse)
-async def summarize_text(request: TextSummaryRequest):
+async def summarize_text(request: TextSummaryRequest, caller: Caller = Depends(request_caller)):
     """Summarize plain text input"""
     if not request.text.strip():
         raise HTTPException(status_code=400, detail="Text cannot be empty")
@@ -102,16 +1116,17 @@ async def summarize_text(request: TextSummaryRequest):
     if len(request.text) < 50:
         raise HTTPException(status_code=400, detail="Text too short to summarize (minimum 50 characters)")
     
-    summary = get_summary(request.text)
+    with await admit(caller, request):
+        result = await get_summary(request.text, request)
     
-    return SummaryResponse(
-        summary=summary,
-        original_length=len(request.text),
-        summary_length=len(summary)
-    )
+    return SummaryResponse(**result.response_fields(len(request.text)))
 
 @app.post("/summarize/text/form")
-async def summarize_text_form(text: str = Form(...)):
+async def summarize_text_form(
+    text: str = Form(...),
+    settings: SummaryOptions = Depends(summary_options),
+    caller: Caller = Depends(request_caller),
+):
     """Summarize text from form data (for compatibility)"""
     if not text.strip():
         raise HTTPException(status_code=400, detail="Text cannot be empty")
@@ -119,50 +1134,300 @@ async def summarize_text_form(text: str = Form(...)):
     if len(text) < 50:
         raise HTTPException(status_code=400, detail="Text too short to summarize (minimum 50 characters)")
     
-    summary = get_summary(text)
+    with await admit(caller, settings):
+        result = await get_summary(text, settings)
     
-    return {
-        "Summary": summary,
-        "original_length": len(text),
-        "summary_length": len(summary)
-    }
+    fields = result.response_fields(len(text))
+    return {"Summary": fields.pop("summary"), **fields}
 
 @app.post("/summarize/file", response_model=SummaryResponse)
-async def summarize_file(file: UploadFile = File(...)):
+async def summarize_file(
+    file: UploadFile = File(...),
+    settings: SummaryOptions = Depends(summary_options),
+    options: ExtractionOptions = Depends(extraction_options),
+    caller: Caller = Depends(request_caller),
+):
     """Summarize content from uploaded file (PDF, DOCX, or image)"""
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="No file uploaded")
-    
-    file_extension = file.filename.lower().split('.')[-1]
-    file_content = await file.read()
-    
-    # Extract text based on file type
-    if file_extension == 'pdf':
-        extracted_text = extract_text_from_pdf(file_content)
-    elif file_extension in ['docx', 'doc']:
-        extracted_text = extract_text_from_docx(file_content)
-    elif file_extension in ['png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff']:
-        extracted_text = extract_text_from_image(file_content)
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported file type. Please upload PDF, DOCX, or image files.")
-    
-    if not extracted_text.strip():
-        raise HTTPException(status_code=400, detail="No text could be extracted from the file")
+    with await admit(caller, settings):
+        extracted_text = await extract_upload(file, options)
+        
+        result = await get_summary(extracted_text, settings)
     
-    if len(extracted_text) < 50:
-        raise HTTPException(status_code=400, detail="Extracted text too short to summarize")
+    return SummaryResponse(**result.response_fields(len(extracted_text)))
+
+@app.post("/summarize/text/stream")
+async def summarize_text_stream(request: TextSummaryRequest, caller: Caller = Depends(request_caller)):
+    """Stream a text summary as Server-Sent Events"""
+    if not request.text.strip():
+        raise HTTPException(status_code=400, detail="Text cannot be empty")
     
-    summary = get_summary(extracted_text)
+    if len(request.text) < 50:
+        raise HTTPException(status_code=400, detail="Text too short to summarize (minimum 50 characters)")
     
-    return SummaryResponse(
-        summary=summary,
-        original_length=len(extracted_text),
-        summary_length=len(summary)
+    options = resolve_summary_options(request)
+    ticket = await admit(caller, options)
+    return sse_response(stream_summary(request.text, options), ticket)
+
+@app.post("/summarize/file/stream")
+async def summarize_file_stream(
+    file: UploadFile = File(...),
+    settings: SummaryOptions = Depends(summary_options),
+    options: ExtractionOptions = Depends(extraction_options),
+    caller: Caller = Depends(request_caller),
+):
+    """Stream a summary of an uploaded file as Server-Sent Events"""
+    resolved = resolve_summary_options(settings)
+    ticket = await admit(caller, resolved)
+    try:
+        extracted_text = await extract_upload(file, options)
+    except BaseException:
+        ticket.release()
+        raise
+    return sse_response(stream_summary(extracted_text, resolved), ticket)
+
+async def run_batch_item(job: BatchJob, index: int, text: Optional[str], filename: Optional[str], spooled: Union[Tuple[str, str], HTTPException, None],
+                         settings: SummaryOptions, options: ExtractionOptions, caller: Caller):
+    """Summarize one batch item and record its result or error on the job"""
+    result = {"index": index, "filename": filename}
+    # Each item gets its own copy: admission takes its queue wait out of the deadline
+    settings = settings.model_copy()
+    async with batch_semaphore:
+        try:
+            if isinstance(spooled, HTTPException):
+                raise spooled
+            elif spooled is None and not text.strip():
+                raise HTTPException(status_code=400, detail="Text cannot be empty")
+            elif spooled is None and len(text) < 50:
+                raise HTTPException(status_code=400, detail="Text too short to summarize (minimum 50 characters)")
+
+            with await admit(caller, settings, wait=True):
+                if spooled is not None:
+                    # Batch items wait for extraction capacity rather than failing on 429
+                    while True:
+                        try:
+                            text = await extract_file_text(filename, *spooled, options)
+                            break
+                        except HTTPException as e:
+                            if e.status_code != 429:
+                                raise
+                            await asyncio.sleep(0.5)
+                summary = await get_summary(text, settings)
+            result.update(summary.response_fields(len(text)), status_code=200)
+        except HTTPException as e:
+            result.update(error=e.detail, status_code=e.status_code)
+        except Exception as e:
+            result.update(error=str(e), status_code=500)
+        finally:
+            if isinstance(spooled, tuple):
+                os.unlink(spooled[0])
+    await job.set_result(index, result)
+
+def batch_response(job: BatchJob, include_id: bool = True) -> BatchResponse:
+    return BatchResponse(
+        job_id=job.id if include_id else None,
+        status=job.status,
+        total=job.total,
+        completed=len(job.finished),
+        results=job.results,
+    )
+
+@app.post("/summarize/batch", response_model=BatchResponse)
+async def summarize_batch(
+    texts: Optional[List[str]] = Form(None),
+    files: Optional[List[UploadFile]] = File(None),
+    batch_mode: str = Form("sync", pattern="^(sync|job)$"),
+    settings: SummaryOptions = Depends(summary_options),
+    options: ExtractionOptions = Depends(extraction_options),
+    caller: Caller = Depends(request_caller),
+):
+    """Summarize many texts and/or files; results keep input order (texts first, then files).
+
+    ``batch_mode=sync`` waits for every item. ``batch_mode=job`` returns a job ID at once;
+    poll ``GET /summarize/batch/{job_id}`` or follow ``/summarize/batch/{job_id}/stream``.
+    Items are admitted one by one as bulk, whatever X-Priority says.
+    """
+    texts = texts or []
+    files = files or []
+    total = len(texts) + len(files)
+    if total == 0:
+        raise HTTPException(status_code=400, detail="Batch is empty")
+    if total > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch too large (maximum {BATCH_MAX_ITEMS} items)")
+
+    # Uploads are closed once the request returns, so spool them up front;
+    # a file that cannot be spooled (bad type, too large) fails only its own item
+    items = [(text, None, None) for text in texts]
+    for file in files:
+        try:
+            spooled = await spool_checked_upload(file)
+        except HTTPException as e:
+            spooled = e
+        items.append((None, file.filename or "", spooled))
+
+    job = batch_jobs.create(total)
+    runs = asyncio.gather(*(
+        run_batch_item(job, index, text, filename, spooled, settings, options, caller.model_copy(update={"priority": "bulk"}))
+        for index, (text, filename, spooled) in enumerate(items)
+    ))
+
+    if batch_mode == "job":
+        job.task = asyncio.ensure_future(runs)
+        return batch_response(job)
+
+    await runs
+    return batch_response(job, include_id=False)
+
+@app.get("/summarize/batch/{job_id}", response_model=BatchResponse)
+async def get_batch(job_id: str):
+    """Poll a batch job for its results so far"""
+    job = batch_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    return batch_response(job)
+
+@app.get("/summarize/batch/{job_id}/stream")
+async def stream_batch(job_id: str):
+    """Stream batch item results as Server-Sent Events in completion order"""
+    job = batch_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+
+    async def events():
+        cursor = 0
+        while cursor < job.total:
+            await job.wait_past(cursor)
+            for index in job.finished[cursor:]:
+                yield sse_event(job.results[index], event="result")
+            cursor = len(job.finished)
+        yield sse_event({"job_id": job.id, "total": job.total}, event="done")
+
+    return sse_response(events())
+
+@app.post("/jobs", response_model=JobCreated, status_code=202)
+async def create_job(
+    file: UploadFile = File(...),
+    settings: SummaryOptions = Depends(summary_options),
+    options: ExtractionOptions = Depends(extraction_options),
+    caller: Caller = Depends(request_caller),
+):
+    """Queue a file for summarization by the job workers; returns at once with the job ID"""
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="No file uploaded")
+    resolve_summary_options(settings)  # reject bad options now rather than in the worker
+
+    file_type = check_file_type(file.filename.lower().split('.')[-1])
+    os.makedirs(JOB_FILES_DIR, exist_ok=True)
+    with timed("upload"):
+        path, digest = await spool_upload(file, UPLOAD_MAX_BYTES[file_type], JOB_FILES_DIR, UPLOAD_CHUNK_SIZE)
+    # The queue is SQLite: its calls (which may wait on a busy writer) stay off the event loop
+    try:
+        job_id = await asyncio.to_thread(job_queue.enqueue, {
+            "filename": file.filename,
+            "path": path,
+            "digest": digest,
+            # The worker admits the job as bulk under the same client, for its rate limit
+            "client": caller.client,
+            "summary": settings.model_dump(),
+            "extraction": options.model_dump(),
+        })
+    except BaseException:
+        os.unlink(path)
+        raise
+    return JobCreated(job_id=job_id, status="queued", status_url=f"/jobs/{job_id}", events_url=f"/jobs/{job_id}/events")
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    """Poll a job for its status, latest progress and result"""
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Stream a job's progress events as Server-Sent Events until it completes or fails"""
+    if await asyncio.to_thread(job_queue.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events() -> AsyncIterator[str]:
+        seq = 0
+        while True:
+            new_events = await asyncio.to_thread(job_queue.events, job_id, seq)
+            for event in new_events:
+                seq = event["seq"]
+                yield sse_event(event, event=event["event"])
+                if event["event"] in TERMINAL_STATUSES:
+                    return
+            if not new_events and await asyncio.to_thread(job_queue.get, job_id) is None:
+                # Purged (past JOB_TTL) before we saw it finish
+                return
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+
+    return sse_response(events())
+
+@app.get("/health/live")
+async def liveness_check():
+    """The process is up and its event loop answers; restart it if this fails"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Whether to send this worker traffic: started, warmed up and not saturated"""
+    checks = {
+        "started": readiness["started"],
+        "warmed_up": readiness["warmed_up"],
+        "extraction_capacity": extraction_executor.in_flight < extraction_executor.capacity,
+    }
+    ready = all(checks.values())
+    return JSONResponse(
+        {
+            "status": "ready" if ready else "not_ready",
+            "checks": checks,
+            "warm_up": readiness["warm_up"],
+            "circuit": llm_resilience.breaker.state,
+        },
+        status_code=200 if ready else 503,
     )
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "Cruxify AI API"}
+    return {
+        "status": "healthy",
+        "service": "Cruxify AI API",
+        "cache": {
+            "summaries": summary_cache.stats(),
+            "extractions": extraction_cache.stats(),
+            "partial_summaries": partial_cache.stats(),
+            "pdf_pages": page_cache.stats(),
+        },
+        "near_duplicates": near_duplicates.stats(),
+        "coalescing": {
+            "summaries": summary_flights.stats(),
+            "extractions": extraction_flights.stats(),
+        },
+        "upstream": llm_resilience.stats(),
+        "admission": admission.stats(),
+        "jobs": await asyncio.to_thread(job_queue.counts),
+    }
+
+@app.get("/routing")
+async def get_routing():
+    """The model routing table in use"""
+    return router.describe()
+
+@app.post("/routing/reload")
+async def reload_routing():
+    """Re-read the routing table from LLM_ROUTES_PATH now"""
+    if not router.path:
+        raise HTTPException(status_code=400, detail="No routing table file configured (set LLM_ROUTES_PATH)")
+    if not router.reload():
+        raise HTTPException(status_code=400, detail=f"Routing table not reloaded: {router.last_error}")
+    return router.describe()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
     import uvicorn
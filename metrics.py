@@ -0,0 +1,238 @@
+"""Prometheus-style metrics and per-request stage timings.
+
+A small in-process registry of counters, gauges and histograms rendered in the
+Prometheus text format at ``/metrics``. ``MetricsMiddleware`` counts requests per
+endpoint and adds a ``Server-Timing`` header built from the stages recorded with
+``timed()`` while the request ran.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# Stage name -> accumulated seconds for the request being served
+_stage_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """A counter incremented directly, or read from ``fn`` (returning {label tuple: value}) at scrape time"""
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=(), fn: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._fn = fn
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        if self._fn is not None:
+            values = self._fn()
+        else:
+            with self._lock:
+                values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labels, key)} {value:g}" for key, value in values.items()]
+
+
+class Gauge(_Metric):
+    """A gauge set directly, or read from ``fn`` (returning {label tuple: value}) at scrape time"""
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labels=(), fn: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._fn = fn
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels) -> Iterator[None]:
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def samples(self):
+        if self._fn is not None:
+            values = self._fn()
+        else:
+            with self._lock:
+                values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labels, key)} {value:g}" for key, value in values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        lines = []
+        with self._lock:
+            for key, (counts, total, count) in self._series.items():
+                for bound, bucket_count in zip(self.buckets, counts):
+                    le = 'le="%g"' % bound
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {bucket_count}")
+                le = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total:g}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labels=(), fn=None) -> Counter:
+        return self.register(Counter(name, help_text, labels, fn))
+
+    def gauge(self, name, help_text, labels=(), fn=None) -> Gauge:
+        return self.register(Gauge(name, help_text, labels, fn))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labels, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+registry = Registry()
+
+REQUESTS = registry.counter("cruxify_requests_total", "HTTP requests by endpoint and status", ("endpoint", "method", "status"))
+REQUEST_DURATION = registry.histogram("cruxify_request_duration_seconds", "HTTP request latency by endpoint", ("endpoint",))
+REQUESTS_IN_FLIGHT = registry.gauge("cruxify_requests_in_flight", "HTTP requests being served")
+STAGE_DURATION = registry.histogram(
+    "cruxify_stage_duration_seconds", "Pipeline stage latency (upload, extract, summarize, llm)", ("stage", "file_type")
+)
+LLM_TIME_TO_FIRST_TOKEN = registry.histogram("cruxify_llm_time_to_first_token_seconds", "Time to first streamed token")
+LLM_TOKENS = registry.counter("cruxify_llm_tokens_total", "Tokens reported by the LLM API", ("kind",))
+LLM_IN_FLIGHT = registry.gauge("cruxify_llm_calls_in_flight", "Upstream LLM calls in progress")
+LLM_ROUTES = registry.counter(
+    "cruxify_llm_routed_calls_total", "LLM calls by routing decision", ("route", "model", "latency_class", "mode"),
+)
+SUMMARIES = registry.counter(
+    "cruxify_summaries_total", "Summaries generated (not cached) by backend and whether it was a fallback",
+    ("backend", "fallback"),
+)
+ADMISSION_QUEUE_WAIT = registry.histogram(
+    "cruxify_admission_queue_wait_seconds", "Time summarize requests waited for an execution slot", ("priority",)
+)
+
+
+def record_stage(stage: str, seconds: float):
+    """Add time to the current request's Server-Timing stage"""
+    timings = _stage_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed(stage: str, file_type: str = "", server_timing: bool = True) -> Iterator[None]:
+    """Time a block into the stage histogram and (optionally) the Server-Timing header"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_DURATION.observe(elapsed, stage=stage, file_type=file_type)
+        if server_timing:
+            record_stage(stage, elapsed)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request metrics and the Server-Timing header"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timings: Dict[str, float] = {}
+        token = _stage_timings.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def timing_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if timings:
+                    header = ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items())
+                    message = dict(message, headers=list(message.get("headers", [])) + [(b"server-timing", header.encode())])
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, timing_send)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            _stage_timings.reset(token)
+            route = scope.get("route")
+            endpoint = getattr(route, "path", "unmatched")
+            REQUESTS.inc(endpoint=endpoint, method=scope["method"], status=status)
+            REQUEST_DURATION.observe(time.perf_counter() - started, endpoint=endpoint)
@@ -0,0 +1,194 @@
+"""Near-duplicate index for reusing summaries of almost identical texts.
+
+Each text gets a 64-bit SimHash over its word 3-shingles, so a reformatted
+paste, an added tracking footer or a new export timestamp changes only a few
+bits while unrelated texts differ in about half of them. Similarity is
+``1 - differing bits / 64``.
+
+Lookups use multi-index hashing: the fingerprint is cut into four 16-bit bands.
+Any stored fingerprint within ``d`` bits of the query has at least one band
+within ``d // 4`` bits of the query's band. Probing those neighbours in the
+four band tables finds every match without scanning the index.
+
+Memory is bounded by ``capacity``. Fingerprints, option groups and keys live
+in flat arrays used as a ring, so the oldest entry is overwritten once the
+index is full. Entries are optionally written through to SQLite and reloaded
+at startup.
+"""
+from array import array
+from collections import Counter
+from itertools import combinations
+import hashlib
+import re
+import sqlite3
+import threading
+from typing import List, Optional
+
+FINGERPRINT_BITS = 64
+BANDS = 4
+BAND_BITS = FINGERPRINT_BITS // BANDS
+SHINGLE_WORDS = 3
+# Keys are sha256 hex digests (cache.content_hash), stored as raw bytes
+KEY_BYTES = 32
+
+_WORD_RE = re.compile(r"\w+")
+_SET_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of a text's lowercased word 3-shingles"""
+    words = _WORD_RE.findall(text.lower())
+    shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(max(1, len(words) - SHINGLE_WORDS + 1))}
+    hashes = b"".join(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest() for shingle in shingles)
+    # Count set bits column by column: a byte histogram per position is far
+    # cheaper than looping over 64 bits of every shingle
+    counts = [0] * FINGERPRINT_BITS
+    for position in range(8):
+        for value, count in Counter(hashes[position::8]).items():
+            for bit in _SET_BITS[value]:
+                counts[position * 8 + bit] += count
+    return sum(1 << bit for bit, count in enumerate(counts) if 2 * count > len(shingles))
+
+
+def similarity(a: int, b: int) -> float:
+    return 1 - (a ^ b).bit_count() / FINGERPRINT_BITS
+
+
+def _signed(value: int) -> int:
+    """Unsigned 64-bit value as SQLite's signed INTEGER"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class NearDuplicateIndex:
+    """SimHash index from text fingerprints to summary cache keys.
+
+    ``group`` partitions the index: only entries added with the same group
+    (e.g. a hash of the summary options) can match each other.
+    """
+
+    def __init__(self, threshold: float = 0.9, capacity: int = 100_000, db_path: Optional[str] = None):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.max_distance = int(round((1 - threshold) * FINGERPRINT_BITS))
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._fingerprints = array("Q")
+        self._groups = array("Q")
+        self._keys = bytearray()
+        self._next = 0
+        # One table per band: band value -> array of slots
+        self._bands = [[None] * (1 << BAND_BITS) for _ in range(BANDS)]
+        radius = self.max_distance // BANDS
+        self._probe_masks = [
+            sum(1 << bit for bit in flipped)
+            for r in range(radius + 1)
+            for flipped in combinations(range(BAND_BITS), r)
+        ]
+        self._lock = threading.Lock()
+        self._db = None
+        self._seq = 0
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS near_duplicates "
+                "(seq INTEGER PRIMARY KEY, fingerprint INTEGER NOT NULL, grp INTEGER NOT NULL, key BLOB NOT NULL)"
+            )
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    @staticmethod
+    def _band(fingerprint: int, band: int) -> int:
+        return fingerprint >> (band * BAND_BITS) & ((1 << BAND_BITS) - 1)
+
+    def _load(self):
+        rows = self._db.execute(
+            "SELECT seq, fingerprint, grp, key FROM near_duplicates ORDER BY seq DESC LIMIT ?", (self.capacity,)
+        ).fetchall()
+        for seq, fingerprint, group, key in reversed(rows):
+            self._insert(fingerprint & (1 << 64) - 1, group & (1 << 64) - 1, key)
+            self._seq = seq
+        self._db.execute("DELETE FROM near_duplicates WHERE seq <= ?", (self._seq - self.capacity,))
+
+    def _insert(self, fingerprint: int, group: int, key: bytes):
+        slot = self._next % self.capacity
+        if slot < len(self._fingerprints):
+            # Full: overwrite the oldest entry
+            old = self._fingerprints[slot]
+            for band in range(BANDS):
+                self._bands[band][self._band(old, band)].remove(slot)
+            self._fingerprints[slot] = fingerprint
+            self._groups[slot] = group
+            self._keys[slot * KEY_BYTES:(slot + 1) * KEY_BYTES] = key
+        else:
+            self._fingerprints.append(fingerprint)
+            self._groups.append(group)
+            self._keys += key
+        for band in range(BANDS):
+            table = self._bands[band]
+            value = self._band(fingerprint, band)
+            if table[value] is None:
+                table[value] = array("I")
+            table[value].append(slot)
+        self._next += 1
+
+    def add(self, fingerprint: int, group: int, key: str):
+        """Remember that the text with this fingerprint was summarized under key"""
+        key_bytes = bytes.fromhex(key)
+        if len(key_bytes) != KEY_BYTES:
+            raise ValueError("key must be a sha256 hex digest")
+        with self._lock:
+            self._insert(fingerprint, group, key_bytes)
+            if self._db is not None:
+                self._seq += 1
+                self._db.execute(
+                    "INSERT INTO near_duplicates (seq, fingerprint, grp, key) VALUES (?, ?, ?, ?)",
+                    (self._seq, _signed(fingerprint), _signed(group), key_bytes),
+                )
+                self._db.execute("DELETE FROM near_duplicates WHERE seq = ?", (self._seq - self.capacity,))
+
+    def lookup(self, fingerprint: int, group: int, limit: int = 3) -> List[str]:
+        """Keys of stored texts within the threshold, closest first"""
+        with self._lock:
+            matches = {}
+            for band in range(BANDS):
+                table = self._bands[band]
+                value = self._band(fingerprint, band)
+                for mask in self._probe_masks:
+                    slots = table[value ^ mask]
+                    if slots is None:
+                        continue
+                    for slot in slots:
+                        if slot in matches or self._groups[slot] != group:
+                            continue
+                        distance = (self._fingerprints[slot] ^ fingerprint).bit_count()
+                        if distance <= self.max_distance:
+                            matches[slot] = distance
+            closest = sorted(matches, key=matches.get)[:limit]
+            return [bytes(self._keys[slot * KEY_BYTES:(slot + 1) * KEY_BYTES]).hex() for slot in closest]
+
+    def record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._fingerprints),
+                "capacity": self.capacity,
+                "threshold": self.threshold,
+            }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
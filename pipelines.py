@@ -0,0 +1,155 @@
+"""Parallel extraction pipelines on the extraction executor.
+
+Multi-unit documents (PDF pages, image frames) are cut into slices that run as
+separate executor jobs, each opening the spooled file by path. Slices are
+submitted in waves no larger than the executor's free capacity; after each wave
+the character budget is checked so extraction stops once the summarizer has
+enough input. Unit texts are joined once at the end.
+
+``extract_pdf_incremental`` fingerprints pages first and only extracts pages
+whose text isn't already cached, so a new version of a long document costs
+about as much as the pages that changed.
+"""
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+
+from cache import LRUCache
+from executor import ExtractionExecutor
+from extractors import count_image_frames, count_pdf_pages, extract_pdf_pages, ocr_image_frames, pdf_page_fingerprints
+
+
+def slice_ranges(start: int, stop: int, per_job: int) -> List[Tuple[int, int]]:
+    return [(i, min(i + per_job, stop)) for i in range(start, stop, per_job)]
+
+
+async def run_in_waves(
+    executor: ExtractionExecutor,
+    ranges: List[Tuple[int, int]],
+    submit: Callable[[int, int], Awaitable[Any]],
+) -> AsyncIterator[List[Tuple[Tuple[int, int], Any]]]:
+    """Yield ``((a, b), await submit(a, b))`` pairs one wave at a time.
+
+    Each wave is as large as the executor has room for. ``submit`` is called
+    when its wave starts; stop iterating to skip the remaining ranges.
+    """
+    while ranges:
+        wave_size = min(executor.max_workers, max(1, executor.capacity - executor.in_flight))
+        wave, ranges = ranges[:wave_size], ranges[wave_size:]
+        results = await asyncio.gather(*(submit(a, b) for a, b in wave))
+        yield list(zip(wave, results))
+
+
+async def extract_in_slices(
+    executor: ExtractionExecutor,
+    worker: Callable[..., List[str]],
+    path: str,
+    start: int,
+    stop: int,
+    per_job: int,
+    max_chars: Optional[int],
+    *args,
+) -> str:
+    """Run ``worker(path, a, b, remaining_chars, *args)`` over [start, stop) in slices"""
+    texts = []
+    chars = 0
+
+    def submit(a: int, b: int):
+        remaining = None if max_chars is None else max_chars - chars
+        return executor.run(worker, path, a, b, remaining, *args)
+
+    async for wave in run_in_waves(executor, slice_ranges(start, stop, per_job), submit):
+        for _, slice_texts in wave:
+            for text in slice_texts:
+                texts.append(text)
+                chars += len(text) + 1
+                if max_chars is not None and chars >= max_chars:
+                    return "\n".join(texts)[:max_chars].strip()
+    return "\n".join(texts).strip()
+
+
+async def extract_pdf(
+    executor: ExtractionExecutor,
+    path: str,
+    first_page: Optional[int] = None,
+    last_page: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    pages_per_job: int = 100,
+) -> str:
+    """Extract text from pages first_page..last_page (1-based, inclusive) of a PDF"""
+    start, stop = await pdf_page_range(executor, path, first_page, last_page)
+    return await extract_in_slices(executor, extract_pdf_pages, path, start, stop, pages_per_job, max_chars)
+
+
+async def pdf_page_range(
+    executor: ExtractionExecutor,
+    path: str,
+    first_page: Optional[int],
+    last_page: Optional[int],
+) -> Tuple[int, int]:
+    """0-based [start, stop) for pages first_page..last_page (1-based, inclusive) of a PDF"""
+    page_count = await executor.run(count_pdf_pages, path)
+    start = (first_page or 1) - 1
+    stop = min(last_page or page_count, page_count)
+    if start >= stop:
+        raise ValueError(f"Page range is empty (document has {page_count} pages)")
+    return start, stop
+
+
+async def extract_pdf_incremental(
+    executor: ExtractionExecutor,
+    path: str,
+    page_cache: LRUCache,
+    first_page: Optional[int] = None,
+    last_page: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    pages_per_job: int = 100,
+) -> str:
+    """Like extract_pdf, reusing cached text of pages seen before in any PDF"""
+    start, stop = await pdf_page_range(executor, path, first_page, last_page)
+    keys = [
+        key
+        async for wave in run_in_waves(
+            executor, slice_ranges(start, stop, pages_per_job),
+            lambda a, b: executor.run(pdf_page_fingerprints, path, a, b),
+        )
+        for _, fingerprints in wave
+        for key in fingerprints
+    ]
+    texts = [page_cache.get(key) for key in keys]
+
+    # Extract runs of missing pages, front to back, until the character budget is met
+    missing = []
+    for index, text in enumerate(texts):
+        if text is not None:
+            continue
+        if missing and missing[-1][1] == index and missing[-1][1] - missing[-1][0] < pages_per_job:
+            missing[-1] = (missing[-1][0], index + 1)
+        else:
+            missing.append((index, index + 1))
+    async for wave in run_in_waves(
+        executor, missing, lambda a, b: executor.run(extract_pdf_pages, path, start + a, start + b),
+    ):
+        for (a, _), slice_texts in wave:
+            for index, text in enumerate(slice_texts, start=a):
+                texts[index] = text
+                page_cache.set(keys[index], text)
+        if max_chars is not None:
+            done = wave[-1][0][1]
+            if sum(len(text) + 1 for text in texts[:done]) >= max_chars:
+                texts = texts[:done]
+                break
+
+    if max_chars is not None:
+        return "\n".join(texts)[:max_chars].strip()
+    return "\n".join(texts).strip()
+
+
+async def extract_image(
+    executor: ExtractionExecutor,
+    path: str,
+    ocr_settings: dict,
+    max_chars: Optional[int] = None,
+) -> str:
+    """OCR every frame of an image (multi-page TIFF, animated GIF), one frame per job"""
+    frame_count = await executor.run(count_image_frames, path)
+    return await extract_in_slices(executor, ocr_image_frames, path, 0, frame_count, 1, max_chars, ocr_settings)
@@ -0,0 +1,268 @@
+"""Resilience for upstream calls: retries, hedging, circuit breaking, deadlines.
+
+``Resilience.call`` runs one logical call as up to ``retries + 1`` attempts with
+full-jitter exponential backoff. An attempt that is slower than the recent
+latency percentile can be hedged with a second, concurrent attempt; the first
+success wins and the other is cancelled. A circuit breaker fails calls fast
+after repeated upstream failures, letting one probe through once it cools
+down. A deadline set with ``deadline_scope`` bounds the whole call, retries
+included, and is passed to every attempt as its timeout. An attempt that only
+outlives the per-attempt ``default_timeout`` is an upstream failure: it is
+retried and counts against the breaker.
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Absolute time.monotonic() deadline for upstream calls made by the current request
+_deadline: ContextVar[Optional[float]] = ContextVar("upstream_deadline", default=None)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the circuit is open"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Upstream unavailable, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the request's deadline passes before upstream answers"""
+
+
+class UpstreamTimeout(Exception):
+    """One attempt outlived its per-attempt timeout with deadline to spare; retried like an upstream failure"""
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[None]:
+    """Bound upstream calls in this block to ``seconds`` from now (never extending an outer deadline)"""
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None without one"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures; half-opens after ``reset_timeout``"""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probing = False
+
+    def before_call(self):
+        if self.state == "closed" or self.failure_threshold <= 0:
+            return
+        waited = time.monotonic() - self.opened_at
+        if self.state == "open" and waited >= self.reset_timeout:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._probing:
+            self._probing = True
+            return
+        self.rejected += 1
+        raise CircuitOpenError(max(self.reset_timeout - waited, 1.0))
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or (self.failure_threshold > 0 and self.failures >= self.failure_threshold):
+            self.state = "open"
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def release(self):
+        """End a half-open probe that neither succeeded nor failed upstream (e.g. cancelled)"""
+        self._probing = False
+
+
+class LatencyWindow:
+    """Rolling window of recent successful attempt latencies"""
+
+    def __init__(self, size: int = 500, min_samples: int = 20):
+        self._samples = deque(maxlen=size)
+        self.min_samples = min_samples
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Resilience:
+    def __init__(
+        self,
+        is_retryable: Callable[[BaseException], bool],
+        retry_after: Callable[[BaseException], Optional[float]] = lambda e: None,
+        retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        hedge: bool = False,
+        hedge_percentile: float = 95,
+        hedge_min_delay: float = 1.0,
+        breaker: Optional[CircuitBreaker] = None,
+        default_timeout: Optional[float] = None,
+    ):
+        self.is_retryable = is_retryable
+        self.retry_after = retry_after
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.breaker = breaker or CircuitBreaker(0, 0)
+        self.default_timeout = default_timeout
+        self.latency = LatencyWindow()
+        self.retried = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.deadline_exceeded = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """How long to wait before hedging, or None while there is no latency history"""
+        threshold = self.latency.percentile(self.hedge_percentile)
+        return None if threshold is None else max(threshold, self.hedge_min_delay)
+
+    def _timeout(self) -> Optional[float]:
+        left = remaining()
+        if left is not None and left <= 0:
+            self.deadline_exceeded += 1
+            raise DeadlineExceeded("Request deadline exceeded")
+        if left is None:
+            return self.default_timeout
+        return left if self.default_timeout is None else min(left, self.default_timeout)
+
+    async def _attempt(self, attempt: Callable[[Optional[float]], Awaitable[T]]) -> T:
+        timeout = self._timeout()
+        left = remaining()
+        started = time.monotonic()
+        try:
+            if left is None:
+                result = await attempt(timeout)
+            else:
+                result = await asyncio.wait_for(attempt(timeout), timeout)
+        except asyncio.TimeoutError:
+            if self.default_timeout is not None and self.default_timeout < left:
+                # Only the per-attempt timeout ran out: a slow upstream, not the client's deadline
+                raise UpstreamTimeout(f"Upstream did not answer within {self.default_timeout:g}s")
+            self.deadline_exceeded += 1
+            raise DeadlineExceeded("Request deadline exceeded")
+        self.latency.add(time.monotonic() - started)
+        return result
+
+    async def _hedged(self, attempt: Callable[[Optional[float]], Awaitable[T]]) -> T:
+        delay = self.hedge_delay()
+        left = remaining()
+        if delay is None or (left is not None and left <= delay) or self.breaker.state != "closed":
+            return await self._attempt(attempt)
+
+        primary = asyncio.ensure_future(self._attempt(attempt))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return primary.result()
+            if self.breaker.state != "closed":
+                # Only one attempt at a time gets past an open or half-open breaker
+                return await primary
+            self.hedged += 1
+            tasks.append(asyncio.ensure_future(self._attempt(attempt)))
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+                # The loser may fail after we return; don't log it as unretrieved
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def call(self, attempt: Callable[[Optional[float]], Awaitable[T]], hedge: Optional[bool] = None) -> T:
+        """Run ``attempt(timeout)`` with retries, optional hedging and the circuit breaker"""
+        hedge = self.hedge if hedge is None else hedge
+        number = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                result = await (self._hedged(attempt) if hedge else self._attempt(attempt))
+            except DeadlineExceeded:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                left = remaining()
+                if left is not None and left <= 0:
+                    # The client's own timeout fired at our deadline; not upstream's fault
+                    self.breaker.release()
+                    self.deadline_exceeded += 1
+                    raise DeadlineExceeded("Request deadline exceeded") from e
+                if not (isinstance(e, UpstreamTimeout) or self.is_retryable(e)):
+                    self.breaker.release()
+                    raise
+                self.breaker.record_failure()
+                if number == self.retries:
+                    raise
+                # Full jitter, but never sooner than upstream asked for
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** number))
+                delay = max(delay, self.retry_after(e) or 0)
+                if left is not None and left <= delay:
+                    raise
+                self.retried += 1
+                number += 1
+                await asyncio.sleep(delay)
+            except BaseException:
+                self.breaker.release()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "rejected": self.breaker.rejected,
+            "retried": self.retried,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "deadline_exceeded": self.deadline_exceeded,
+        }
@@ -0,0 +1,160 @@
+"""Model routing by input size, and output length budgets.
+
+The routing table lists model tiers in order. Each LLM call goes to the first
+tier whose ``max_input_tokens`` covers its prompt and whose ``modes`` (when
+set) include the request's mode; the last tier takes anything larger. A tier
+may name its own OpenAI-compatible endpoint, so tiers can live on different
+providers.
+
+Output budgets scale with the input: a mode maps to a compression ratio
+(summary tokens per input token), clamped to the table's bounds, unless the
+request asks for a target length in words. The prompt asks for that length
+and ``max_tokens`` leaves headroom above it so summaries are not cut off.
+
+The table is read from a JSON file and re-read when the file changes.
+"""
+import hashlib
+import json
+import math
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field, ValidationError, model_validator
+
+WORDS_PER_TOKEN = 0.75
+# max_tokens is this much above the requested length
+OUTPUT_HEADROOM = 1.5
+
+
+class Route(BaseModel):
+    name: str
+    model: str
+    max_input_tokens: int = Field(..., gt=0)
+    latency_class: str = "standard"
+    modes: List[str] = []
+    base_url: Optional[str] = None
+    api_key_env: Optional[str] = None
+
+
+class RoutingTable(BaseModel):
+    routes: List[Route] = Field(..., min_length=1)
+    modes: Dict[str, float]
+    default_mode: str = "standard"
+    min_output_tokens: int = Field(64, gt=0)
+    max_output_tokens: int = Field(1024, gt=0)
+
+    @model_validator(mode="after")
+    def check_modes(self):
+        if self.default_mode not in self.modes:
+            raise ValueError(f"default_mode {self.default_mode!r} is not in modes")
+        for route in self.routes:
+            unknown = set(route.modes) - set(self.modes)
+            if unknown:
+                raise ValueError(f"route {route.name!r} uses unknown modes {sorted(unknown)}")
+        return self
+
+
+DEFAULT_TABLE = {
+    "routes": [
+        {
+            "name": "fast",
+            "model": "meta-llama/Llama-3.2-3B-Instruct-Turbo",
+            "max_input_tokens": 1500,
+            "latency_class": "fast",
+            "modes": ["brief", "standard"],
+        },
+        {
+            "name": "standard",
+            "model": "meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo",
+            "max_input_tokens": 120000,
+            "latency_class": "standard",
+        },
+    ],
+    "modes": {"brief": 0.05, "standard": 0.15, "detailed": 0.3},
+    "default_mode": "standard",
+    "min_output_tokens": 64,
+    "max_output_tokens": 1024,
+}
+
+
+class Router:
+    def __init__(self, path: Optional[str] = None, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.table = RoutingTable(**DEFAULT_TABLE)
+        self.version = self._fingerprint(self.table)
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+        self._mtime: Optional[float] = None
+        self._checked = 0.0
+        if path:
+            self.reload()
+
+    @staticmethod
+    def _fingerprint(table: RoutingTable) -> str:
+        return hashlib.sha256(table.model_dump_json().encode()).hexdigest()[:12]
+
+    def reload(self) -> bool:
+        """Re-read the table file; on a bad file keep the current table and record the error"""
+        if not self.path:
+            return False
+        self._checked = time.monotonic()
+        try:
+            self._mtime = os.stat(self.path).st_mtime
+            with open(self.path) as table_file:
+                table = RoutingTable(**json.load(table_file))
+        except (OSError, ValueError, TypeError, ValidationError) as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            return False
+        self.table = table
+        self.version = self._fingerprint(table)
+        self.reloads += 1
+        self.last_error = None
+        return True
+
+    def _maybe_reload(self):
+        if not self.path or time.monotonic() - self._checked < self.check_interval:
+            return
+        self._checked = time.monotonic()
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.reload()
+
+    def resolve_mode(self, mode: Optional[str]) -> str:
+        """The request's mode, or the table default; raises ValueError for unknown modes"""
+        self._maybe_reload()
+        mode = mode or self.table.default_mode
+        if mode not in self.table.modes:
+            raise ValueError(f"Unknown mode {mode!r} (expected one of: {', '.join(self.table.modes)})")
+        return mode
+
+    def route(self, input_tokens: int, mode: str) -> Route:
+        """Pick the first tier that fits the prompt and serves the mode"""
+        self._maybe_reload()
+        routes = self.table.routes
+        for route in routes:
+            if input_tokens <= route.max_input_tokens and (not route.modes or mode in route.modes):
+                return route
+        return routes[-1]
+
+    def length_budget(self, input_tokens: int, mode: str, target_words: Optional[int] = None) -> Tuple[int, int]:
+        """``(target_words, max_tokens)`` for a summary of ``input_tokens`` of text"""
+        table = self.table
+        if target_words is None:
+            ratio = table.modes.get(mode, table.modes[table.default_mode])
+            tokens = min(max(ratio * input_tokens, table.min_output_tokens), table.max_output_tokens)
+            target_words = max(1, round(tokens * WORDS_PER_TOKEN))
+        return target_words, math.ceil(target_words / WORDS_PER_TOKEN * OUTPUT_HEADROOM)
+
+    def describe(self) -> dict:
+        return {
+            "path": self.path,
+            "version": self.version,
+            "reloads": self.reloads,
+            "last_error": self.last_error,
+            "table": self.table.model_dump(),
+        }
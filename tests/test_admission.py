@@ -0,0 +1,156 @@
+"""Admission control in admission.py: priority ordering, shedding, cancellation and rate limits."""
+import asyncio
+import time
+
+import pytest
+
+from admission import AdmissionController, Overloaded, RateLimited
+
+
+def make_controller(slots: int = 1, **kwargs) -> AdmissionController:
+    kwargs.setdefault("weights", {"interactive": 3.0, "bulk": 1.0})
+    kwargs.setdefault("queue_limits", {"interactive": 100, "bulk": 100})
+    return AdmissionController(slots, **kwargs)
+
+
+def test_freed_slots_go_out_by_weight():
+    controller = make_controller()
+    served = []
+
+    async def request(priority: str):
+        with await controller.acquire("client", priority):
+            served.append(priority)
+            await asyncio.sleep(0)
+
+    async def scenario():
+        holder = await controller.acquire("client", "bulk")
+        # Bulk requests queue first, interactive ones after them
+        waiters = [asyncio.create_task(request("bulk")) for _ in range(4)]
+        waiters += [asyncio.create_task(request("interactive")) for _ in range(4)]
+        await asyncio.sleep(0)
+        assert controller.queued() == {"interactive": 4, "bulk": 4}
+        holder.release()
+        await asyncio.gather(*waiters)
+
+    asyncio.run(scenario())
+    # Three interactive requests for each bulk one, and bulk is not starved
+    assert served[:4].count("interactive") == 3
+    assert "bulk" in served[:4]
+    assert controller.in_use == 0
+    assert controller.admitted == {"interactive": 4, "bulk": 5}
+
+
+def test_full_queue_is_shed():
+    controller = make_controller(queue_limits={"interactive": 1, "bulk": 1})
+
+    async def scenario():
+        holder = await controller.acquire("client", "bulk")
+        waiter = asyncio.create_task(controller.acquire("client", "bulk"))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as error:
+            await controller.acquire("client", "bulk")
+        holder.release()
+        (await waiter).release()
+        return error.value
+
+    error = asyncio.run(scenario())
+    assert error.reason == "queue_full"
+    assert error.retry_after >= 1
+    assert controller.rejected == {("bulk", "queue_full"): 1}
+
+
+def test_expected_wait_past_the_deadline_is_shed_at_once():
+    controller = make_controller()
+
+    async def scenario():
+        # Teach the controller that a slot is held for about 0.1s
+        with await controller.acquire("client", "interactive"):
+            await asyncio.sleep(0.1)
+        holder = await controller.acquire("client", "interactive")
+        started = time.monotonic()
+        with pytest.raises(Overloaded) as error:
+            await controller.acquire("client", "interactive", deadline=0.01)
+        holder.release()
+        return error.value, time.monotonic() - started
+
+    error, elapsed = asyncio.run(scenario())
+    assert error.reason == "deadline"
+    assert elapsed < 0.05
+    assert controller.queued() == {"interactive": 0, "bulk": 0}
+
+
+def test_deadline_passing_in_the_queue_is_shed():
+    controller = make_controller()
+
+    async def scenario():
+        holder = await controller.acquire("client", "interactive")
+        with pytest.raises(Overloaded) as error:
+            await controller.acquire("client", "interactive", deadline=0.05)
+        holder.release()
+        return error.value
+
+    assert asyncio.run(scenario()).reason == "deadline"
+    assert controller.rejected == {("interactive", "deadline"): 1}
+    assert controller.in_use == 0
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    controller = make_controller()
+
+    async def scenario():
+        holder = await controller.acquire("client", "bulk")
+        first = asyncio.create_task(controller.acquire("client", "bulk"))
+        second = asyncio.create_task(controller.acquire("client", "bulk"))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        assert controller.queued()["bulk"] == 1
+        holder.release()
+        ticket = await asyncio.wait_for(second, 1)
+        assert controller.in_use == 1
+        ticket.release()
+
+    asyncio.run(scenario())
+    assert controller.in_use == 0
+    assert controller.admitted["bulk"] == 2
+
+
+def test_rate_limit_per_client():
+    controller = make_controller(slots=0, rate=1, burst=1)
+
+    async def scenario():
+        (await controller.acquire("a", "interactive")).release()
+        (await controller.acquire("b", "interactive")).release()
+        with pytest.raises(RateLimited) as error:
+            await controller.acquire("a", "interactive")
+        return error.value
+
+    assert asyncio.run(scenario()).retry_after > 0
+    assert controller.rejected == {("interactive", "rate_limited"): 1}
+
+
+def test_streaming_response_releases_its_slot_when_the_client_is_gone(monkeypatch):
+    monkeypatch.setenv("EXTRACTION_EXECUTOR", "thread")
+    import main
+
+    controller = make_controller()
+
+    async def events():
+        yield "data: {}\n\n"
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        raise OSError("client went away")
+
+    async def scenario():
+        ticket = await controller.acquire("client", "interactive")
+        response = main.sse_response(events(), ticket)
+        with pytest.raises(Exception):
+            await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+        return ticket
+
+    ticket = asyncio.run(scenario())
+    assert ticket.released
+    assert controller.in_use == 0
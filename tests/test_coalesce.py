@@ -0,0 +1,138 @@
+"""Single-flight coalescing in coalesce.py, and the shared upload file of coalesced extractions."""
+import asyncio
+import os
+
+import pytest
+
+from coalesce import SingleFlight
+
+
+class UpstreamError(Exception):
+    pass
+
+
+class Upstream:
+    """Stub upstream call that counts calls and answers (or fails) after ``latency``"""
+
+    def __init__(self, latency: float = 0.05, error: bool = False):
+        self.latency = latency
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise UpstreamError("upstream failed")
+        return "ok"
+
+
+def test_concurrent_identical_keys_make_one_call():
+    flights = SingleFlight("test")
+    upstream = Upstream()
+
+    async def callers():
+        return await asyncio.gather(*(flights.run("key", upstream) for _ in range(10)))
+
+    assert asyncio.run(callers()) == ["ok"] * 10
+    assert upstream.calls == 1
+    assert flights.stats() == {"started": 1, "coalesced": 9, "in_flight": 0}
+
+
+def test_error_reaches_every_waiter():
+    flights = SingleFlight("test")
+    upstream = Upstream(error=True)
+
+    async def callers():
+        return await asyncio.gather(*(flights.run("key", upstream) for _ in range(5)), return_exceptions=True)
+
+    results = asyncio.run(callers())
+    assert upstream.calls == 1
+    assert all(isinstance(result, UpstreamError) for result in results)
+
+
+def test_cancelled_waiter_leaves_the_shared_call_running():
+    flights = SingleFlight("test")
+    upstream = Upstream(latency=0.1)
+
+    async def callers():
+        first = asyncio.create_task(flights.run("key", upstream))
+        second = asyncio.create_task(flights.run("key", upstream))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(callers()) == "ok"
+    assert upstream.calls == 1
+    assert not upstream.cancelled
+
+
+def test_last_waiter_leaving_cancels_the_call_and_runs_cleanup():
+    flights = SingleFlight("test")
+    upstream = Upstream(latency=5)
+    cleaned = []
+
+    async def caller():
+        task = asyncio.create_task(flights.run("key", upstream, cleanup=lambda: cleaned.append(True)))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+
+    asyncio.run(caller())
+    assert upstream.cancelled
+    assert cleaned == [True]
+    assert flights.in_flight == 0
+
+
+def test_cleanup_runs_when_cancelled_before_the_call_starts():
+    flights = SingleFlight("test")
+    upstream = Upstream()
+    cleaned = []
+
+    async def caller():
+        task = asyncio.create_task(flights.run("key", upstream, cleanup=lambda: cleaned.append(True)))
+        # One step: the flight task exists but has not run yet
+        await asyncio.sleep(0)
+        flights._flights["key"].task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+
+    asyncio.run(caller())
+    assert upstream.calls == 0
+    assert cleaned == [True]
+
+
+def test_cancelled_extraction_removes_the_shared_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("EXTRACTION_EXECUTOR", "thread")
+    import main
+
+    async def slow_extract(file_extension, path, options):
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(main, "extract_text", slow_extract)
+    path = tmp_path / "upload.pdf"
+    path.write_bytes(b"%PDF-1.4")
+
+    async def cancelled_upload():
+        task = asyncio.create_task(
+            main.extract_file_text("upload.pdf", str(path), "digest-cancelled", main.ExtractionOptions())
+        )
+        await asyncio.sleep(0.05)
+        assert os.path.exists(f"{path}.shared")
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+
+    asyncio.run(cancelled_upload())
+    assert not os.path.exists(f"{path}.shared")
@@ -0,0 +1,28 @@
+"""Boilerplate stripping in compress.py."""
+from compress import strip_boilerplate
+
+
+def test_short_real_lines_survive():
+    text = "\n".join([
+        "AI",
+        "Scope",
+        "1.",
+        "Q&A",
+        "Go",
+        "The agreement covers every site the company runs in the region.",
+    ])
+    assert strip_boilerplate(text).splitlines() == text.splitlines()
+
+
+def test_ocr_debris_and_page_numbers_are_dropped():
+    text = "\n".join([
+        "Introduction",
+        "~~//##",
+        "|| -- ||",
+        "Page 3 of 12",
+        "The report opens with a summary of the year.",
+    ])
+    assert strip_boilerplate(text).splitlines() == [
+        "Introduction",
+        "The report opens with a summary of the year.",
+    ]
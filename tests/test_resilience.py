@@ -0,0 +1,247 @@
+"""Retries, hedging, circuit breaking and deadlines in resilience.py, against stub upstream calls."""
+import asyncio
+import time
+
+import pytest
+
+from resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded, Resilience, UpstreamTimeout, deadline_scope
+
+
+class UpstreamError(Exception):
+    pass
+
+
+class Upstream:
+    """Stub upstream call: fails the first ``failures`` attempts, then answers"""
+
+    def __init__(self, failures: int = 0, latency: float = 0.0, error: type = UpstreamError):
+        self.failures = failures
+        self.latency = latency
+        self.error = error
+        self.attempts = 0
+
+    async def __call__(self, timeout):
+        self.attempts += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.attempts <= self.failures:
+            raise self.error("upstream failed")
+        return "ok"
+
+
+class SlowFirstUpstream:
+    """Stub upstream whose first attempt hangs; later attempts answer at once"""
+
+    def __init__(self):
+        self.started = []
+        self.cancelled = 0
+
+    async def __call__(self, timeout):
+        self.started.append(time.monotonic())
+        if len(self.started) > 1:
+            return f"attempt {len(self.started)}"
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return "attempt 1"
+
+
+def make_resilience(**kwargs) -> Resilience:
+    kwargs.setdefault("backoff_base", 0.0)
+    return Resilience(is_retryable=lambda e: isinstance(e, UpstreamError), **kwargs)
+
+
+def test_retries_until_success():
+    resilience = make_resilience(retries=2)
+    upstream = Upstream(failures=2)
+    assert asyncio.run(resilience.call(upstream)) == "ok"
+    assert upstream.attempts == 3
+    assert resilience.retried == 2
+
+
+def test_gives_up_after_retries():
+    resilience = make_resilience(retries=2)
+    upstream = Upstream(failures=10)
+    with pytest.raises(UpstreamError):
+        asyncio.run(resilience.call(upstream))
+    assert upstream.attempts == 3
+
+
+def test_non_retryable_errors_are_not_retried():
+    resilience = make_resilience(retries=2)
+    upstream = Upstream(failures=1, error=ValueError)
+    with pytest.raises(ValueError):
+        asyncio.run(resilience.call(upstream))
+    assert upstream.attempts == 1
+    assert resilience.breaker.failures == 0
+
+
+def test_retry_waits_for_retry_after():
+    resilience = make_resilience(retries=1, retry_after=lambda e: 0.2)
+    started = time.monotonic()
+    assert asyncio.run(resilience.call(Upstream(failures=1))) == "ok"
+    assert time.monotonic() - started >= 0.2
+
+
+def test_breaker_opens_after_consecutive_failures():
+    resilience = make_resilience(retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    upstream = Upstream(failures=10)
+    for _ in range(2):
+        with pytest.raises(UpstreamError):
+            asyncio.run(resilience.call(upstream))
+    assert resilience.breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError) as error:
+        asyncio.run(resilience.call(upstream))
+    assert upstream.attempts == 2
+    assert error.value.retry_after > 0
+    assert resilience.breaker.rejected == 1
+
+
+def test_half_open_lets_one_probe_through_and_closes_on_success():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    resilience = make_resilience(retries=0, breaker=breaker)
+    with pytest.raises(UpstreamError):
+        asyncio.run(resilience.call(Upstream(failures=1)))
+    assert breaker.state == "open"
+    time.sleep(0.06)
+
+    async def probe_and_second_call():
+        probe = Upstream(latency=0.05)
+        second = Upstream()
+        results = await asyncio.gather(resilience.call(probe), resilience.call(second), return_exceptions=True)
+        return results, probe, second
+
+    (probe_result, second_result), probe, second = asyncio.run(probe_and_second_call())
+    assert probe_result == "ok"
+    assert isinstance(second_result, CircuitOpenError)
+    assert (probe.attempts, second.attempts) == (1, 0)
+    assert breaker.state == "closed"
+
+
+def test_failed_probe_reopens_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    resilience = make_resilience(retries=0, breaker=breaker)
+    with pytest.raises(UpstreamError):
+        asyncio.run(resilience.call(Upstream(failures=1)))
+    time.sleep(0.06)
+    with pytest.raises(UpstreamError):
+        asyncio.run(resilience.call(Upstream(failures=1)))
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(resilience.call(Upstream()))
+
+
+def test_deadline_bounds_a_slow_call():
+    resilience = make_resilience(retries=2)
+
+    async def slow_call():
+        with deadline_scope(0.1):
+            return await resilience.call(Upstream(latency=5))
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(slow_call())
+    assert time.monotonic() - started < 1
+    assert resilience.deadline_exceeded == 1
+    assert resilience.breaker.failures == 0
+
+
+def test_attempt_timeout_with_deadline_left_is_retried():
+    resilience = make_resilience(retries=1, default_timeout=0.1)
+    upstream = Upstream(latency=5)
+
+    async def slow_call():
+        with deadline_scope(5):
+            return await resilience.call(upstream)
+
+    with pytest.raises(UpstreamTimeout):
+        asyncio.run(slow_call())
+    assert upstream.attempts == 2
+    assert resilience.breaker.failures == 2
+    assert resilience.deadline_exceeded == 0
+
+
+def test_deadline_stops_retries():
+    resilience = make_resilience(retries=5, retry_after=lambda e: 1.0)
+    upstream = Upstream(failures=10)
+
+    async def failing_call():
+        with deadline_scope(0.3):
+            return await resilience.call(upstream)
+
+    started = time.monotonic()
+    with pytest.raises(UpstreamError):
+        asyncio.run(failing_call())
+    # The 1s backoff would outlast the deadline, so there is no second attempt
+    assert upstream.attempts == 1
+    assert time.monotonic() - started < 0.3
+
+
+def make_hedging(**kwargs) -> Resilience:
+    resilience = make_resilience(retries=0, hedge=True, hedge_min_delay=0.1, **kwargs)
+    for _ in range(resilience.latency.min_samples):
+        resilience.latency.add(0.01)
+    return resilience
+
+
+def test_hedge_fires_after_the_hedge_delay_and_first_result_wins():
+    resilience = make_hedging()
+    upstream = SlowFirstUpstream()
+
+    async def hedged_call():
+        result = await resilience.call(upstream)
+        # Let the cancelled primary finish unwinding
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(hedged_call()) == "attempt 2"
+    assert len(upstream.started) == 2
+    assert upstream.started[1] - upstream.started[0] >= 0.1
+    assert upstream.cancelled == 1
+    assert (resilience.hedged, resilience.hedge_wins) == (1, 1)
+
+
+def test_fast_attempt_is_not_hedged():
+    resilience = make_hedging()
+    upstream = Upstream(latency=0.01)
+    assert asyncio.run(resilience.call(upstream)) == "ok"
+    assert upstream.attempts == 1
+    assert resilience.hedged == 0
+
+
+def test_no_hedge_through_a_half_open_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    resilience = make_hedging(breaker=breaker)
+    with pytest.raises(UpstreamError):
+        asyncio.run(resilience.call(Upstream(failures=1), hedge=False))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(resilience.call(Upstream()))
+    time.sleep(0.06)
+
+    # The probe is slower than the hedge delay but stays the only attempt
+    probe = Upstream(latency=0.2)
+    assert asyncio.run(resilience.call(probe)) == "ok"
+    assert probe.attempts == 1
+    assert resilience.hedged == 0
+    assert breaker.state == "closed"
+
+
+def test_no_hedge_once_the_breaker_opens_mid_call():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    resilience = make_hedging(breaker=breaker)
+    slow = Upstream(latency=0.2)
+
+    async def calls():
+        async def failing():
+            await asyncio.sleep(0.02)
+            with pytest.raises(UpstreamError):
+                await resilience.call(Upstream(failures=1), hedge=False)
+        return (await asyncio.gather(resilience.call(slow), failing()))[0]
+
+    assert asyncio.run(calls()) == "ok"
+    assert slow.attempts == 1
+    assert resilience.hedged == 0
+
@@ -0,0 +1,40 @@
+"""Request size limits in uploads.py, against a stub ASGI app."""
+import asyncio
+import json
+
+from uploads import RequestSizeLimitMiddleware
+
+
+async def echo_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def post(headers: list, body: bytes = b"") -> tuple:
+    """Send one POST through the middleware; returns (status, body)"""
+    middleware = RequestSizeLimitMiddleware(echo_app, max_bytes=10)
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware({"type": "http", "method": "POST", "headers": headers}, receive, send))
+    return sent[0]["status"], b"".join(message.get("body", b"") for message in sent[1:])
+
+
+def test_small_body_passes():
+    assert post([(b"content-length", b"5")], b"hello") == (200, b"ok")
+
+
+def test_declared_oversized_body_is_rejected():
+    status, _ = post([(b"content-length", b"11")])
+    assert status == 413
+
+
+def test_malformed_content_length_is_a_bad_request():
+    status, body = post([(b"content-length", b"ten")])
+    assert status == 400
+    assert json.loads(body) == {"detail": "Invalid Content-Length header"}
@@ -0,0 +1,99 @@
+"""Upload ingestion with size limits.
+
+``RequestSizeLimitMiddleware`` rejects oversized request bodies with 413 before
+the multipart parser buffers them: up front from Content-Length, or as soon as
+a chunked body grows past the limit. A Content-Length that isn't a number is
+answered 400. ``spool_upload`` then copies each file to a temp file in
+fixed-size chunks and enforces the per-type limit while copying.
+"""
+from fastapi import HTTPException, UploadFile
+import hashlib
+import json
+import os
+import tempfile
+from typing import Optional, Tuple
+
+
+class RequestSizeLimitMiddleware:
+    """Pure ASGI middleware capping the size of POST/PUT request bodies"""
+
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def _reject(self, send, status: int = 413, detail: Optional[str] = None):
+        detail = detail or f"Request body too large (maximum {self.max_bytes} bytes)"
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT"):
+            return await self.app(scope, receive, send)
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None:
+            try:
+                length = int(content_length)
+            except ValueError:
+                return await self._reject(send, 400, "Invalid Content-Length header")
+            if length > self.max_bytes:
+                return await self._reject(send)
+
+        received = 0
+        response_started = False
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, response_started, rejected
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Answer 413 now and make the app see a disconnect so it stops reading
+                    if not response_started:
+                        response_started = rejected = True
+                        await self._reject(send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if rejected:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        await self.app(scope, limited_receive, guarded_send)
+
+
+async def spool_upload(file: UploadFile, max_bytes: int, tmp_dir: Optional[str] = None,
+                       chunk_size: int = 1024 * 1024) -> Tuple[str, str]:
+    """Copy an upload to a temp file in chunks; returns (path, sha256 of the bytes).
+
+    Raises 413 as soon as more than ``max_bytes`` have been read.
+    """
+    digest = hashlib.sha256()
+    suffix = os.path.splitext(file.filename or "")[1]
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=tmp_dir)
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as spooled:
+            while chunk := await file.read(chunk_size):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File {file.filename} is too large (maximum {max_bytes // (1024 * 1024)} MB for this type)",
+                    )
+                digest.update(chunk)
+                spooled.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path, digest.hexdigest()